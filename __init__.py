@@ -11,6 +11,10 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+from . import instrumentation
+from . import selection_cache
+from . import armature_snapshot
+from . import filtered_lists
 from . import bone_picker
 from . import mesh_bone_magnet
 from . import armature_bone_magnet
@@ -25,16 +29,28 @@ from . import add_lockedtrack_plus
 from . import parent_mesh_to_bones
 from . import parent_mesh_to_bone
 from . import add_armature_to_mesh
+from . import mesh_curve_skeleton
+from . import object_hierarchy_to_bones
 from . import bone_chain_rename
+from . import rename_rules
 from . import bone_align
 from . import bone_link_align
+from . import bone_chain_curve
 from . import widget_driver_panel
 from . import create_widget_driver
+from . import rbf_driver
+from . import shape_key_prune
+from . import driver_benchmark
+from . import driver_audit
 from . import bone_doctor
 from . import bone_per_vertex
 
 def register(): 
     properties.register()
+    instrumentation.register()
+    selection_cache.register()
+    armature_snapshot.register()
+    filtered_lists.register()
     bone_picker.register()
     mesh_bone_magnet.register()
     armature_bone_magnet.register()
@@ -47,25 +63,41 @@ def register():
     parent_mesh_to_bones.register()
     parent_mesh_to_bone.register()
     add_armature_to_mesh.register()
+    mesh_curve_skeleton.register()
+    object_hierarchy_to_bones.register()
     bone_chain_rename.register()
+    rename_rules.register()
     bone_align.register()
     bone_link_align.register()
-    #widget_driver_panel.register()
-    #create_widget_driver.register()
+    bone_chain_curve.register()
+    widget_driver_panel.register()
+    create_widget_driver.register()
+    rbf_driver.register()
+    shape_key_prune.register()
+    driver_benchmark.register()
     bone_doctor.register()
+    driver_audit.register()
     bone_per_vertex.register()
 
     panel.register()
 
 def unregister():
     panel.unregister()
-    #create_widget_driver.unregister()
+    driver_benchmark.unregister()
+    shape_key_prune.unregister()
+    rbf_driver.unregister()
+    create_widget_driver.unregister()
+    driver_audit.unregister()
     bone_doctor.unregister()
     bone_per_vertex.unregister()
-    #widget_driver_panel.unregister()    
+    widget_driver_panel.unregister()
+    bone_chain_curve.unregister()
     bone_link_align.unregister()
     bone_align.unregister()
+    rename_rules.unregister()
     bone_chain_rename.unregister()
+    object_hierarchy_to_bones.unregister()
+    mesh_curve_skeleton.unregister()
     add_armature_to_mesh.unregister()
     parent_mesh_to_bone.unregister()
     parent_mesh_to_bones.unregister()
@@ -78,4 +110,8 @@ def unregister():
     mesh_bone_magnet.unregister()
     armature_bone_magnet.unregister()
     bone_straightener.unregister()  
+    filtered_lists.unregister()
+    armature_snapshot.unregister()
+    selection_cache.unregister()
+    instrumentation.unregister()
     properties.unregister()
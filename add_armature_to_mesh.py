@@ -1,7 +1,11 @@
 import bpy # type: ignore
-import bmesh # type: ignore
-from mathutils import Vector # type: ignore
+from mathutils import Vector, Matrix # type: ignore
+import numpy as np
+from . import geometry
+from . import instrumentation
+from . import edit_session
 
+@instrumentation.instrumented
 class MESH_OT_johnnygizmo_create_rig_and_assign(bpy.types.Operator):
     bl_idname = "mesh.johnnygizmo_create_rig_and_assign"
     bl_label = "Create Armature and Assign Bone"
@@ -26,15 +30,52 @@ class MESH_OT_johnnygizmo_create_rig_and_assign(bpy.types.Operator):
         default='ARMATURE',
     )  # type: ignore
 
-    def execute(self, context):
+    chain_fit: bpy.props.EnumProperty(
+        name="Chain Placement",
+        description="How the bone chain is placed",
+        items=[
+            ('AXIS', "Up Axis", "Stack unit length bones along +Z from the selection center"),
+            ('PCA', "Fit to Selection", "Fit the chain along the principal axis of the selected vertices, each bone covering an equal number of vertices"),
+        ],
+        default='PCA',
+    )  # type: ignore
+
+    assign_weights: bpy.props.BoolProperty(
+        name="Assign Weights",
+        description="Weight each selected vertex to the chain bone covering it (Armature parenting only)",
+        default=True,
+    )  # type: ignore
 
-        if context.mode != 'EDIT_MESH':
-            #Toggle edit mode
-            bpy.ops.object.mode_set(mode='EDIT')
-            #select all vertices
-            bpy.ops.mesh.select_all(action='SELECT')
-        mesh_obj = context.edit_object
-        if mesh_obj.type != 'MESH':
+    def fit_chain(self, points, indices):
+        """Return (joints, vertex_indices, vertex_bones) for a chain fitted to the selection.
+
+        points are the selected vertices relative to the armature origin, so
+        joints come out in armature space. Joints sit at quantiles of the
+        selection projected on its principal axis.
+        Returns None when the selection has no usable principal axis.
+        """
+        centroid, axes, singular = geometry.principal_axes(points)
+        if singular[0] < 1e-6:
+            return None
+        axis = geometry.orient_axis(axes[0], np.array((0.0, 0.0, 1.0)))
+
+        proj = (points - centroid) @ axis
+        stops = np.quantile(proj, np.linspace(0.0, 1.0, self.number_of_bones + 1))
+        # Many vertices on one projection (a cylinder with fewer edge loops
+        # than bones) repeat quantiles, and Blender deletes the zero-length
+        # bones that would make; space those chains evenly instead
+        low, high = proj.min(), proj.max()
+        if np.diff(stops).min() < max((high - low) * 1e-3, 1e-4):
+            stops = np.linspace(low, high, self.number_of_bones + 1)
+        joints = centroid + stops[:, None] * axis
+
+        # Bone index for each vertex: the quantile slice its projection falls in
+        vertex_bones = np.clip(np.searchsorted(stops, proj, side='right') - 1, 0, self.number_of_bones - 1)
+        return joints, indices, vertex_bones
+
+    def execute(self, context):
+        mesh_obj = context.active_object
+        if not mesh_obj or mesh_obj.type != 'MESH':
             self.report({'WARNING'}, "Active object must be a mesh.")
             return {'CANCELLED'}
 
@@ -42,17 +83,27 @@ class MESH_OT_johnnygizmo_create_rig_and_assign(bpy.types.Operator):
             self.report({'WARNING'}, "Mesh already has a parent.")
             return {'CANCELLED'}
 
-        bm = bmesh.from_edit_mesh(mesh_obj.data)
-        selected = [v.co for v in bm.verts if v.select]
-        if not selected:
+        # Edit Mode uses the selected vertices, Object Mode the whole mesh;
+        # both are read from mesh data, so no mode switch is needed here
+        if mesh_obj.mode == 'EDIT':
+            mesh_obj.update_from_editmode()
+            indices = np.flatnonzero(geometry.read_vertex_selection(mesh_obj.data))
+        else:
+            indices = np.arange(len(mesh_obj.data.vertices))
+        if not len(indices):
             self.report({'WARNING'}, "No vertices selected.")
             return {'CANCELLED'}
 
         # Compute center of selection in world space
-        center_local = sum(selected, Vector()) / len(selected)
-        center_world = mesh_obj.matrix_world @ center_local
+        coords = geometry.read_vertex_coords(mesh_obj.data)[indices]
+        center_world = mesh_obj.matrix_world @ Vector(coords.mean(axis=0))
 
-        bpy.ops.object.mode_set(mode='OBJECT')
+        fitted = None
+        if self.chain_fit == 'PCA':
+            points = geometry.transform_points(mesh_obj.matrix_world, coords) - np.array(center_world)
+            fitted = self.fit_chain(points, indices)
+            if fitted is None:
+                self.report({'WARNING'}, "Selection has no principal axis, stacking bones along +Z.")
 
         # Create the new armature object
         arm_data = bpy.data.armatures.new(mesh_obj.name + "_Rig")
@@ -60,25 +111,29 @@ class MESH_OT_johnnygizmo_create_rig_and_assign(bpy.types.Operator):
         arm_obj.location = center_world
         bpy.context.collection.objects.link(arm_obj)
 
-        # Create a single bone at the armature origin
-        bpy.context.view_layer.objects.active = arm_obj
-        bpy.ops.object.mode_set(mode='EDIT')
+        # Build the chain in one edit session, finishing in Object Mode for parenting
         prev_bone = None
-        for i in range(self.number_of_bones):
-            bone = arm_data.edit_bones.new("Bone")
-           
-            bone.head = Vector((0, 0, i))
-            bone.tail = Vector((0, 0, i+1))
-            if i > 0 and prev_bone:
-                bone.parent = prev_bone
-                bone.use_connect = True
-            if i == 0:
-                arm_data.edit_bones.active = bone
-                bone.select = True
-            
-            prev_bone = bone
-
-        bpy.ops.object.mode_set(mode='OBJECT')
+        bone_names = []
+        with edit_session.armature_edit(context, arm_obj, restore_mode='OBJECT') as edit_bones:
+            for i in range(self.number_of_bones):
+                bone = edit_bones.new("Bone")
+
+                if fitted is not None:
+                    joints = fitted[0]
+                    bone.head = Vector(joints[i])
+                    bone.tail = Vector(joints[i + 1])
+                else:
+                    bone.head = Vector((0, 0, i))
+                    bone.tail = Vector((0, 0, i+1))
+                if i > 0 and prev_bone:
+                    bone.parent = prev_bone
+                    bone.use_connect = True
+                if i == 0:
+                    edit_bones.active = bone
+                    bone.select = True
+
+                prev_bone = bone
+                bone_names.append(bone.name)
 
         original_matrix = mesh_obj.matrix_world.copy()
 
@@ -97,6 +152,15 @@ class MESH_OT_johnnygizmo_create_rig_and_assign(bpy.types.Operator):
 
         elif self.parent_type == 'ARMATURE':
             bpy.ops.object.parent_set(type='ARMATURE')
+            if fitted is not None and self.assign_weights:
+                _, indices, vertex_bones = fitted
+                for i, bone_name in enumerate(bone_names):
+                    members = indices[vertex_bones == i]
+                    bone = arm_data.bones.get(bone_name)
+                    if len(members) and bone:
+                        # Parenting may already have made the group; a second one would get a .001 name
+                        vgroup = mesh_obj.vertex_groups.get(bone.name) or mesh_obj.vertex_groups.new(name=bone.name)
+                        vgroup.add(members.tolist(), 1.0, 'REPLACE')
 
         elif self.parent_type == 'BONE':
 
@@ -113,14 +177,137 @@ class MESH_OT_johnnygizmo_create_rig_and_assign(bpy.types.Operator):
         layout.label(text="Assign Mesh to Armature:")
         layout.prop(self, "parent_type", expand=True)
         layout.prop(self, "number_of_bones", text="Number of Bones")
+        layout.prop(self, "chain_fit")
+        if self.chain_fit == 'PCA' and self.parent_type == 'ARMATURE':
+            layout.prop(self, "assign_weights")
+
+@instrumentation.instrumented
+class OBJECT_OT_johnnygizmo_rig_selected_meshes(bpy.types.Operator):
+    """Create one armature with a bone for every selected mesh and parent each mesh to its bone"""
+    bl_idname = "object.johnnygizmo_rig_selected_meshes"
+    bl_label = "Rig Selected Meshes"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    add_root_bone: bpy.props.BoolProperty(
+        name="Add Root Bone",
+        description="Parent all mesh bones to a root bone at the bottom of the selection",
+        default=True,
+    )  # type: ignore
+
+    replace_parent: bpy.props.BoolProperty(
+        name="Replace Parent",
+        description="Also rig meshes that already have a parent",
+        default=False,
+    )  # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT' and any(o.type == 'MESH' for o in context.selected_objects)
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        meshes = [o for o in context.selected_objects if o.type == 'MESH']
+        skipped = 0
+        if not self.replace_parent:
+            skipped = sum(1 for o in meshes if o.parent)
+            meshes = [o for o in meshes if not o.parent]
+        if not meshes:
+            self.report({'WARNING'}, "No unparented meshes selected.")
+            return {'CANCELLED'}
+
+        # Vectorized bounds: local boxes (K, 8, 3) and world matrices (K, 4, 4)
+        worlds = np.array([geometry.matrix_to_array(o.matrix_world) for o in meshes])
+        boxes = np.array([np.array(o.bound_box) for o in meshes], dtype=np.float64)
+        box_min = boxes.min(axis=1)
+        box_max = boxes.max(axis=1)
+        centers = np.einsum('kij,kj->ki', worlds[:, :3, :3], (box_min + box_max) * 0.5) + worlds[:, :3, 3]
+
+        # World-space box axes, scaled to full box size
+        axes = worlds[:, :3, :3].transpose(0, 2, 1) * (box_max - box_min)[:, :, None]
+        sizes = np.linalg.norm(axes, axis=2)
+        ranking = np.argsort(-sizes, axis=1)
+        rows = np.arange(len(meshes))
+        length_axes = axes[rows, ranking[:, 0]]
+        roll_axes = axes[rows, ranking[:, 1]]
+        lengths = sizes[rows, ranking[:, 0]]
+
+        # Point bones upward where possible; fall back to +Z for empty boxes
+        up = np.array((0.0, 0.0, 1.0))
+        flat = lengths < 1e-6
+        length_axes[flat] = up * 0.1
+        lengths[flat] = 0.1
+        length_axes *= np.where(length_axes @ up < 0.0, -1.0, 1.0)[:, None]
+        heads = centers - length_axes * 0.5
+        tails = centers + length_axes * 0.5
+
+        # Armature origin: middle of the selection, at its lowest point
+        corners = np.einsum('kij,kcj->kci', worlds[:, :3, :3], boxes) + worlds[:, None, :3, 3]
+        origin = np.array((centers[:, 0].mean(), centers[:, 1].mean(), corners[:, :, 2].min()))
+
+        arm_data = bpy.data.armatures.new("Meshes_Rig")
+        arm_obj = bpy.data.objects.new("Meshes_Armature", arm_data)
+        arm_obj.location = Vector(origin)
+        context.collection.objects.link(arm_obj)
+
+        # One edit session for every bone
+        bone_names = []
+        with edit_session.armature_edit(context, arm_obj) as edit_bones:
+            root = None
+            if self.add_root_bone:
+                root = edit_bones.new("Root")
+                root.head = Vector((0.0, 0.0, 0.0))
+                root.tail = Vector((0.0, 0.0, max(float(lengths.max()), 0.1)))
+            for i, mesh_obj in enumerate(meshes):
+                bone = edit_bones.new(mesh_obj.name)
+                bone.head = Vector(heads[i] - origin)
+                bone.tail = Vector(tails[i] - origin)
+                if sizes[i, ranking[i, 1]] > 1e-6:
+                    bone.align_roll(Vector(roll_axes[i]))
+                bone.parent = root
+                bone_names.append(bone.name)
+        instrumentation.count("bones_touched", len(bone_names))
+        instrumentation.count("rna_writes", 4 * len(bone_names))
+
+        # Parent with direct matrix math: keep each world matrix by giving it
+        # the inverse of its bone's tail matrix as parent inverse
+        parent_mats = geometry.bone_tail_matrices(arm_obj, bone_names)
+        parent_inverses = np.linalg.inv(parent_mats)
+        for i, mesh_obj in enumerate(meshes):
+            world_matrix = mesh_obj.matrix_world.copy()
+            mesh_obj.parent = arm_obj
+            mesh_obj.parent_type = 'BONE'
+            mesh_obj.parent_bone = bone_names[i]
+            mesh_obj.matrix_parent_inverse = Matrix(parent_inverses[i].tolist())
+            mesh_obj.matrix_basis = world_matrix
+
+        for o in context.selected_objects:
+            o.select_set(False)
+        arm_obj.select_set(True)
+        context.view_layer.objects.active = arm_obj
+
+        msg = f"Rigged {len(meshes)} meshes to '{arm_obj.name}'"
+        if skipped:
+            msg += f" ({skipped} already parented meshes skipped)"
+        self.report({'INFO'}, msg)
+        return {'FINISHED'}
+
 
 def menu_func(self, context):
     self.layout.operator(MESH_OT_johnnygizmo_create_rig_and_assign.bl_idname)
 
+def object_menu_func(self, context):
+    self.layout.operator(OBJECT_OT_johnnygizmo_rig_selected_meshes.bl_idname, icon='OUTLINER_OB_ARMATURE')
+
 def register():
     bpy.utils.register_class(MESH_OT_johnnygizmo_create_rig_and_assign)
+    bpy.utils.register_class(OBJECT_OT_johnnygizmo_rig_selected_meshes)
     bpy.types.VIEW3D_MT_edit_mesh.append(menu_func)
+    bpy.types.VIEW3D_MT_object_parent.append(object_menu_func)
 
 def unregister():
+    bpy.types.VIEW3D_MT_object_parent.remove(object_menu_func)
     bpy.types.VIEW3D_MT_edit_mesh.remove(menu_func)
+    bpy.utils.unregister_class(OBJECT_OT_johnnygizmo_rig_selected_meshes)
     bpy.utils.unregister_class(MESH_OT_johnnygizmo_create_rig_and_assign)
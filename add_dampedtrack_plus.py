@@ -9,7 +9,9 @@ from bpy.props import ( # type: ignore
     StringProperty,
     PointerProperty
 )
+from . import instrumentation
 
+@instrumentation.instrumented
 class MESH_OT_johnnygizmo_damptrackto_plus(Operator):
     bl_idname = "armature.johnnygizmo_add_damp_track_to_plus"
     bl_label = "Add Damped Track with Settings"
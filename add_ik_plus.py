@@ -8,8 +8,10 @@ from bpy.props import ( # type: ignore
     StringProperty,
     PointerProperty
 )
+from . import instrumentation
 
 
+@instrumentation.instrumented
 class ARMATURE_OT_johnnygizmo_ik_plus(Operator):
     bl_idname = "armature.johnnygizmo_add_ik_plus"
     bl_label = "Add IK Chain with Settings"
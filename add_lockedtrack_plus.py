@@ -9,7 +9,9 @@ from bpy.props import ( # type: ignore
     StringProperty,
     PointerProperty
 )
+from . import instrumentation
 
+@instrumentation.instrumented
 class ARMATURE_OT_johnnygizmo_locktrackto_plus(Operator):
     bl_idname = "armature.johnnygizmo_add_lock_track_to_plus"
     bl_label = "Add Lock Track with Settings"
@@ -6,7 +6,9 @@ from bpy.props import ( # type: ignore
     FloatProperty,
     BoolProperty,
 )
+from . import instrumentation
 
+@instrumentation.instrumented
 class ARMATURE_OT_johnnygizmo_stretchto_plus(Operator):
     bl_idname = "armature.johnnygizmo_add_stretch_to_plus"
     bl_label = "Add Stretch To with Settings"
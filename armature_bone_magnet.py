@@ -1,61 +1,61 @@
 import bpy # type: ignore # type: ignore
 from mathutils import Vector # type: ignore
+import numpy as np
+from . import instrumentation
+from . import armature_snapshot
 
 BONE_LOCATIONS = {}
+ENUM_ITEMS = []
 
-def get_selected_joint_locations(context):
+def read_selection(bones, attr):
+    flags = np.empty(len(bones), dtype=bool)
+    bones.foreach_get(attr, flags)
+    return flags
+
+def get_selected_joint_locations(context, snap=None):
+    """World positions of the selected heads and tails as an (N, 3) array"""
     obj = context.edit_object
     bones = obj.data.edit_bones
-    locs = []
-
-    for bone in bones:
-        if bone.select_head:
-            locs.append(obj.matrix_world @ bone.head)
-        if bone.select_tail:
-            locs.append(obj.matrix_world @ bone.tail)
+    if snap is None:
+        snap = armature_snapshot.snapshot(obj.data, edit=True)
 
-    return locs
+    heads = snap.world_points(obj.matrix_world, 'HEAD')[read_selection(bones, "select_head")]
+    tails = snap.world_points(obj.matrix_world, 'TAIL')[read_selection(bones, "select_tail")]
+    return np.concatenate([heads, tails])
 
 def get_bone_endpoints(self, context):
-    global BONE_LOCATIONS
     bone_points = []
-    center_list = get_selected_joint_locations(context)
-    if not center_list:
+    obj = context.edit_object
+    snap = armature_snapshot.snapshot(obj.data, edit=True)
+    center_list = get_selected_joint_locations(context, snap)
+    if not len(center_list):
         return []
 
-    center = sum(center_list, Vector()) / len(center_list)
-    obj = context.edit_object
+    center = center_list.mean(axis=0)
 
     BONE_LOCATIONS.clear()
 
-    for bone in obj.data.edit_bones:
-        if bone.select:
-            continue  # ignore any part of selected bone to avoid snapping to self
-
-        head_label = f"{bone.name} >>> Head"
-        tail_label = f"{bone.name} >>> Tail"
-
-        head_loc = obj.matrix_world @ bone.head
-        tail_loc = obj.matrix_world @ bone.tail
-
-        BONE_LOCATIONS[head_label] = head_loc
-        BONE_LOCATIONS[tail_label] = tail_loc
-
-        dist_head = (head_loc - center).length
-        dist_tail = (tail_loc - center).length
-
-
-        if dist_head > 0.0:
-            BONE_LOCATIONS[head_label] = head_loc
-            bone_points.append((head_label, head_label, head_loc))
-
-        if dist_tail > 0.0:
-            BONE_LOCATIONS[tail_label] = tail_loc
-            bone_points.append((tail_label, tail_label, tail_loc))
-
-    bone_points.sort(key=lambda x: (x[2] - center).length)
-    return [(x[0], x[1], f"Distance: {(x[2] - center).length:.2f}") for x in bone_points]
-
+    # ignore any part of selected bones to avoid snapping to self
+    unselected = ~read_selection(obj.data.edit_bones, "select")
+    points = np.concatenate([
+        snap.world_points(obj.matrix_world, 'HEAD'),
+        snap.world_points(obj.matrix_world, 'TAIL'),
+    ])
+    dist = np.linalg.norm(points - center, axis=1)
+    count = len(snap)
+    candidates = np.flatnonzero(np.concatenate([unselected, unselected]) & (dist > 0.0))
+
+    for i in candidates[np.argsort(dist[candidates], kind='stable')]:
+        name = snap.names[i % count]
+        label = f"{name} >>> {'Head' if i < count else 'Tail'}"
+        BONE_LOCATIONS[label] = Vector(points[i])
+        bone_points.append((label, label, f"Distance: {dist[i]:.2f}"))
+
+    # Blender needs the enum item strings to stay referenced from Python
+    ENUM_ITEMS[:] = bone_points
+    return ENUM_ITEMS
+
+@instrumentation.instrumented
 class ARMATURE_OT_johnnygizmo_armature_bone_magnet(bpy.types.Operator):
     bl_idname = "armature.johnnygizmo_armature_bone_magnet"
     bl_label = "Armature Bone Magnet"
@@ -83,7 +83,7 @@ class ARMATURE_OT_johnnygizmo_armature_bone_magnet(bpy.types.Operator):
             self.report({'ERROR'}, "Not in armature edit mode.")
             return {'CANCELLED'}
 
-        if not get_selected_joint_locations(context):
+        if not len(get_selected_joint_locations(context)):
             self.report({'ERROR'}, "No bone joints selected.")
             return {'CANCELLED'}
 
@@ -109,11 +109,11 @@ class ARMATURE_OT_johnnygizmo_armature_bone_magnet(bpy.types.Operator):
 
         # Move the target bone part to each selected joint (averaged if multiple)
         selected_joints = get_selected_joint_locations(context)
-        if not selected_joints:
+        if not len(selected_joints):
             self.report({'ERROR'}, "No joints selected.")
             return {'CANCELLED'}
 
-        average_loc = sum(selected_joints, Vector()) / len(selected_joints)
+        average_loc = Vector(selected_joints.mean(axis=0))
         local_target = obj.matrix_world.inverted() @ average_loc
 
         target_bone = bones.get(bone_name)
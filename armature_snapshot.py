@@ -0,0 +1,223 @@
+import bpy # type: ignore
+from bpy.app.handlers import persistent # type: ignore
+import numpy as np
+from . import geometry
+from . import selection_cache
+from . import instrumentation
+
+# Array view of an armature's bones for vectorized queries. Rest bones
+# (Armature.bones) are read with foreach_get and cached per armature until the
+# depsgraph reports an update for it. Edit bones can change from scripts
+# without any depsgraph update, so edit snapshots are always read fresh.
+
+# Thresholds used by Blender's vec_roll_to_mat3_normalized
+_SAFE_THRESHOLD = 6.1e-3
+_CRITICAL_THRESHOLD = 2.5e-4
+
+_cache = {}
+
+
+@persistent
+def _on_load(*args):
+    _cache.clear()
+
+
+class ArmatureSnapshot:
+    """Bones of one armature as parallel arrays, in collection order.
+
+    heads, tails: (N, 3) float32 in armature space
+    roll: (N,) float32 roll in radians
+    parent: (N,) int64 row of the parent bone, -1 for roots
+    deform, connect: (N,) bool use_deform / use_connect
+    names: bone names by row, index: name -> row
+    """
+    __slots__ = ("names", "index", "heads", "tails", "roll", "parent", "deform", "connect")
+
+    def __len__(self):
+        return len(self.names)
+
+    def points(self, which='CENTER'):
+        """Head, tail or midpoint ('HEAD', 'TAIL', 'CENTER') of every bone as an (N, 3) array"""
+        if which == 'HEAD':
+            return self.heads
+        if which == 'TAIL':
+            return self.tails
+        return (self.heads + self.tails) * 0.5
+
+    def world_points(self, matrix_world, which='CENTER'):
+        """points() transformed by the armature's world matrix"""
+        return geometry.transform_points(matrix_world, self.points(which).astype(np.float64))
+
+    def nearest(self, matrix_world, location, which='CENTER', mask=None):
+        """Row of the bone whose point is closest to a world location, or -1 if mask excludes all"""
+        dist = np.linalg.norm(self.world_points(matrix_world, which) - np.asarray(location, dtype=np.float64), axis=1)
+        if mask is not None:
+            dist = np.where(mask, dist, np.inf)
+        if not len(dist) or not np.isfinite(dist.min()):
+            return -1
+        return int(np.argmin(dist))
+
+    def roots(self):
+        """Rows of bones without a parent"""
+        return np.flatnonzero(self.parent < 0)
+
+    def chains(self, selected):
+        """Split the selected bones into unbranched chains, each ordered root to tip.
+
+        A chain continues from a bone into its selected child as long as that
+        child is its only selected child. Chain positions come from pointer
+        jumping, so long chains cost a logarithmic number of array passes.
+        Returns a list of row arrays ordered by the row of each chain's root.
+        """
+        n = len(self.names)
+        rows = np.arange(n)
+        has_parent = self.parent >= 0
+        parent_selected = np.zeros(n, dtype=bool)
+        parent_selected[has_parent] = selected[self.parent[has_parent]]
+        candidate = selected & parent_selected
+        selected_children = np.bincount(self.parent[candidate], minlength=n)
+        linked = candidate & (selected_children[np.maximum(self.parent, 0)] == 1)
+
+        # List ranking: up converges to each chain's root, depth to the distance from it
+        up = np.where(linked, self.parent, rows)
+        depth = linked.astype(np.int64)
+        while True:
+            jumped = up[up]
+            if np.array_equal(jumped, up):
+                break
+            depth = depth + depth[up]
+            up = jumped
+
+        members = np.flatnonzero(selected)
+        order = members[np.lexsort((depth[members], up[members]))]
+        _, starts = np.unique(up[order], return_index=True)
+        return np.split(order, starts[1:]) if len(order) else []
+
+    def children(self):
+        """CSR (indptr, rows) of every bone's children, in collection order"""
+        linked = np.flatnonzero(self.parent >= 0)
+        order = linked[np.argsort(self.parent[linked], kind="stable")]
+        indptr = np.zeros(len(self.names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.parent[linked], minlength=len(self.names)), out=indptr[1:])
+        return indptr, order
+
+
+def _read_vectors(collection, attr):
+    flat = np.empty(len(collection) * 3, dtype=np.float32)
+    collection.foreach_get(attr, flat)
+    return flat.reshape(-1, 3)
+
+
+def _read_flags(collection, attr):
+    flags = np.empty(len(collection), dtype=bool)
+    collection.foreach_get(attr, flags)
+    return flags
+
+
+def _zero_roll_basis(y_axes):
+    """X and Z axes that bones pointing along y_axes have at zero roll.
+
+    Vectorized form of Blender's vec_roll_to_mat3_normalized: for a bone
+    direction (x, y, z) they are (1 - x²/θ, -x, -xz/θ) and (-xz/θ, -z, 1 - z²/θ)
+    with θ = 1 + y.
+    """
+    y_axes = y_axes / np.maximum(np.linalg.norm(y_axes, axis=1), 1e-12)[:, None]
+    x, y, z = y_axes.T
+
+    theta = 1.0 + y
+    theta_alt = x * x + z * z
+    small = theta <= _SAFE_THRESHOLD
+    theta = np.where(small, theta_alt * 0.5 + theta_alt * theta_alt * 0.125, theta)
+    theta = np.maximum(theta, 1e-12)
+    x_basis = np.stack([1.0 - x * x / theta, -x, -x * z / theta], axis=1)
+    z_basis = np.stack([-x * z / theta, -z, 1.0 - z * z / theta], axis=1)
+
+    # Bone pointing straight down -Y: Blender flips X and Y
+    flipped = small & (theta_alt <= _CRITICAL_THRESHOLD)
+    x_basis[flipped] = (-1.0, 0.0, 0.0)
+    z_basis[flipped] = (0.0, 0.0, 1.0)
+    return x_basis, z_basis
+
+
+def roll_from_axes(y_axes, z_axes):
+    """Bone roll that gives bones pointing along y_axes the Z axes closest to z_axes.
+
+    Like Blender's mat3_vec_to_roll, this is the angle of the wanted Z axis
+    in the zero-roll basis.
+    """
+    x_basis, z_basis = _zero_roll_basis(y_axes)
+    roll = np.arctan2(np.einsum('ij,ij->i', x_basis, z_axes), np.einsum('ij,ij->i', z_basis, z_axes))
+    return roll.astype(np.float32)
+
+
+def axes_from_roll(y_axes, roll):
+    """(x_axes, z_axes) of bones pointing along y_axes with the given rolls"""
+    x_basis, z_basis = _zero_roll_basis(y_axes)
+    cos = np.cos(roll)[:, None]
+    sin = np.sin(roll)[:, None]
+    return x_basis * cos - z_basis * sin, z_basis * cos + x_basis * sin
+
+
+def rest_roll(bones):
+    """Roll of rest bones, recovered from matrix_local"""
+    mats = geometry.read_bone_matrices(bones)
+    return roll_from_axes(mats[:, :3, 1], mats[:, :3, 2])
+
+
+def _build(bones, edit):
+    snap = ArmatureSnapshot()
+    snap.names = [b.name for b in bones]
+    snap.index = {name: i for i, name in enumerate(snap.names)}
+    if edit:
+        snap.heads = _read_vectors(bones, "head")
+        snap.tails = _read_vectors(bones, "tail")
+        snap.roll = np.empty(len(bones), dtype=np.float32)
+        bones.foreach_get("roll", snap.roll)
+    else:
+        snap.heads = _read_vectors(bones, "head_local")
+        snap.tails = _read_vectors(bones, "tail_local")
+        snap.roll = rest_roll(bones) if len(bones) else np.empty(0, dtype=np.float32)
+    # Parents are pointers, which foreach_get cannot read
+    snap.parent = np.array(
+        [snap.index[b.parent.name] if b.parent else -1 for b in bones],
+        dtype=np.int64,
+    )
+    snap.deform = _read_flags(bones, "use_deform")
+    snap.connect = _read_flags(bones, "use_connect")
+    instrumentation.count("armature_snapshots")
+    return snap
+
+
+def snapshot(armature, edit=None):
+    """ArmatureSnapshot of armature's rest bones, or of its edit bones in Edit Mode.
+
+    edit forces one or the other. Rest snapshots are shared between callers
+    and must not be modified.
+    """
+    if edit is None:
+        edit = armature.is_editmode
+    if edit:
+        return _build(armature.edit_bones, True)
+
+    key = armature.as_pointer()
+    version = (selection_cache.data_version(armature), len(armature.bones))
+    hit = _cache.get(key)
+    if hit is not None and hit[0] == version:
+        return hit[1]
+    snap = _build(armature.bones, False)
+    _cache[key] = (version, snap)
+    return snap
+
+
+def invalidate(armature):
+    """Drop the cached snapshot of armature after writing bones without an RNA update"""
+    _cache.pop(armature.as_pointer(), None)
+
+
+def register():
+    bpy.app.handlers.load_post.append(_on_load)
+
+
+def unregister():
+    bpy.app.handlers.load_post.remove(_on_load)
+    _on_load()
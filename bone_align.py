@@ -13,10 +13,37 @@
 
 import bpy
 import bmesh
+import numpy as np
 from mathutils import Vector, Matrix
-from math import atan2
+from mathutils.bvhtree import BVHTree
+from math import atan2, pi
+from . import geometry
+from . import selection_cache
+from . import instrumentation
+from . import edit_session
 
+# Expensive inputs of the last execute, keyed on the selection they were read
+# from. Tweaking options in the Redo panel re-runs execute after an undo;
+# with an unchanged selection the snapshot is reused and only the cheap math
+# is applied again.
+_redo_snapshot = {}
 
+
+def _snapshot(kind, key, compute):
+    hit = _redo_snapshot.get(kind)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    value = compute()
+    _redo_snapshot[kind] = (key, value)
+    return value
+
+
+def _mesh_selection_key(obj):
+    mesh = obj.data
+    return (mesh.as_pointer(), selection_cache.data_version(mesh), len(mesh.polygons), len(mesh.edges))
+
+
+@instrumentation.instrumented
 class ARMATURE_OT_align_bone_to_face(bpy.types.Operator):
     bl_idname = "armature.align_bone_to_face"
     bl_label = "Align Active Bone to Face Normal"
@@ -27,6 +54,16 @@ class ARMATURE_OT_align_bone_to_face(bpy.types.Operator):
     )
     bl_options = {"REGISTER", "UNDO"}
 
+    target: bpy.props.EnumProperty(
+        name="Target",
+        description="Which bones are aligned to which faces",
+        items=[
+            ('ACTIVE', "Active Bone", "Align the active bone to the average of the selected faces"),
+            ('NEAREST', "Each Bone to Nearest Face", "Align every selected bone to its nearest selected face, with roll from the face's longest edge"),
+        ],
+        default='ACTIVE',
+    )
+
     flip_direction: bpy.props.BoolProperty(
         name="Flip Direction",
         description="Point the bone in the opposite direction of the face normal",
@@ -57,7 +94,7 @@ class ARMATURE_OT_align_bone_to_face(bpy.types.Operator):
 
     flip_bone_roll: bpy.props.BoolProperty(
         name="Flip Roll 180°",
-        description="Add 180 degrees to the bone roll (only when Align to Active Edge is enabled)",
+        description="Add 180 degrees to the bone roll set from an edge (Align to Active Edge, or each face's longest edge)",
         default=False,
     )
 
@@ -71,87 +108,221 @@ class ARMATURE_OT_align_bone_to_face(bpy.types.Operator):
 
     def read_selected_face_world(self, obj):
         """Return (centroid_world, normal_world) of the selected faces on obj or None."""
-        ctx = bpy.context
-        prev_active = ctx.view_layer.objects.active
-        prev_mode = ctx.mode
-        
-        # Switch to object mode first to reliably change active
-        if ctx.mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode='OBJECT')
-        
-        ctx.view_layer.objects.active = obj
-        bpy.ops.object.mode_set(mode='EDIT')
-        bm = bmesh.from_edit_mesh(obj.data)
-        faces = [f for f in bm.faces if f.select]
-        
-        if not faces:
-            bpy.ops.object.mode_set(mode='OBJECT')
-            ctx.view_layer.objects.active = prev_active
-            return None
-
-        total_area = 0.0
-        centroid = Vector((0.0, 0.0, 0.0))
-        normal = Vector((0.0, 0.0, 0.0))
-        
-        for f in faces:
-            area = f.calc_area()
-            # Face centroid in object space
-            verts = [v.co for v in f.verts]
-            c = Vector((0.0, 0.0, 0.0))
-            for v in verts:
-                c += v
-            c /= len(verts)
-            centroid += c * area
-            normal += f.normal.copy() * area
-            total_area += area
-
-        if total_area == 0.0:
-            bpy.ops.object.mode_set(mode='OBJECT') 
-            ctx.view_layer.objects.active = prev_active
+        local = _snapshot("face", _mesh_selection_key(obj), lambda: self.read_selected_face_local(obj))
+        if local is None:
             return None
-
-        centroid /= total_area
-        normal = normal.normalized()
+        centroid, normal = local
 
         # Convert to world space
         world_centroid = obj.matrix_world @ centroid
         world_normal = (obj.matrix_world.to_3x3() @ normal).normalized()
 
-        # Return to object mode and restore previous active
-        bpy.ops.object.mode_set(mode='OBJECT')
-        ctx.view_layer.objects.active = prev_active
-        
         return world_centroid, world_normal
 
+    def read_selected_face_local(self, obj):
+        """Return object-space (centroid, normal) of the selected faces on obj or None.
+
+        Reads polygon data directly in Object Mode, so no mode switch or
+        active object change is needed.
+        """
+        polygons = obj.data.polygons
+        count = len(polygons)
+        if count == 0:
+            return None
+
+        selected = np.empty(count, dtype=bool)
+        polygons.foreach_get("select", selected)
+        if not selected.any():
+            return None
+
+        areas = np.empty(count, dtype=np.float32)
+        centers = np.empty(count * 3, dtype=np.float32)
+        normals = np.empty(count * 3, dtype=np.float32)
+        polygons.foreach_get("area", areas)
+        polygons.foreach_get("center", centers)
+        polygons.foreach_get("normal", normals)
+
+        # Area weighted average of the selected faces
+        weights = areas[selected].astype(np.float64)
+        total_area = weights.sum()
+        if total_area == 0.0:
+            return None
+
+        centroid = Vector((weights @ centers.reshape(-1, 3)[selected]) / total_area)
+        normal = Vector(weights @ normals.reshape(-1, 3)[selected]).normalized()
+
+        return centroid, normal
+
     def read_active_edge_world(self, obj):
         """Return world-space direction vector of the active edge or None."""
-        ctx = bpy.context
-        prev_active = ctx.view_layer.objects.active
-        
-        if ctx.mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode='OBJECT')
-        
-        ctx.view_layer.objects.active = obj
-        bpy.ops.object.mode_set(mode='EDIT')
-        bm = bmesh.from_edit_mesh(obj.data)
-        
-        # Get the active edge from selection history
-        active_elem = bm.select_history.active
-        if active_elem is None or not isinstance(active_elem, bmesh.types.BMEdge):
-            bpy.ops.object.mode_set(mode='OBJECT')
-            ctx.view_layer.objects.active = prev_active
+        vec = _snapshot("edge", _mesh_selection_key(obj), lambda: self.read_active_edge_local(obj))
+        if vec is None:
             return None
-        
-        # Calculate world-space direction vector
-        mw3 = obj.matrix_world.to_3x3()
-        v1 = active_elem.verts[0].co
-        v2 = active_elem.verts[1].co
-        vec = (v2 - v1)
-        vec_world = mw3 @ vec
-        
-        bpy.ops.object.mode_set(mode='OBJECT')
-        ctx.view_layer.objects.active = prev_active
-        return vec_world
+        return obj.matrix_world.to_3x3() @ vec
+
+    def read_active_edge_local(self, obj):
+        """Return object-space direction vector of the active edge or None.
+
+        Only the BMesh keeps the selection history. A mesh in Edit Mode already
+        has one; otherwise the whole mesh is copied into a temporary BMesh,
+        which costs time and memory linear in the mesh size. Only called with
+        Align to Active Edge, and the result is kept for redo by the "edge"
+        snapshot.
+        """
+        mesh = obj.data
+        if mesh.is_editmode:
+            bm = bmesh.from_edit_mesh(mesh)
+            owned = False
+        else:
+            bm = bmesh.new()
+            bm.from_mesh(mesh)
+            owned = True
+            instrumentation.count("bmesh_vertices", len(mesh.vertices))
+        try:
+            # Get the active edge from selection history
+            active_elem = bm.select_history.active
+            if active_elem is None or not isinstance(active_elem, bmesh.types.BMEdge):
+                return None
+
+            return active_elem.verts[1].co - active_elem.verts[0].co
+        finally:
+            if owned:
+                bm.free()
+
+    def read_selected_faces_bvh(self, obj, depsgraph):
+        """Return (bvh, centers, normals, long_edges) for the selected faces of obj in world space.
+
+        The tree is built from the evaluated mesh when its topology matches the
+        original, so deformed meshes are hit where they are displayed. Array
+        rows follow the BVH face indices.
+        """
+        mesh = obj.data
+        count = len(mesh.polygons)
+        selected = np.empty(count, dtype=bool)
+        mesh.polygons.foreach_get("select", selected)
+        if not selected.any():
+            return None
+
+        eval_obj = obj.evaluated_get(depsgraph)
+        eval_mesh = eval_obj.to_mesh()
+        try:
+            src = eval_mesh
+            if len(eval_mesh.polygons) != count or len(eval_mesh.vertices) != len(mesh.vertices):
+                src = mesh
+
+            co = np.empty(len(src.vertices) * 3, dtype=np.float64)
+            src.vertices.foreach_get("co", co)
+            loop_verts = np.empty(len(src.loops), dtype=np.int64)
+            src.loops.foreach_get("vertex_index", loop_verts)
+            loop_start = np.empty(count, dtype=np.int64)
+            loop_total = np.empty(count, dtype=np.int64)
+            src.polygons.foreach_get("loop_start", loop_start)
+            src.polygons.foreach_get("loop_total", loop_total)
+            centers = np.empty(count * 3, dtype=np.float64)
+            normals = np.empty(count * 3, dtype=np.float64)
+            src.polygons.foreach_get("center", centers)
+            src.polygons.foreach_get("normal", normals)
+        finally:
+            eval_obj.to_mesh_clear()
+
+        co = geometry.transform_points(obj.matrix_world, co.reshape(-1, 3))
+        centers = geometry.transform_points(obj.matrix_world, centers.reshape(-1, 3)[selected])
+        normals = geometry.transform_directions(obj.matrix_world, normals.reshape(-1, 3)[selected])
+        normals /= np.maximum(np.linalg.norm(normals, axis=1), 1e-12)[:, None]
+
+        # Longest edge of every face: each loop's vertex to the next one in its face
+        face_of_loop = np.repeat(np.arange(count), loop_total)
+        next_loop = np.arange(len(loop_verts)) + 1
+        wrap = next_loop == (loop_start + loop_total)[face_of_loop]
+        next_loop[wrap] = loop_start[face_of_loop[wrap]]
+        edge_vecs = co[loop_verts[next_loop]] - co[loop_verts]
+        edge_lens = np.linalg.norm(edge_vecs, axis=1)
+        order = np.lexsort((-edge_lens, face_of_loop))
+        _, first = np.unique(face_of_loop[order], return_index=True)
+        long_edges = edge_vecs[order[first]][selected]
+
+        face_loops = np.split(loop_verts, loop_start[1:]) if count > 1 else [loop_verts]
+        polys = [face_loops[i].tolist() for i in np.flatnonzero(selected)]
+        bvh = BVHTree.FromPolygons(co.tolist(), polys)
+        return bvh, centers, normals, long_edges
+
+    def roll_axis_from_edge(self, bone_vector, edge_vector):
+        """Return the world-space vector for align_roll given an edge, or None if the edge is parallel to the bone."""
+        edge_vector = edge_vector.normalized()
+        edge_projected = edge_vector - bone_vector * edge_vector.dot(bone_vector)
+        if edge_projected.length < 1e-6:
+            return None
+        edge_projected.normalize()
+        if self.edge_axis == 'X':
+            return -edge_projected
+        return -(bone_vector.cross(edge_projected).normalized())
+
+    def execute_nearest(self, context, armature_obj, mesh_obj):
+        """Align every selected bone to its nearest selected face in one pass."""
+        key = (_mesh_selection_key(mesh_obj), selection_cache.data_version(mesh_obj), tuple(map(tuple, mesh_obj.matrix_world)))
+        faces = _snapshot("bvh", key, lambda: self.read_selected_faces_bvh(mesh_obj, context.evaluated_depsgraph_get()))
+        if faces is None:
+            self.report({'ERROR'}, f"No selected face found on mesh '{mesh_obj.name}'.")
+            return {'CANCELLED'}
+        bvh, centers, normals, long_edges = faces
+
+        arm_mw = armature_obj.matrix_world
+        arm_inv = arm_mw.inverted()
+        arm_inv3 = arm_inv.to_3x3()
+        aligned = 0
+        for bone in armature_obj.data.edit_bones:
+            if not bone.select:
+                continue
+            head_world = arm_mw @ bone.head
+            _, _, index, _ = bvh.find_nearest(head_world)
+            if index is None:
+                continue
+
+            normal = Vector(normals[index])
+            if self.flip_direction:
+                normal = -normal
+            if self.move_to_face:
+                head_world = Vector(centers[index])
+            tail_world = head_world + normal * bone.length
+
+            bone.head = arm_inv @ head_world
+            bone.tail = arm_inv @ tail_world
+            # Each bone takes its roll from its face's longest edge
+            roll_axis = self.roll_axis_from_edge(normal, Vector(long_edges[index]))
+            if roll_axis is not None:
+                bone.align_roll(arm_inv3 @ roll_axis)
+                if self.flip_bone_roll:
+                    bone.roll += pi
+            aligned += 1
+
+        instrumentation.count("bones_touched", aligned)
+        instrumentation.count("rna_writes", aligned * 3)
+        self.report({'INFO'}, f"Aligned {aligned} bones to their nearest faces.")
+        return {'FINISHED'}
+
+    def read_bone_offsets(self, edit_bones, active_bone):
+        """Return the active bone's rest state and the offsets of the other selected bones."""
+        # Store the initial head and tail positions of the active bone
+        active_head_initial = active_bone.head.copy()
+        offsets = {}
+
+        # Store offsets for all selected bones (except the active one)
+        for bone in edit_bones:
+            if bone.select and bone != active_bone:
+                # Store position offsets
+                offsets[bone.name] = {
+                    'head_offset': bone.head - active_head_initial,
+                    'tail_offset': bone.tail - active_head_initial,
+                    'z_axis': bone.z_axis.copy(),  # Store the bone's Z-axis (roll orientation)
+                    'vector': (bone.tail - bone.head).copy(),  # Store the bone's direction vector
+                }
+
+        return {
+            'head': active_head_initial,
+            'tail': active_bone.tail.copy(),
+            'x_axis': active_bone.x_axis.copy(),  # Store active bone's initial X-axis
+            'offsets': offsets,
+        }
 
     @classmethod
     def poll(cls, context):
@@ -175,24 +346,16 @@ class ARMATURE_OT_align_bone_to_face(bpy.types.Operator):
         # 3. Check Bone Selection (Edit Mode)
         # We need at least one selected bone and an active bone
         # Accessing edit_bones is safe because we verified mode is EDIT
-        has_selected = False
-        for b in arm_obj.data.edit_bones:
-            if b.select:
-                has_selected = True
-                break
-        
-        if not has_selected:
-            return False
-        
-        # Check for active bone
         if not arm_obj.data.edit_bones.active:
             return False
+
+        if not selection_cache.has_selected_edit_bones(arm_obj.data):
+            return False
             
         # 4. Check Face Selection (Object Mode)
-        # We need at least one selected face
-        # Accessing polygons.select is safe in Object Mode
-        # usage of any() ensures we stop at the first selected face, avoiding full iteration
-        if not any(p.select for p in mesh_obj.data.polygons):
+        # We need at least one selected face; the result is cached until
+        # the mesh changes, so redraws don't rescan the polygons
+        if not selection_cache.has_selected_faces(mesh_obj.data):
             return False
             
         return True
@@ -209,6 +372,13 @@ class ARMATURE_OT_align_bone_to_face(bpy.types.Operator):
         
         armature_obj = armatures[0]
         mesh_obj = meshes[0]
+
+        # The armature is normally already in Edit Mode (see poll); this only
+        # switches when the operator is called from another context
+        edit_session.ensure_mode(context, armature_obj, 'EDIT')
+
+        if self.target == 'NEAREST':
+            return self.execute_nearest(context, armature_obj, mesh_obj)
         
         # Get the selected face from the mesh
         face_data = self.read_selected_face_world(mesh_obj)
@@ -222,19 +392,9 @@ class ARMATURE_OT_align_bone_to_face(bpy.types.Operator):
         if self.flip_direction:
             face_normal = -face_normal
         
-        # Switch to edit mode on armature to access bones
-        prev_active = context.view_layer.objects.active
-        if context.mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode='OBJECT')
-        
-        context.view_layer.objects.active = armature_obj
-        bpy.ops.object.mode_set(mode='EDIT')
-        
         # Get the active bone
         edit_bones = armature_obj.data.edit_bones
         if not edit_bones.active:
-            bpy.ops.object.mode_set(mode='OBJECT')
-            context.view_layer.objects.active = prev_active
             self.report({'ERROR'}, f"No active bone in armature '{armature_obj.name}'.")
             return {'CANCELLED'}
         
@@ -243,22 +403,13 @@ class ARMATURE_OT_align_bone_to_face(bpy.types.Operator):
         # Store initial state of all selected bones (if move_selected_bones is enabled)
         bone_offsets = {}
         if self.move_selected_bones:
-            # Store the initial head and tail positions of the active bone
-            active_head_initial = active_bone.head.copy()
-            active_tail_initial = active_bone.tail.copy()
-            active_vector_initial = active_tail_initial - active_head_initial
-            active_x_axis_initial = active_bone.x_axis.copy()  # Store active bone's initial X-axis
-            
-            # Store offsets for all selected bones (except the active one)
-            for bone in edit_bones:
-                if bone.select and bone != active_bone:
-                    # Store position offsets
-                    bone_offsets[bone.name] = {
-                        'head_offset': bone.head - active_head_initial,
-                        'tail_offset': bone.tail - active_head_initial,
-                        'z_axis': bone.z_axis.copy(),  # Store the bone's Z-axis (roll orientation)
-                        'vector': (bone.tail - bone.head).copy(),  # Store the bone's direction vector
-                    }
+            # Not kept for redo: any key that proves the offsets are still valid
+            # has to visit the same bones as reading them again
+            initial = self.read_bone_offsets(edit_bones, active_bone)
+            active_head_initial = initial['head']
+            active_vector_initial = initial['tail'] - initial['head']
+            active_x_axis_initial = initial['x_axis']
+            bone_offsets = initial['offsets']
         
         # Always preserve the bone length
         desired_length = (active_bone.tail - active_bone.head).length
@@ -283,14 +434,12 @@ class ARMATURE_OT_align_bone_to_face(bpy.types.Operator):
         # Set head and tail first
         active_bone.head = head_local
         active_bone.tail = tail_local
-        
-        print(f"DEBUG: Bone head/tail set. align_to_edge={self.align_to_edge}")
+        instrumentation.count("bones_touched")
+        instrumentation.count("rna_writes", 2)
                 
         # Calculate and set roll if edge alignment is enabled
         if self.align_to_edge:
-            print("DEBUG: Attempting edge alignment...")
             edge_vector = self.read_active_edge_world(mesh_obj)
-            print(f"DEBUG: Edge vector: {edge_vector}")
             
             if edge_vector is not None:
                 # Normalize the edge vector
@@ -301,7 +450,6 @@ class ARMATURE_OT_align_bone_to_face(bpy.types.Operator):
                 
                 # Project edge vector onto plane perpendicular to bone vector
                 edge_projected = edge_vector - bone_vector * edge_vector.dot(bone_vector)
-                print(f"DEBUG: Edge projected length: {edge_projected.length}")
                 
                 if edge_projected.length >= 1e-6:
                     edge_projected.normalize()
@@ -310,46 +458,22 @@ class ARMATURE_OT_align_bone_to_face(bpy.types.Operator):
                     if self.edge_axis == 'X':
                         # X axis should point along the edge direction (negated to point toward)
                         target_x_world = -edge_projected
-                        print(f"DEBUG: X axis mode - target_x_world: {target_x_world}")
                     else:  # Z axis should point along the edge
                         # Z should point along edge, so X is perpendicular (negated)
                         target_x_world = -(bone_vector.cross(edge_projected).normalized())
-                        print(f"DEBUG: Z axis mode - target_x_world: {target_x_world}")
                     
                     # Use Blender's built-in align_roll method with the target vector
                     # Convert to armature local space
                     target_x_local = armature_matrix_inv.to_3x3() @ target_x_world
-                    print(f"DEBUG: target_x_local: {target_x_local}")
-                    
-                    # Re-establish armature context after reading edge (which switched to mesh)
-                    # This is critical - reading the edge switched active object to mesh
-                    if context.mode != 'OBJECT':
-                        bpy.ops.object.mode_set(mode='OBJECT')
-                    context.view_layer.objects.active = armature_obj
-                    bpy.ops.object.mode_set(mode='EDIT')
-                    
-                    # Re-fetch the bone to ensure we have a valid reference
-                    active_bone = armature_obj.data.edit_bones.active
-                    print(f"DEBUG: Re-fetched active bone: {active_bone}")
                     
                     if active_bone:
-                        print("DEBUG: Calling align_roll...")
                         # align_roll is the safe way - it doesn't trigger the problematic update
                         active_bone.align_roll(target_x_local)
                         
                         # Add 180 degrees if flip is requested
                         if self.flip_bone_roll:
-                            import math
-                            active_bone.roll += math.pi
-                            print(f"DEBUG: Added 180° flip, roll = {active_bone.roll}")
-                        else:
-                            print(f"DEBUG: Roll aligned successfully, roll = {active_bone.roll}")
-                    else:
-                        print("DEBUG: Active bone lost, cannot set roll")
-                else:
-                    print("DEBUG: Edge projected length too small, skipping")
-            else:
-                print("DEBUG: No edge vector found")
+                            active_bone.roll += pi
+                        instrumentation.count("rna_writes")
         
         # Apply the transformation to all other selected bones
         if self.move_selected_bones and bone_offsets:
@@ -359,8 +483,6 @@ class ARMATURE_OT_align_bone_to_face(bpy.types.Operator):
             active_vector_final = active_tail_final - active_head_final
             active_x_axis_final = active_bone.x_axis.copy()  # Get active bone's final X-axis
             
-            from mathutils import Matrix
-            
             # Build the initial and final orientation matrices for the active bone
             # These matrices represent the bone's full 3D orientation (direction + roll)
             
@@ -421,22 +543,11 @@ class ARMATURE_OT_align_bone_to_face(bpy.types.Operator):
                     if z_projected.length > 1e-6:
                         z_projected.normalize()
                         
-                        print(f"DEBUG: Bone {bone_name} - Rotated Z-axis: {rotated_z_axis}")
-                        print(f"DEBUG: Bone {bone_name} - Projected Z-axis: {z_projected}")
-                        print(f"DEBUG: Bone {bone_name} - Roll before: {bone.roll}")
-                        
                         # Use align_roll to set the bone's roll based on the projected Z-axis
                         bone.align_roll(z_projected)
-                        
-                        print(f"DEBUG: Bone {bone_name} - Roll after: {bone.roll}")
+                    instrumentation.count("bones_touched")
+                    instrumentation.count("rna_writes", 3)
 
-        # Restore Edit Mode on the Armature to preserve Redo panel context
-        if context.mode != 'OBJECT':
-             bpy.ops.object.mode_set(mode='OBJECT')
-        
-        context.view_layer.objects.active = armature_obj
-        bpy.ops.object.mode_set(mode='EDIT')
-        
         return {'FINISHED'}
 
 
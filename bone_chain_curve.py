@@ -0,0 +1,305 @@
+import bpy
+import numpy as np
+from . import geometry
+from . import instrumentation
+from . import armature_snapshot
+
+
+def _read_points(points, attr, size):
+    flat = np.empty(len(points) * size, dtype=np.float64)
+    points.foreach_get(attr, flat)
+    return flat.reshape(-1, size) if size > 1 else flat
+
+
+def sample_bezier(spline, resolution):
+    """Dense (points, tilts) along a Bezier spline, in curve space"""
+    bp = spline.bezier_points
+    co = _read_points(bp, "co", 3)
+    left = _read_points(bp, "handle_left", 3)
+    right = _read_points(bp, "handle_right", 3)
+    tilt = _read_points(bp, "tilt", 1)
+
+    start = np.arange(len(bp) if spline.use_cyclic_u else len(bp) - 1)
+    end = (start + 1) % len(bp)
+    t = np.linspace(0.0, 1.0, resolution, endpoint=False)[None, :, None]
+    s = 1.0 - t
+    p0, p1, p2, p3 = (a[:, None, :] for a in (co[start], right[start], left[end], co[end]))
+    points = s * s * s * p0 + 3.0 * s * s * t * p1 + 3.0 * s * t * t * p2 + t * t * t * p3
+    tilts = tilt[start, None] * s[..., 0] + tilt[end, None] * t[..., 0]
+
+    points = np.concatenate([points.reshape(-1, 3), co[end[-1:]]])
+    tilts = np.concatenate([tilts.reshape(-1), tilt[end[-1:]]])
+    return points, tilts
+
+
+def nurbs_basis(knots, order, u):
+    """Cox-de Boor B-spline basis of the given order at parameters u, as (len(u), n)"""
+    u = u[:, None]
+    basis = ((knots[:-1] <= u) & (u < knots[1:])).astype(np.float64)
+    for p in range(1, order):
+        left_den = knots[p:-1] - knots[:-p - 1]
+        right_den = knots[p + 1:] - knots[1:-p]
+        left = np.divide(u - knots[:-p - 1], left_den, out=np.zeros((len(u), len(left_den))), where=left_den > 0)
+        right = np.divide(knots[p + 1:] - u, right_den, out=np.zeros((len(u), len(right_den))), where=right_den > 0)
+        basis = left * basis[:, :-1] + right * basis[:, 1:]
+    return basis
+
+
+def sample_nurbs(spline, resolution):
+    """Dense (points, tilts) along a NURBS or poly spline, in curve space.
+
+    Uniform and endpoint knot vectors are evaluated exactly; cyclic splines
+    wrap their first order - 1 points, the standard periodic construction.
+    """
+    pts = spline.points
+    cw = _read_points(pts, "co", 4)
+    tilt = _read_points(pts, "tilt", 1)
+    if spline.type == 'POLY':
+        if spline.use_cyclic_u:
+            return np.concatenate([cw[:, :3], cw[:1, :3]]), np.concatenate([tilt, tilt[:1]])
+        return cw[:, :3], tilt
+
+    order = min(spline.order_u, len(pts))
+    if spline.use_cyclic_u:
+        cw = np.concatenate([cw, cw[:order - 1]])
+        tilt = np.concatenate([tilt, tilt[:order - 1]])
+    n = len(cw)
+    if spline.use_endpoint_u and not spline.use_cyclic_u:
+        knots = np.concatenate([np.zeros(order), np.arange(1, n - order + 1), np.full(order, n - order + 1)])
+    else:
+        knots = np.arange(n + order, dtype=np.float64)
+    lo, hi = knots[order - 1], knots[n]
+    u = np.linspace(lo, hi, resolution * max(n - order + 1, 1) + 1)
+    u[-1] = hi - (hi - lo) * 1e-9
+
+    weighted = nurbs_basis(knots.astype(np.float64), order, u) * cw[:, 3]
+    weighted /= np.maximum(weighted.sum(axis=1), 1e-12)[:, None]
+    return weighted @ cw[:, :3], weighted @ tilt
+
+
+def arc_length_table(points):
+    """Cumulative arc length at every sample of a polyline"""
+    return np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(points, axis=0), axis=1))])
+
+
+def resample(points, values, table, stations):
+    """Points and values at the given arc lengths, by binary search in the table"""
+    idx = np.clip(np.searchsorted(table, stations, side='right') - 1, 0, len(table) - 2)
+    span = table[idx + 1] - table[idx]
+    t = np.divide(stations - table[idx], span, out=np.zeros_like(stations), where=span > 0)
+    return (points[idx] + (points[idx + 1] - points[idx]) * t[:, None],
+            values[idx] + (values[idx + 1] - values[idx]) * t)
+
+
+def transported_normals(directions, first_normal):
+    """Rotation-minimizing normals along a chain of unit directions.
+
+    Each step applies the smallest rotation taking one direction to the next,
+    built from two reflections, so the normals don't twist around the chain.
+    """
+    normals = np.empty_like(directions)
+    normals[0] = first_normal
+    for i in range(1, len(directions)):
+        a = directions[i - 1]
+        b = directions[i]
+        r = normals[i - 1]
+        w = a + b
+        c = w @ w
+        if c > 1e-12:
+            r = r - (2.0 / c) * (w @ r) * w
+            r = r - 2.0 * (b @ r) * b
+        normals[i] = r - (r @ b) * b
+        normals[i] /= max(np.linalg.norm(normals[i]), 1e-12)
+    return normals
+
+
+def rotate_about(vectors, axes, angles):
+    """Rotate vectors about unit axes by angles (Rodrigues), row by row"""
+    cos = np.cos(angles)[:, None]
+    sin = np.sin(angles)[:, None]
+    dot = np.einsum('ij,ij->i', axes, vectors)[:, None]
+    return vectors * cos + np.cross(axes, vectors) * sin + axes * dot * (1.0 - cos)
+
+
+@instrumentation.instrumented
+class ARMATURE_OT_fit_chain_to_curve(bpy.types.Operator):
+    bl_idname = "armature.fit_chain_to_curve"
+    bl_label = "Fit Bone Chain to Curve"
+    bl_description = (
+        "Place the selected bone chain along a curve object, spacing joints by arc length. "
+        "Rolls follow the curve's normals and tilt."
+    )
+    bl_options = {"REGISTER", "UNDO"}
+
+    curve_name: bpy.props.StringProperty(
+        name="Curve",
+        description="Curve object to fit the chain to (defaults to a selected curve)",
+        default="",
+    )
+
+    spacing: bpy.props.EnumProperty(
+        name="Spacing",
+        items=[
+            ('EQUAL', "Equal Length", "Every bone gets the same length"),
+            ('RATIO', "Keep Ratios", "Keep the original length ratios between the bones"),
+        ],
+        default='RATIO',
+    )
+
+    reverse: bpy.props.BoolProperty(
+        name="Reverse Curve",
+        description="Start the chain at the end of the curve",
+        default=False,
+    )
+
+    roll_axis: bpy.props.EnumProperty(
+        name="Normal Axis",
+        description="Bone axis that follows the curve normal",
+        items=[
+            ('Z', "Z Axis", "Bone Z axis follows the curve normal"),
+            ('X', "X Axis", "Bone X axis follows the curve normal"),
+            ('NONE', "Keep Roll", "Don't change the bone rolls"),
+        ],
+        default='Z',
+    )
+
+    resolution: bpy.props.IntProperty(
+        name="Samples per Segment",
+        description="Curve samples per segment used for the arc-length table",
+        default=64,
+        min=4,
+        max=1024,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'EDIT_ARMATURE'
+
+    def invoke(self, context, event):
+        if not self.curve_name:
+            curve = next((o for o in context.selected_objects if o.type == 'CURVE'), None)
+            if curve:
+                self.curve_name = curve.name
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop_search(self, "curve_name", bpy.data, "objects")
+        layout.prop(self, "spacing", expand=True)
+        layout.prop(self, "roll_axis")
+        layout.prop(self, "reverse")
+        layout.prop(self, "resolution")
+
+    def execute(self, context):
+        obj = context.edit_object
+        curve_obj = bpy.data.objects.get(self.curve_name)
+        if not curve_obj or curve_obj.type != 'CURVE':
+            self.report({'ERROR'}, "Choose a curve object to fit to.")
+            return {'CANCELLED'}
+        splines = [s for s in curve_obj.data.splines
+                   if len(s.bezier_points if s.type == 'BEZIER' else s.points) > 1]
+        if not splines:
+            self.report({'ERROR'}, f"Curve '{curve_obj.name}' has no spline with two or more points.")
+            return {'CANCELLED'}
+
+        arm = obj.data
+        edit_bones = arm.edit_bones
+        snap = armature_snapshot.snapshot(arm, edit=True)
+        selected = np.empty(len(edit_bones), dtype=bool)
+        edit_bones.foreach_get("select", selected)
+        chains = snap.chains(selected)
+        if len(chains) != 1:
+            self.report({'ERROR'}, "Select a single unbranched bone chain.")
+            return {'CANCELLED'}
+        rows = chains[0]
+
+        # Dense samples of the first spline in armature space
+        spline = splines[0]
+        if spline.type == 'BEZIER':
+            points, tilts = sample_bezier(spline, self.resolution)
+        else:
+            points, tilts = sample_nurbs(spline, self.resolution)
+        if self.reverse:
+            points, tilts = points[::-1], tilts[::-1]
+        to_armature = np.linalg.inv(geometry.matrix_to_array(obj.matrix_world)) @ geometry.matrix_to_array(curve_obj.matrix_world)
+        points = geometry.transform_points(to_armature, points)
+
+        table = arc_length_table(points)
+        if table[-1] <= 0.0:
+            self.report({'ERROR'}, "Curve has zero length.")
+            return {'CANCELLED'}
+
+        # Joint stations along the curve
+        if self.spacing == 'EQUAL':
+            fractions = np.linspace(0.0, 1.0, len(rows) + 1)
+        else:
+            lengths = np.linalg.norm(snap.tails[rows] - snap.heads[rows], axis=1).astype(np.float64)
+            total = lengths.sum()
+            cumulative = np.cumsum(lengths) / total if total > 0.0 else np.arange(1, len(rows) + 1) / len(rows)
+            fractions = np.concatenate([[0.0], cumulative])
+        joints, joint_tilts = resample(points, tilts, table, fractions * table[-1])
+
+        heads = snap.heads.astype(np.float64)
+        tails = snap.tails.astype(np.float64)
+        heads[rows] = joints[:-1]
+        tails[rows] = joints[1:]
+        # The root leaves its parent's tail, so it can no longer be connected
+        root = rows[0]
+        detached = bool(snap.connect[root] and snap.parent[root] >= 0)
+        if detached:
+            edit_bones[snap.names[root]].use_connect = False
+        # Connected children outside the chain keep their heads on the moved tails
+        moved = np.zeros(len(snap), dtype=bool)
+        moved[rows] = True
+        has_parent = snap.parent >= 0
+        follow = np.flatnonzero(snap.connect & has_parent & ~moved)
+        follow = follow[moved[snap.parent[follow]]]
+        heads[follow] = tails[snap.parent[follow]]
+        edit_bones.foreach_set("head", heads.astype(np.float32).ravel())
+        edit_bones.foreach_set("tail", tails.astype(np.float32).ravel())
+
+        if self.roll_axis != 'NONE':
+            directions = joints[1:] - joints[:-1]
+            directions /= np.maximum(np.linalg.norm(directions, axis=1), 1e-12)[:, None]
+
+            # Start from the curve's up axis, like Blender's minimum-twist normals
+            up = geometry.transform_directions(to_armature, np.array([[0.0, 0.0, 1.0]]))[0]
+            first = up - (up @ directions[0]) * directions[0]
+            if np.linalg.norm(first) < 1e-6:
+                first = np.cross(directions[0], (1.0, 0.0, 0.0))
+            first /= np.linalg.norm(first)
+
+            normals = transported_normals(directions, first)
+            bone_tilts = (joint_tilts[:-1] + joint_tilts[1:]) * 0.5
+            normals = rotate_about(normals, directions, bone_tilts)
+            if self.roll_axis == 'X':
+                # Z axis such that X = Y x Z lands on the normal
+                normals = np.cross(normals, directions)
+
+            roll = snap.roll.copy()
+            roll[rows] = armature_snapshot.roll_from_axes(directions, normals)
+            edit_bones.foreach_set("roll", roll)
+
+        arm.update_tag()
+        instrumentation.count("bones_touched", len(rows))
+        instrumentation.count("rna_writes", len(snap) * (2 if self.roll_axis == 'NONE' else 3))
+        message = f"Fitted {len(rows)} bones to '{curve_obj.name}' ({table[-1]:.3f} long)"
+        if detached:
+            self.report({'WARNING'}, f"{message}; disconnected '{snap.names[root]}' from its parent")
+        else:
+            self.report({'INFO'}, message)
+        return {'FINISHED'}
+
+
+def menu_func(self, context):
+    self.layout.operator(ARMATURE_OT_fit_chain_to_curve.bl_idname, icon='CURVE_DATA')
+
+
+def register():
+    bpy.utils.register_class(ARMATURE_OT_fit_chain_to_curve)
+    bpy.types.VIEW3D_MT_edit_armature.append(menu_func)
+
+
+def unregister():
+    bpy.types.VIEW3D_MT_edit_armature.remove(menu_func)
+    bpy.utils.unregister_class(ARMATURE_OT_fit_chain_to_curve)
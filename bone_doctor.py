@@ -1,6 +1,33 @@
+import re
 import bpy
 from bpy.props import BoolProperty
+import numpy as np
+from . import instrumentation
+from . import armature_snapshot
+from . import bulk_rename
 
+# Map of lowercase symmetry suffix to proper capitalization
+SYMMETRY_SUFFIXES = {
+    'l': 'L',
+    'r': 'R',
+    'top': 'Top',
+    'bot': 'Bot',
+    'fr': 'Fr',
+    'bk': 'Bk'
+}
+# A period or underscore followed by a symmetry suffix at the end of a name
+SYMMETRY_PATTERN = re.compile(r'[._](l|r|top|bot|fr|bk)$', re.IGNORECASE)
+
+
+def clean_symmetry_name(name):
+    """name with its symmetry suffix written as a period and proper capitalization ('arm_l' -> 'arm.L')"""
+    match = SYMMETRY_PATTERN.search(name)
+    if not match:
+        return name
+    return name[:match.start()] + '.' + SYMMETRY_SUFFIXES[match.group(1).lower()]
+
+
+@instrumentation.instrumented
 class ARMATURE_OT_bone_doctor(bpy.types.Operator):
     """Bone Doctor: Perform various cleanup tasks on the armature"""
     bl_idname = "armature.bone_doctor"
@@ -110,14 +137,14 @@ class ARMATURE_OT_bone_doctor(bpy.types.Operator):
                 
                 # Switch to object mode to apply transforms
                 if original_mode != 'OBJECT':
-                    bpy.ops.object.mode_set(mode='OBJECT')
+                    instrumentation.mode_set(mode='OBJECT')
                 
                 # Apply transforms
                 bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)
                 
                 # Restore original mode
                 if original_mode != 'OBJECT':
-                    bpy.ops.object.mode_set(mode=original_mode)
+                    instrumentation.mode_set(mode=original_mode)
 
         # 1. Identify IK Targets
         ik_targets = set()
@@ -152,23 +179,31 @@ class ARMATURE_OT_bone_doctor(bpy.types.Operator):
             ctrl_collection = arm_data.collections.get("CTRL")
             if not ctrl_collection:
                 ctrl_collection = arm_data.collections.new("CTRL")
-            
-        for bone in arm_data.bones:
-            # Task: IK Targets have use_deform unchecked
-            if self.disable_deform_on_ik_targets:
-                if bone.name in ik_targets:
-                    bone.use_deform = False
 
-            # Task: Bones that do not start with DEF_ have use_deform unchecked
-            if self.disable_deform_on_non_def:
-                if not bone.name.startswith("DEF_"):
-                    bone.use_deform = False
+        # Deform flags for every bone at once, written back in a single call
+        snap = armature_snapshot.snapshot(arm_data, edit=False)
+        is_def = np.array([name.startswith("DEF_") for name in snap.names], dtype=bool)
+        deform = snap.deform.copy()
 
-            # Task: Bones that start DEF_ have use_deform checked
-            if self.enable_deform_on_def:
-                if bone.name.startswith("DEF_"):
-                    bone.use_deform = True
+        # Task: IK Targets have use_deform unchecked
+        if self.disable_deform_on_ik_targets:
+            deform[[snap.index[name] for name in ik_targets if name in snap.index]] = False
 
+        # Task: Bones that do not start with DEF_ have use_deform unchecked
+        if self.disable_deform_on_non_def:
+            deform[~is_def] = False
+
+        # Task: Bones that start DEF_ have use_deform checked
+        if self.enable_deform_on_def:
+            deform[is_def] = True
+
+        if not np.array_equal(deform, snap.deform):
+            arm_data.bones.foreach_set("use_deform", deform)
+            arm_data.update_tag()
+            armature_snapshot.invalidate(arm_data)
+            instrumentation.count("rna_writes", len(deform))
+
+        for bone in arm_data.bones:
             # Task: Move DEF bones to 'DEF' collection
             if self.move_def_to_collection and bone.name.startswith("DEF_"):
                 # Assign to DEF collection
@@ -200,25 +235,15 @@ class ARMATURE_OT_bone_doctor(bpy.types.Operator):
                         col.unassign(bone)
         # Task: Clean symmetry naming
         if self.clean_symmetry_names:
-            # Map of lowercase suffix to proper capitalization
-            suffix_map = {
-                'l': 'L',
-                'r': 'R',
-                'top': 'Top',
-                'bot': 'Bot',
-                'fr': 'Fr',
-                'bk': 'Bk'
-            }
-            
+            symmetry_renames = {}
             for bone in arm_data.bones:
-                # Check if bone ends with period or underscore followed by a symmetry suffix
-                match = re.search(r'[._](l|r|top|bot|fr|bk)$', bone.name, re.IGNORECASE)
-                if match:
-                    suffix_lower = match.group(1).lower()
-                    if suffix_lower in suffix_map:
-                        # Replace with period and proper capitalization
-                        new_name = bone.name[:match.start()] + '.' + suffix_map[suffix_lower]
-                        bone.name = new_name
+                new_name = clean_symmetry_name(bone.name)
+                if new_name != bone.name:
+                    symmetry_renames[bone.name] = new_name
+            # All at once, so 'arm_l' -> 'arm.L' cannot collide with a bone still waiting to be renamed
+            _, skipped, _ = bulk_rename.rename_bones(arm_obj, symmetry_renames)
+            for old, reason in skipped.items():
+                self.report({'WARNING'}, f"'{old}' was not renamed: {reason}")
 
         # Task: Generate Report
         if self.generate_report:
@@ -380,14 +405,15 @@ class ARMATURE_OT_bone_doctor(bpy.types.Operator):
                 report_lines.append("")
             
             # Other Checks: Multiple root bones
-            root_bones = [bone for bone in arm_data.bones if not bone.parent]
+            snap = armature_snapshot.snapshot(arm_data, edit=False)
+            root_bones = [snap.names[i] for i in snap.roots()]
             if len(root_bones) > 1:
                 warnings_found = True
                 report_lines.append("- OTHER CHECKS:")
                 report_lines.append("- ARMATURE DOES NOT HAVE A SINGLE ROOT BONE:")
                 report_lines.append(f"   Found {len(root_bones)} root bones:")
-                for bone in root_bones:
-                    report_lines.append(f"   - {bone.name}")
+                for bone_name in root_bones:
+                    report_lines.append(f"   - {bone_name}")
                 report_lines.append("")
             
             # Other Checks: All bones in default "Bones" collection
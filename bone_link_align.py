@@ -1,11 +1,49 @@
 import bpy
+import numpy as np
+from . import geometry
+from . import instrumentation
+from . import armature_snapshot
 
 
+def connected_descendants(indptr, children, connect, sources):
+    """Mask of bones reachable from sources through connected children, sources excluded"""
+    reached = np.zeros(len(connect), dtype=bool)
+    frontier = np.asarray(sources, dtype=np.int64)
+    while len(frontier):
+        kids = geometry.gather_neighbors(indptr, children, frontier)
+        kids = kids[connect[kids] & ~reached[kids]]
+        reached[kids] = True
+        frontier = kids
+    return reached
+
+
+def fit_planes(points, labels, count):
+    """Best-fit plane through each labelled group of points, all groups at once.
+
+    Returns (centroids, axes, spread): axes[:, k] are the principal directions
+    of every group's centred points, largest spread first, so axes[:, 2] is
+    the plane normal and axes[:, 0] the direction along a straight group.
+    spread holds the matching singular values as (count, 3).
+    """
+    sizes = np.maximum(np.bincount(labels, minlength=count), 1)
+    centroids = np.stack(
+        [np.bincount(labels, weights=points[:, i], minlength=count) for i in range(3)],
+        axis=1,
+    ) / sizes[:, None]
+    centred = points - centroids[labels]
+    scatter = np.zeros((count, 3, 3))
+    np.add.at(scatter, labels, centred[:, :, None] * centred[:, None, :])
+    # Stacked SVD of the 3x3 scatter matrices: one LAPACK call for every group
+    _, spread, vt = np.linalg.svd(scatter)
+    return centroids, vt, spread
+
+
+@instrumentation.instrumented
 class ARMATURE_OT_align_connected_children(bpy.types.Operator):
     bl_idname = "armature.align_connected_children"
     bl_label = "Align Connected Bone Children"
     bl_description = (
-        "Align all connected child bones (down the tree) to the direction of the selected bone, "
+        "Align all connected child bones (down the tree) to the direction of each selected bone, "
         "preserving original bone lengths. Optionally copy the roll of the selected bone."
     )
     bl_options = {"REGISTER", "UNDO"}
@@ -33,70 +71,237 @@ class ARMATURE_OT_align_connected_children(bpy.types.Operator):
 
         arm = obj.data
         edit_bones = arm.edit_bones
-        selected = [b for b in edit_bones if b.select]
-        if len(selected) != 1:
-            self.report({'ERROR'}, "Select exactly one bone in Edit Mode.")
+        snap = armature_snapshot.snapshot(arm, edit=True)
+        selected = np.empty(len(edit_bones), dtype=bool)
+        edit_bones.foreach_get("select", selected)
+        if not selected.any():
+            self.report({'ERROR'}, "Select at least one bone in Edit Mode.")
             return {'CANCELLED'}
 
-        root = selected[0]
-        direction = root.tail - root.head
-        if direction.length == 0.0:
+        heads = snap.heads.astype(np.float64)
+        tails = snap.tails.astype(np.float64)
+        roll = snap.roll.copy()
+        # Original lengths, read before anything moves
+        lengths = np.linalg.norm(tails - heads, axis=1)
+        indptr, children = snap.children()
+
+        # A selected bone inside another selected bone's connected chain
+        # follows that bone rather than starting a chain of its own
+        inside = connected_descendants(indptr, children, snap.connect, np.flatnonzero(selected))
+        roots = np.flatnonzero(selected & ~inside)
+        flat = lengths[roots] == 0.0
+        roots = roots[~flat]
+        if not len(roots):
             self.report({'ERROR'}, "Selected bone has zero length; cannot determine direction.")
             return {'CANCELLED'}
-        direction = direction.normalized()
+        directions = (tails[roots] - heads[roots]) / lengths[roots, None]
+
+        # Walk every chain at once, one tree level per step, so long chains
+        # cost one vectorized step per bone depth and no recursion
+        owner = np.full(len(snap), -1, dtype=np.int64)
+        owner[roots] = np.arange(len(roots))
+        frontier = roots
+        moved = 0
+        while len(frontier):
+            kids = geometry.gather_neighbors(indptr, children, frontier)
+            # stop a branch at the first child that is not connected
+            kids = kids[snap.connect[kids]]
+            parents = snap.parent[kids]
+            owner[kids] = owner[parents]
+
+            # determine which length to use
+            if self.copy_length:
+                target_len = lengths[roots[owner[kids]]]
+            else:
+                target_len = lengths[kids]
+
+            # head sits at parent.tail, tail runs along the root direction
+            heads[kids] = tails[parents]
+            tails[kids] = heads[kids] + directions[owner[kids]] * target_len[:, None]
+            if self.copy_roll:
+                roll[kids] = roll[roots[owner[kids]]]
+
+            moved += len(kids)
+            frontier = kids
+
+        # One write per attribute for the whole armature
+        edit_bones.foreach_set("head", heads.astype(np.float32).ravel())
+        edit_bones.foreach_set("tail", tails.astype(np.float32).ravel())
+        if self.copy_roll:
+            edit_bones.foreach_set("roll", roll)
+        arm.update_tag()
+        instrumentation.count("bones_touched", moved)
+        instrumentation.count("rna_writes", len(snap) * (3 if self.copy_roll else 2))
+
+        if flat.any():
+            self.report({'WARNING'}, f"Skipped {int(flat.sum())} zero-length selected bones")
+        return {'FINISHED'}
+
+
+@instrumentation.instrumented
+class ARMATURE_OT_fit_chain_plane(bpy.types.Operator):
+    bl_idname = "armature.fit_chain_plane"
+    bl_label = "Fit Bone Chains to Plane"
+    bl_description = (
+        "Fit a best-fit plane to every selected bone chain, optionally flatten the joints onto it "
+        "and give all bones of a chain a consistent roll from the plane normal"
+    )
+    bl_options = {"REGISTER", "UNDO"}
+
+    project: bpy.props.BoolProperty(
+        name="Flatten Joints",
+        description="Move the joints of each chain onto its plane",
+        default=True,
+    )
+
+    roll_axis: bpy.props.EnumProperty(
+        name="Normal Axis",
+        description="Bone axis that follows the plane normal",
+        items=[
+            ('X', "X Axis", "Bone X axis follows the plane normal (the bend axis of a planar IK chain)"),
+            ('Z', "Z Axis", "Bone Z axis follows the plane normal"),
+            ('NONE', "Keep Roll", "Don't change the bone rolls"),
+        ],
+        default='X',
+    )
+
+    flip: bpy.props.BoolProperty(
+        name="Flip Normal",
+        description="Point the normal axis the other way",
+        default=False,
+    )
+
+    def execute(self, context):
+        obj = context.active_object
+        if not obj or obj.type != 'ARMATURE':
+            self.report({'ERROR'}, "Active object must be an armature in Edit Mode.")
+            return {'CANCELLED'}
+        if context.mode != 'EDIT_ARMATURE':
+            self.report({'ERROR'}, "Operator must be run in Armature Edit Mode.")
+            return {'CANCELLED'}
+
+        arm = obj.data
+        edit_bones = arm.edit_bones
+        snap = armature_snapshot.snapshot(arm, edit=True)
+        selected = np.empty(len(edit_bones), dtype=bool)
+        edit_bones.foreach_get("select", selected)
+        chains = [c for c in snap.chains(selected) if len(c) > 1]
+        if not chains:
+            self.report({'ERROR'}, "Select one or more chains of at least two bones.")
+            return {'CANCELLED'}
+
+        # Every chain's bones in one flat array, labelled by chain
+        rows = np.concatenate(chains)
+        chain_of = np.repeat(np.arange(len(chains)), [len(c) for c in chains])
+        heads = snap.heads.astype(np.float64)
+        tails = snap.tails.astype(np.float64)
 
-        # Pre-collect original lengths for all connected descendants so modifications
-        # don't affect length readings for deeper bones.
-        orig_lengths = {}
-        root_length = root.length
+        # Fit to the heads and tails of the bones
+        points = np.concatenate([heads[rows], tails[rows]])
+        labels = np.concatenate([chain_of, chain_of])
+        centroids, axes, spread = fit_planes(points, labels, len(chains))
+        normals = axes[:, 2].copy()
 
-        def collect_lengths(parent):
-            for child in parent.children:
-                if not child.use_connect:
-                    continue
-                orig_lengths[child.name] = child.length
-                collect_lengths(child)
+        # Current axis the normal replaces, averaged per chain
+        y_axes = tails[rows] - heads[rows]
+        valid = np.linalg.norm(y_axes, axis=1) > 1e-9
+        x_axes, z_axes = armature_snapshot.axes_from_roll(y_axes, snap.roll[rows].astype(np.float64))
+        current = z_axes if self.roll_axis == 'Z' else x_axes
+        current = np.where(valid[:, None], current, 0.0)
+        reference = np.zeros((len(chains), 3))
+        np.add.at(reference, chain_of, current)
 
-        collect_lengths(root)
+        # Straight chains have no plane: keep their current axis, made perpendicular to the chain
+        straight = spread[:, 1] <= 1e-8 * np.maximum(spread[:, 0], 1e-30)
+        if straight.any():
+            along = axes[straight, 0]
+            fallback = reference[straight] - np.einsum('ij,ij->i', reference[straight], along)[:, None] * along
+            length = np.linalg.norm(fallback, axis=1)
+            keep = length > 1e-9
+            normals[np.flatnonzero(straight)[keep]] = fallback[keep] / length[keep, None]
 
-        def recurse(parent):
-            for child in parent.children:
-                # stop this branch if child is not connected
-                if not child.use_connect:
-                    continue
+        # Orient each normal like the bones' current axis so rolls change as little as possible
+        sign = np.where(np.einsum('ij,ij->i', normals, reference) < 0.0, -1.0, 1.0)
+        if self.flip:
+            sign = -sign
+        normals *= sign[:, None]
 
-                # determine which length to use
-                if self.copy_length:
-                    target_len = root_length
-                else:
-                    # get preserved original length from pre-collected values
-                    target_len = orig_lengths.get(child.name, child.length)
+        # Deviation from the plane, per chain
+        offsets = np.einsum('ij,ij->i', points - centroids[labels], normals[labels])
+        worst = np.zeros(len(chains))
+        np.maximum.at(worst, labels, np.abs(offsets))
+        rms = np.sqrt(np.bincount(labels, weights=offsets * offsets, minlength=len(chains))
+                      / np.bincount(labels, minlength=len(chains)))
+        worst[straight] = 0.0
+        rms[straight] = 0.0
 
-                # ensure head sits at parent.tail
-                child.head = parent.tail.copy()
+        root_offsets = np.full(len(chains), np.nan)
+        if self.project:
+            flattened = points - offsets[:, None] * normals[labels]
+            heads[rows] = flattened[:len(rows)]
+            tails[rows] = flattened[len(rows):]
+            # Connected children outside the chains keep their heads on the moved tails
+            moved = np.zeros(len(snap), dtype=bool)
+            moved[rows] = True
+            has_parent = snap.parent >= 0
+            follow = np.flatnonzero(snap.connect & has_parent & ~moved)
+            follow = follow[moved[snap.parent[follow]]]
+            heads[follow] = tails[snap.parent[follow]]
+            # Connected chain roots stay on their parent's tail, moved or not
+            roots = np.array([c[0] for c in chains])
+            pinned = np.flatnonzero(snap.connect[roots] & has_parent[roots])
+            heads[roots[pinned]] = tails[snap.parent[roots[pinned]]]
+            root_offsets[pinned] = np.abs(np.einsum(
+                'ij,ij->i', heads[roots[pinned]] - centroids[pinned], normals[pinned]))
+            edit_bones.foreach_set("head", heads.astype(np.float32).ravel())
+            edit_bones.foreach_set("tail", tails.astype(np.float32).ravel())
 
-                # set tail along direction using target length
-                child.tail = child.head + direction * target_len
+        if self.roll_axis != 'NONE':
+            y_axes = tails[rows] - heads[rows]
+            valid = np.linalg.norm(y_axes, axis=1) > 1e-9
+            targets = normals[chain_of]
+            if self.roll_axis == 'X':
+                # Z axis such that X = Y x Z lands on the normal
+                targets = np.cross(targets, y_axes)
+            roll = snap.roll.copy()
+            roll[rows[valid]] = armature_snapshot.roll_from_axes(y_axes[valid], targets[valid])
+            edit_bones.foreach_set("roll", roll)
 
-                if self.copy_roll:
-                    child.roll = root.roll
+        arm.update_tag()
+        instrumentation.count("bones_touched", len(rows))
+        instrumentation.count("rna_writes", len(snap) * ((2 if self.project else 0) + (self.roll_axis != 'NONE')))
 
-                # recurse into children of this child
-                recurse(child)
+        report_lines = [f"Plane fit for {obj.name}", "", "Chain root, bones, max deviation, RMS deviation"]
+        for i, chain in enumerate(chains):
+            note = "  (straight, no plane)" if straight[i] else ""
+            if not np.isnan(root_offsets[i]):
+                note += f"  (root head kept on parent tail, {root_offsets[i]:.6f} off the plane)"
+            report_lines.append(f"{snap.names[chain[0]]}, {len(chain)}, {worst[i]:.6f}, {rms[i]:.6f}{note}")
+        report_name = f"{obj.name}_Plane_Fit"
+        text_block = bpy.data.texts.get(report_name) or bpy.data.texts.new(report_name)
+        text_block.clear()
+        text_block.write("\n".join(report_lines))
 
-        recurse(root)
+        verb = "Flattened" if self.project else "Measured"
+        self.report(
+            {'INFO'},
+            f"{verb} {len(chains)} chains ({len(rows)} bones), max deviation {worst.max():.5f}; "
+            f"details in text block: {report_name}",
+        )
         return {'FINISHED'}
 
 
 def draw(self, context):
     self.layout.separator()
     self.layout.operator(ARMATURE_OT_align_connected_children.bl_idname)
+    self.layout.operator(ARMATURE_OT_fit_chain_plane.bl_idname)
 
 
 def register():
     bpy.utils.register_class(ARMATURE_OT_align_connected_children)
-    
+    bpy.utils.register_class(ARMATURE_OT_fit_chain_plane)
 
 
 def unregister():
+    bpy.utils.unregister_class(ARMATURE_OT_fit_chain_plane)
     bpy.utils.unregister_class(ARMATURE_OT_align_connected_children)
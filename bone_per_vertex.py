@@ -1,8 +1,11 @@
 import bpy  # type: ignore
 import bmesh  # type: ignore
 from mathutils import Vector, Matrix  # type: ignore
+from . import instrumentation
+from . import edit_session
 
 
+@instrumentation.instrumented
 class MESH_OT_johnnygizmo_bone_per_vertex(bpy.types.Operator):
     bl_idname = "mesh.johnnygizmo_bone_per_vertex"
     bl_label = "Create Bone Per Vertex"
@@ -127,44 +130,35 @@ class MESH_OT_johnnygizmo_bone_per_vertex(bpy.types.Operator):
                 }
                 return axis_map[direction_key]
 
-        # Switch to object mode to modify armature
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-        # Change to armature edit mode
-        context.view_layer.objects.active = armature_obj
-        bpy.ops.object.mode_set(mode='EDIT')
-
-        # Get armature data
-        armature_data = armature_obj.data
-        edit_bones = armature_data.edit_bones
-
-        # Deselect all bones first
-        for bone in edit_bones:
-            bone.select = False
-
-        # Create a bone for each selected vertex
+        # Create the bones in one armature edit session and come back in
+        # Object Mode with the mesh active, where vertex groups can be filled
         new_bone_info = []  # Store (actual_bone_name, vertex_index) pairs
-        for i, vert_info in enumerate(vert_data):
-            # Get direction vector
-            direction_vec = get_direction_vec(self.direction, vert_info['normal_world'])
-            vert_pos_world = vert_info['pos_world']
-            vert_index = vert_info['index']
-
-            # Convert world space positions to armature space
-            vert_pos_armature = armature_obj.matrix_world.inverted() @ vert_pos_world
-            direction_armature = armature_obj.matrix_world.to_3x3().inverted() @ direction_vec
-
-            # Create bone
-            bone_name = f"Bone_Vertex_{i:03d}"
-            bone = edit_bones.new(bone_name)
-            bone.head = vert_pos_armature
-            bone.tail = vert_pos_armature + direction_armature.normalized() * self.bone_length
-            
-            # Store the actual bone name (Blender may have renamed it with .001 suffix)
-            new_bone_info.append((bone.name, vert_index))
-
-        # Switch back to object mode to apply changes
-        bpy.ops.object.mode_set(mode='OBJECT')
+        with edit_session.armature_edit(context, armature_obj, restore_mode='OBJECT') as edit_bones:
+            # Deselect all bones first
+            for bone in edit_bones:
+                bone.select = False
+
+            # Create a bone for each selected vertex
+            for i, vert_info in enumerate(vert_data):
+                # Get direction vector
+                direction_vec = get_direction_vec(self.direction, vert_info['normal_world'])
+                vert_pos_world = vert_info['pos_world']
+                vert_index = vert_info['index']
+
+                # Convert world space positions to armature space
+                vert_pos_armature = armature_obj.matrix_world.inverted() @ vert_pos_world
+                direction_armature = armature_obj.matrix_world.to_3x3().inverted() @ direction_vec
+
+                # Create bone
+                bone_name = f"Bone_Vertex_{i:03d}"
+                bone = edit_bones.new(bone_name)
+                bone.head = vert_pos_armature
+                bone.tail = vert_pos_armature + direction_armature.normalized() * self.bone_length
+
+                # Store the actual bone name (Blender may have renamed it with .001 suffix)
+                new_bone_info.append((bone.name, vert_index))
+        instrumentation.count("bones_touched", len(new_bone_info))
+        instrumentation.count("rna_writes", 2 * len(new_bone_info))
 
         # Create vertex groups for each bone on the mesh using actual bone names
         mesh_data = mesh_obj.data
@@ -178,9 +172,6 @@ class MESH_OT_johnnygizmo_bone_per_vertex(bpy.types.Operator):
             # Assign the vertex to the group with weight 1.0
             vgroup.add([vert_index], 1.0, 'REPLACE')
 
-        # Return to mesh as active object so user can continue working
-        context.view_layer.objects.active = mesh_obj
-
         self.report({'INFO'}, f"Created {len(vert_data)} bones")
         return {'FINISHED'}
 
@@ -1,18 +1,23 @@
 import bpy  # type: ignore
 import bmesh  # type: ignore
 from mathutils import Vector # type: ignore
+import numpy as np
+from . import instrumentation
+from . import armature_snapshot
+
+ENUM_ITEMS = []
 
 def get_bone_items(self, context):
     obj = context.object
     if obj and obj.parent and obj.parent.type == 'ARMATURE':
-        armature = obj.parent.data
-        return [
-            (bone.name, bone.name, "")
-            for bone in armature.bones
-            if not self.limit_to_deform_bones or bone.use_deform
-        ]
+        snap = armature_snapshot.snapshot(obj.parent.data, edit=False)
+        rows = np.flatnonzero(snap.deform) if self.limit_to_deform_bones else range(len(snap))
+        # Blender needs the enum item strings to stay referenced from Python
+        ENUM_ITEMS[:] = [(snap.names[i], snap.names[i], "") for i in rows]
+        return ENUM_ITEMS
     return []
 
+@instrumentation.instrumented
 class MESH_OT_johnnygizmo_vertex_bone_picker(bpy.types.Operator):
     """Assign selected vertices to a bone's vertex group"""
     bl_idname = "mesh.johnnygizmo_vertex_bone_picker"
@@ -78,22 +83,10 @@ class MESH_OT_johnnygizmo_vertex_bone_picker(bpy.types.Operator):
         world_matrix = mesh_obj.matrix_world
         avg_world_pos = sum((world_matrix @ v.co for v in selected_verts), Vector()) / len(selected_verts)
 
-        min_dist = float('inf')
-        closest_bone_name = None
-
-        for bone in armature_obj.data.bones:
-            if deform_only and not bone.use_deform:
-                continue
-            head_world = armature_obj.matrix_world @ bone.head_local
-            tail_world = armature_obj.matrix_world @ bone.tail_local
-            mid_point = (head_world + tail_world) / 2
-            dist = (avg_world_pos - mid_point).length
-            if dist < min_dist:
-                min_dist = dist
-                closest_bone_name = bone.name
-
-        if closest_bone_name:
-            self.bone_name = closest_bone_name
+        snap = armature_snapshot.snapshot(armature_obj.data, edit=False)
+        row = snap.nearest(armature_obj.matrix_world, avg_world_pos, 'CENTER', snap.deform if deform_only else None)
+        if row >= 0:
+            self.bone_name = snap.names[row]
 
 
     def draw(self, context):
@@ -110,13 +103,13 @@ class MESH_OT_johnnygizmo_vertex_bone_picker(bpy.types.Operator):
             self.report({'ERROR'}, "No bone selected.")
             return {'CANCELLED'}
 
-        bpy.ops.object.mode_set(mode='OBJECT')
+        instrumentation.mode_set(mode='OBJECT')
 
         mesh = obj.data
         selected_verts = [v for v in mesh.vertices if v.select]
         if not selected_verts:
             self.report({'ERROR'}, "No vertices selected.")
-            bpy.ops.object.mode_set(mode='EDIT')
+            instrumentation.mode_set(mode='EDIT')
             return {'CANCELLED'}
 
         if self.replace_all:
@@ -130,7 +123,7 @@ class MESH_OT_johnnygizmo_vertex_bone_picker(bpy.types.Operator):
         for v in selected_verts:
             vg.add([v.index], 1.0, 'REPLACE')
 
-        bpy.ops.object.mode_set(mode='EDIT')
+        instrumentation.mode_set(mode='EDIT')
 
         if self._original_show_names is not None:
             obj.parent.data.show_names = self._original_show_names
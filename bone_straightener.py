@@ -1,6 +1,8 @@
 import bpy # type: ignore
 from mathutils import Vector, Matrix # type: ignore
+from . import instrumentation
 
+@instrumentation.instrumented
 class MESH_OT_johnnygizmo_bone_straightener(bpy.types.Operator):
     bl_idname = "armature.johnnygizmo_bone_straightener"
     bl_label = "Bone Straightener"
@@ -0,0 +1,238 @@
+import re
+import bpy # type: ignore
+from . import instrumentation
+from . import armature_snapshot
+
+# Renames many bones of one armature as a single transaction.
+#
+# Every Bone.name assignment makes Blender fix the references to that bone:
+# vertex groups of the meshes it deforms, constraint subtargets, driver
+# targets and the F-curves of the animation assigned to the armature. Those
+# fix-ups cannot be skipped from Python, so the engine keeps the number of
+# assignments to one per bone: the whole old -> new map is planned first,
+# renames run in an order where every target name is already free, and only
+# rename cycles (A -> B -> A) go through a temporary name. Nothing gets a
+# '.001' suffix halfway through.
+#
+# Actions that are not assigned to anything (action libraries, unused takes)
+# are invisible to Blender's fix-ups; their F-curve paths and groups are
+# remapped afterwards in one pass with a single compiled pattern.
+#
+# Cost: the fix-up behind one assignment is a C-level scan of the constraints
+# of every object (once per object using the armature), the vertex groups and
+# modifiers of every object, and every F-curve and driver in the file. A
+# rename therefore costs steps x workload; a separate indexed pass cannot
+# replace that scan, only add to it. The engine keeps steps at its minimum
+# and, with instrumentation on, counts the scanned items ("fixup_items") next
+# to the span time, so the cost per item can be measured on production rigs.
+
+# Datablock collections whose animation data the fix-up scans
+_ANIMATED_COLLECTIONS = ("objects", "meshes", "armatures", "shape_keys", "materials",
+                         "node_groups", "cameras", "lights", "scenes", "worlds")
+
+# Longest bone name Blender stores (MAXBONENAME - 1), in bytes
+MAX_NAME_BYTES = 63
+
+BONE_PATH = re.compile(r'pose\.bones\["((?:[^"\\]|\\.)*)"\]')
+
+_TEMP_PREFIX = "~rename"
+
+
+def _unescape(name):
+    return re.sub(r'\\(.)', r'\1', name)
+
+
+def plan(names, mapping):
+    """Order the renames of mapping (old -> new) so no step collides.
+
+    names are all bone names of the armature. Renames that cannot be applied
+    cleanly are left out and returned with the reason:
+    unknown bones, duplicate targets, targets held by a bone that keeps its
+    name and names that are empty or too long.
+    Returns (steps, skipped): steps is a list of (current, new) assignments,
+    skipped a dict old -> reason.
+    """
+    existing = set(names)
+    skipped = {}
+    wanted = {}
+    for old, new in mapping.items():
+        if old not in existing:
+            skipped[old] = "no such bone"
+        elif not new or len(new.encode("utf-8")) > MAX_NAME_BYTES:
+            skipped[old] = "empty or longer than 63 bytes"
+        elif new != old:
+            wanted[old] = new
+
+    claims = {}
+    for old, new in wanted.items():
+        claims.setdefault(new, []).append(old)
+    for new, olds in claims.items():
+        if len(olds) > 1:
+            for old in olds:
+                skipped[old] = f"'{new}' is the target of {len(olds)} bones"
+                del wanted[old]
+
+    # A bone that keeps its name blocks its name; skipping a rename can block another
+    while True:
+        blocked = [old for old, new in wanted.items() if new in existing and new not in wanted]
+        if not blocked:
+            break
+        for old in blocked:
+            skipped[old] = f"'{wanted[old]}' is used by a bone that is not renamed"
+            del wanted[old]
+
+    # Chains: rename the bone whose target is free, which frees the name the next one wants
+    wants = {new: old for old, new in wanted.items()}
+    steps = []
+    done = set()
+    ready = [old for old, new in wanted.items() if new not in wanted]
+    while ready:
+        old = ready.pop()
+        steps.append((old, wanted[old]))
+        done.add(old)
+        if old in wants:
+            ready.append(wants[old])
+
+    # What is left are cycles; break each with one temporary name
+    taken = existing | set(wanted.values())
+    counter = 0
+    for start in wanted:
+        if start in done:
+            continue
+        temp = f"{_TEMP_PREFIX}{counter}"
+        while temp in taken:
+            counter += 1
+            temp = f"{_TEMP_PREFIX}{counter}"
+        counter += 1
+        taken.add(temp)
+        steps.append((start, temp))
+        done.add(start)
+        current = wants[start]
+        while current != start:
+            steps.append((current, wanted[current]))
+            done.add(current)
+            current = wants[current]
+        steps.append((temp, wanted[start]))
+
+    return steps, skipped
+
+
+def _channel_owners(action):
+    """The F-curve containers of an action: its channelbags, or the action itself for legacy actions"""
+    layers = getattr(action, "layers", None)
+    if layers:
+        return [bag for layer in layers for strip in layer.strips for bag in strip.channelbags]
+    return [action]
+
+
+def unassigned_actions():
+    """Actions no datablock uses (fake users aside)"""
+    actions = set(bpy.data.actions)
+    if not actions:
+        return []
+    users = bpy.data.user_map(subset=actions)
+    return [action for action in actions if not users.get(action)]
+
+
+def remap_path(path, mapping):
+    """path with every pose.bones["old"] in mapping pointing at its new name"""
+    if "pose.bones" not in path:
+        return path
+
+    def replace(match):
+        name = _unescape(match.group(1))
+        if name not in mapping:
+            return match.group(0)
+        return f'pose.bones["{bpy.utils.escape_identifier(mapping[name])}"]'
+
+    return BONE_PATH.sub(replace, path)
+
+
+def remap_action(action, mapping):
+    """Rewrite the bone F-curve paths and groups of action through mapping in one pass.
+
+    Returns the number of changed F-curves and groups.
+    """
+    changed = 0
+    for owner in _channel_owners(action):
+        for fcurve in owner.fcurves:
+            path = fcurve.data_path
+            new_path = remap_path(path, mapping)
+            if new_path != path:
+                fcurve.data_path = new_path
+                changed += 1
+        for group in owner.groups:
+            if group.name in mapping:
+                group.name = mapping[group.name]
+                changed += 1
+    return changed
+
+
+def _bone_names(action):
+    names = set()
+    for owner in _channel_owners(action):
+        for fcurve in owner.fcurves:
+            names.update(_unescape(n) for n in BONE_PATH.findall(fcurve.data_path))
+    return names
+
+
+def fixup_workload(arm_obj):
+    """Number of items Blender's fix-up scans for one bone rename of arm_obj"""
+    users = sum(1 for obj in bpy.data.objects if obj.data == arm_obj.data)
+    constraints = 0
+    other = 0
+    for obj in bpy.data.objects:
+        constraints += len(obj.constraints)
+        if obj.pose:
+            constraints += sum(len(pose_bone.constraints) for pose_bone in obj.pose.bones)
+        other += len(obj.vertex_groups) + len(obj.modifiers)
+    curves = 0
+    for attr in _ANIMATED_COLLECTIONS:
+        for id_data in getattr(bpy.data, attr):
+            anim = id_data.animation_data
+            if anim:
+                curves += sum(len(fcurve.driver.variables) + 1 for fcurve in anim.drivers)
+                if anim.action:
+                    curves += sum(len(owner.fcurves) for owner in _channel_owners(anim.action))
+    return users * constraints + other + curves
+
+
+def rename_bones(arm_obj, mapping, fix_unassigned_actions=True):
+    """Rename bones of arm_obj from a complete old -> new map.
+
+    Works in Object, Pose and Edit Mode. Unassigned actions are remapped only
+    when every bone they animate belongs to this armature, so the takes of
+    other rigs with overlapping names are left alone.
+    Returns (renamed, skipped, fixed_curves): the applied old -> new map, the
+    skipped renames with reasons and the number of remapped action channels.
+    """
+    arm = arm_obj.data
+    bones = arm.edit_bones if arm.is_editmode else arm.bones
+    names = [b.name for b in bones]
+    steps, skipped = plan(names, mapping)
+
+    # Counted outside the timed span, so measuring does not inflate it
+    workload = fixup_workload(arm_obj) if instrumentation.is_enabled() and steps else 0
+
+    # Resolve every bone once; references stay valid across renames
+    by_name = dict(zip(names, bones))
+    with instrumentation.span("bulk_rename"):
+        for current, new in steps:
+            bone = by_name.pop(current)
+            bone.name = new
+            by_name[new] = bone
+        instrumentation.count("bones_touched", len(steps))
+        instrumentation.count("rna_writes", len(steps))
+        instrumentation.count("fixup_items", len(steps) * workload)
+
+    renamed = {old: new for old, new in mapping.items() if old not in skipped and old != new}
+    armature_snapshot.invalidate(arm)
+
+    fixed = 0
+    if fix_unassigned_actions and renamed:
+        known = set(names)
+        for action in unassigned_actions():
+            animated = _bone_names(action)
+            if animated & renamed.keys() and animated <= known:
+                fixed += remap_action(action, renamed)
+    return renamed, skipped, fixed
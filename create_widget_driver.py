@@ -1,5 +1,11 @@
+import re
 import bpy  # type: ignore
-from bpy.props import EnumProperty, FloatProperty, BoolProperty, PointerProperty, StringProperty  # type: ignore
+from bpy.props import EnumProperty, FloatProperty, BoolProperty, PointerProperty, StringProperty, IntProperty  # type: ignore
+from mathutils import Vector  # type: ignore
+import numpy as np
+from . import geometry
+from . import edit_session
+from . import instrumentation
 
 
 def poll_mesh_objects(self, obj):
@@ -7,17 +13,18 @@ def poll_mesh_objects(self, obj):
     return obj.type == 'MESH'
 
 
-def get_shape_keys(self, context):
-    """Get shape keys from the selected target mesh"""
-    items = [('NONE', 'None', 'No shape key selected')]
-    
+def get_shape_key_index(self):
+    """Row of the chosen shape key in the target mesh's key blocks, -1 if there is none"""
     if self.target_mesh and self.target_mesh.data.shape_keys:
-        for key in self.target_mesh.data.shape_keys.key_blocks:
-            # Skip the basis shape key
-            if key.name != 'Basis':
-                items.append((key.name, key.name, f"Shape key: {key.name}"))
-    
-    return items
+        return self.target_mesh.data.shape_keys.key_blocks.find(self.shape_key)
+    return -1
+
+
+def set_shape_key_index(self, value):
+    if self.target_mesh and self.target_mesh.data.shape_keys:
+        key_blocks = self.target_mesh.data.shape_keys.key_blocks
+        if 0 < value < len(key_blocks):
+            self.shape_key = key_blocks[value].name
 
 
 class SHAPEKEY_PG_widget_settings(bpy.types.PropertyGroup):
@@ -56,10 +63,17 @@ class SHAPEKEY_PG_widget_settings(bpy.types.PropertyGroup):
     ) # type: ignore
     
     # Shape key from target mesh
-    shape_key: EnumProperty(
+    shape_key: StringProperty(
         name="Shape Key",
         description="Shape key to drive",
-        items=get_shape_keys
+        default=""
+    ) # type: ignore
+
+    # List row of shape_key, so the key list can select by name
+    shape_key_index: IntProperty(
+        name="Shape Key Index",
+        get=get_shape_key_index,
+        set=set_shape_key_index
     ) # type: ignore
     
     # Range start (for location and scale)
@@ -139,7 +153,268 @@ class SHAPEKEY_PG_widget_settings(bpy.types.PropertyGroup):
         soft_max=1.0
     ) # type: ignore
 
+    # Route each bone channel once into a property shared by all keys it drives
+    share_channels: BoolProperty(
+        name="Share Bone Channels",
+        description=(
+            "Read each control bone channel once into a property on the shape keys and drive every key from it "
+            "with a single-property driver and a mapping curve, instead of one scripted driver per key"
+        ),
+        default=False
+    ) # type: ignore
+
+
+CONSTRAINT_TYPES = {
+    'LOCATION': 'LIMIT_LOCATION',
+    'ROTATION': 'LIMIT_ROTATION',
+    'SCALE': 'LIMIT_SCALE'
+}
+
+TRANSFORM_PREFIX = {'LOCATION': 'LOC', 'ROTATION': 'ROT', 'SCALE': 'SCALE'}
+
+
+def transform_range(settings):
+    """(start, end) of the bone transform range for the chosen transform type"""
+    if settings.control_transform == 'ROTATION':
+        return settings.range_start_rot, settings.range_end_rot
+    return settings.range_start, settings.range_end
+
+
+def expand_slider(key_block, settings):
+    """Widen the shape key slider so it covers the mapped value range"""
+    if settings.shapekey_value_min < key_block.slider_min:
+        key_block.slider_min = settings.shapekey_value_min
+    if settings.shapekey_value_max > key_block.slider_max:
+        key_block.slider_max = settings.shapekey_value_max
+
+
+def mapping_expression(settings, variable):
+    """Driver expression mapping variable from the bone range to the shape key value range"""
+    range_start, range_end = transform_range(settings)
+    range_size = range_end - range_start
+    sk_min = settings.shapekey_value_min
+    sk_range = settings.shapekey_value_max - sk_min
+    # Formula: ((value - bone_start) / (bone_end - bone_start)) * (sk_max - sk_min) + sk_min
+    normalized = f"({variable} - ({range_start})) / ({range_size})"
+    clamped = f"max(0, min(1, {normalized}))"
+    return f"{clamped} * ({sk_range}) + ({sk_min})"
+
+
+# Expression written by mapping_expression, for turning existing drivers into shared ones
+MAPPING_EXPRESSION = re.compile(
+    r'^max\(0, min\(1, \((?P<var>\w+) - \((?P<start>[^()]+)\)\) / \((?P<size>[^()]+)\)\)\) '
+    r'\* \((?P<sk_range>[^()]+)\) \+ \((?P<sk_min>[^()]+)\)$'
+)
+
+
+def transform_type(settings):
+    return f'{TRANSFORM_PREFIX[settings.control_transform]}_{settings.control_axis}'
+
+
+def add_widget_driver(key_block, armature, bone_name, settings):
+    """Replace the driver on key_block's value with one reading the bone's transform channel"""
+    if settings.share_channels:
+        range_start, range_end = transform_range(settings)
+        return add_shared_driver(
+            key_block, armature, bone_name, transform_type(settings), 'LOCAL_SPACE',
+            (range_start, settings.shapekey_value_min), (range_end, settings.shapekey_value_max),
+        )
+
+    try:
+        key_block.driver_remove("value")
+    except Exception:
+        pass  # No driver to remove
+
+    fcurve = key_block.driver_add("value")
+    driver = fcurve.driver
+    driver.type = 'SCRIPTED'
+
+    var = driver.variables.new()
+    var.name = "bone_transform"
+    var.type = 'TRANSFORMS'
+    target = var.targets[0]
+    target.id = armature
+    target.bone_target = bone_name
+    target.transform_type = transform_type(settings)
+    target.transform_space = 'LOCAL_SPACE'
+
+    driver.expression = mapping_expression(settings, var.name)
+    return fcurve
+
+
+def channel_router(shape_keys, armature, bone_name, channel, space):
+    """Data path of the property on shape_keys that carries one bone channel, adding its driver if needed.
+
+    Returns (data_path, created). The router is the only driver that reads
+    the bone; every shape key on the channel reads the property instead.
+    """
+    # Local space, the widget default, keeps the short name routers always had
+    prop = f"{armature.name}:{bone_name}:{channel}"
+    if space != 'LOCAL_SPACE':
+        prop += f":{space}"
+    data_path = f'["{bpy.utils.escape_identifier(prop)}"]'
+    anim = shape_keys.animation_data
+    fcurve = anim.drivers.find(data_path) if prop in shape_keys.keys() and anim else None
+    if fcurve:
+        variables = fcurve.driver.variables
+        target = variables[0].targets[0] if len(variables) == 1 else None
+        if (target and variables[0].type == 'TRANSFORMS' and target.id == armature
+                and target.bone_target == bone_name and target.transform_type == channel
+                and target.transform_space == space):
+            return data_path, False
+        shape_keys.driver_remove(data_path)
+
+    shape_keys[prop] = 0.0
+    fcurve = shape_keys.driver_add(data_path)
+    driver = fcurve.driver
+    driver.type = 'AVERAGE'
+    var = driver.variables.new()
+    var.name = "bone_transform"
+    var.type = 'TRANSFORMS'
+    target = var.targets[0]
+    target.id = armature
+    target.bone_target = bone_name
+    target.transform_type = channel
+    target.transform_space = space
+    return data_path, True
+
+
+def set_mapping_curve(fcurve, low, high):
+    """Make fcurve map its driver value linearly from low to high (x, y) pairs, clamped at both ends"""
+    for modifier in list(fcurve.modifiers):
+        fcurve.modifiers.remove(modifier)
+    fcurve.keyframe_points.clear()
+    points = fcurve.keyframe_points
+    points.add(2)
+    for point, co in zip(points, sorted([low, high])):
+        point.co = co
+        point.handle_left = co
+        point.handle_right = co
+        point.interpolation = 'LINEAR'
+    # Constant extrapolation clamps like max(0, min(1, ...)) in the scripted expression
+    fcurve.extrapolation = 'CONSTANT'
+    fcurve.update()
+
 
+def add_shared_driver(key_block, armature, bone_name, channel, space, low, high):
+    """Drive key_block's value from the shared router property of a bone channel.
+
+    low and high are the (bone value, shape key value) ends of the mapping;
+    None for both keeps the identity mapping. Returns the new driver F-curve.
+    """
+    shape_keys = key_block.id_data
+    data_path, _ = channel_router(shape_keys, armature, bone_name, channel, space)
+    try:
+        key_block.driver_remove("value")
+    except Exception:
+        pass  # No driver to remove
+
+    fcurve = key_block.driver_add("value")
+    driver = fcurve.driver
+    driver.type = 'AVERAGE'
+    var = driver.variables.new()
+    var.name = "channel"
+    var.type = 'SINGLE_PROP'
+    target = var.targets[0]
+    target.id_type = 'KEY'
+    target.id = shape_keys
+    target.data_path = data_path
+    if low is not None:
+        set_mapping_curve(fcurve, low, high)
+    return fcurve
+
+
+def widget_driver_groups(shape_keys):
+    """Scripted single-variable bone-channel drivers on shape_keys, grouped by the channel they read.
+
+    Returns {(armature, bone, channel, space): [(key_block, low, high), ...]}
+    for drivers whose expression is the bare variable or the widget mapping.
+    """
+    groups = {}
+    anim = shape_keys.animation_data
+    if not anim:
+        return groups
+    for fcurve in anim.drivers:
+        driver = fcurve.driver
+        if driver.type != 'SCRIPTED' or len(driver.variables) != 1 or not fcurve.data_path.endswith(".value"):
+            continue
+        var = driver.variables[0]
+        target = var.targets[0]
+        if var.type != 'TRANSFORMS' or not target.id or not target.bone_target:
+            continue
+        expression = driver.expression.strip()
+        if expression == var.name:
+            low = high = None
+        else:
+            match = MAPPING_EXPRESSION.match(expression)
+            if not match or match.group("var") != var.name:
+                continue
+            try:
+                start, size, sk_range, sk_min = (float(match.group(g)) for g in ("start", "size", "sk_range", "sk_min"))
+            except ValueError:
+                continue
+            low, high = (start, sk_min), (start + size, sk_min + sk_range)
+        key_block = shape_keys.path_resolve(fcurve.data_path.rsplit(".", 1)[0])
+        channel = (target.id, target.bone_target, target.transform_type, target.transform_space)
+        groups.setdefault(channel, []).append((key_block, low, high))
+    return groups
+
+
+def lock_to_axis(pose_bone, settings):
+    """Lock every channel of pose_bone except the control transform's axis"""
+    free = [axis != settings.control_axis for axis in 'XYZ']
+    pose_bone.lock_location = free if settings.control_transform == 'LOCATION' else [True, True, True]
+    pose_bone.lock_rotation = free if settings.control_transform == 'ROTATION' else [True, True, True]
+    pose_bone.lock_scale = free if settings.control_transform == 'SCALE' else [True, True, True]
+    if settings.control_transform != 'ROTATION':
+        pose_bone.lock_rotation_w = True
+
+
+def add_limit_constraint(pose_bone, settings, label):
+    """Limit the control transform's axis of pose_bone to the bone range"""
+    range_start, range_end = transform_range(settings)
+    axis = settings.control_axis.lower()
+    constraint = pose_bone.constraints.new(CONSTRAINT_TYPES[settings.control_transform])
+    constraint.name = f"ShapeKey_{label}_Limit"
+    constraint.use_transform_limit = True
+    constraint.owner_space = 'LOCAL'
+    if settings.control_transform == 'ROTATION':
+        setattr(constraint, f"use_limit_{axis}", True)
+    else:
+        setattr(constraint, f"use_min_{axis}", True)
+        setattr(constraint, f"use_max_{axis}", True)
+    setattr(constraint, f"min_{axis}", range_start)
+    setattr(constraint, f"max_{axis}", range_end)
+    return constraint
+
+
+def get_bone_collection(armature, name):
+    """Bone collection called name on armature, created if missing"""
+    collection = armature.data.collections.get(name)
+    if not collection:
+        collection = armature.data.collections.new(name=name)
+    return collection
+
+
+def setup_control(pose_bone, settings, label):
+    """Clear pose_bone's locks and old limit constraint, then apply the lock and limit settings"""
+    pose_bone.lock_location = [False, False, False]
+    pose_bone.lock_rotation = [False, False, False]
+    pose_bone.lock_rotation_w = False
+    pose_bone.lock_scale = [False, False, False]
+
+    constraint_type = CONSTRAINT_TYPES[settings.control_transform]
+    for constraint in list(pose_bone.constraints):
+        if constraint.type == constraint_type:
+            pose_bone.constraints.remove(constraint)
+
+    if settings.lock_to_axis:
+        lock_to_axis(pose_bone, settings)
+    if settings.constrain_to_range:
+        add_limit_constraint(pose_bone, settings, label)
+
+
+@instrumentation.instrumented
 class SHAPEKEY_OT_create_widget_driver(bpy.types.Operator):
     """Create a shape key driver controlled by bone movement"""
     bl_idname = "shapekey.create_widget_driver"
@@ -160,7 +435,7 @@ class SHAPEKEY_OT_create_widget_driver(bpy.types.Operator):
             self.report({'ERROR'}, "Selected object is not a mesh")
             return {'CANCELLED'}
         
-        if settings.shape_key == 'NONE':
+        if not settings.shape_key:
             self.report({'ERROR'}, "No shape key selected")
             return {'CANCELLED'}
         
@@ -185,249 +460,253 @@ class SHAPEKEY_OT_create_widget_driver(bpy.types.Operator):
         if not shape_key_block:
             self.report({'ERROR'}, f"Shape key '{settings.shape_key}' not found")
             return {'CANCELLED'}
+
+        range_start, range_end = transform_range(settings)
+        if abs(range_end - range_start) < 0.0001:
+            self.report({'ERROR'}, "Range start and end cannot be the same")
+            return {'CANCELLED'}
         
         # Update shape key slider range if necessary
-        # Expand slider_min if our minimum is lower
-        if settings.shapekey_value_min < shape_key_block.slider_min:
-            shape_key_block.slider_min = settings.shapekey_value_min
-        
-        # Expand slider_max if our maximum is higher
-        if settings.shapekey_value_max > shape_key_block.slider_max:
-            shape_key_block.slider_max = settings.shapekey_value_max
+        expand_slider(shape_key_block, settings)
         
         # Rename the bone
         new_bone_name = f"{target_obj.name}.{settings.shape_key}_CTL"
         bone.name = new_bone_name
         
-        # Create or get the bone group/collection and assign the bone to it
+        # Create or get the bone collection and make it the bone's only collection
         collection_name = settings.bone_collection_name if settings.bone_collection_name else "CTL"
+        target_collection = get_bone_collection(armature, collection_name)
+        for collection in list(bone.bone.collections):
+            collection.unassign(bone)
+        target_collection.assign(bone)
+
+        setup_control(bone, settings, settings.shape_key)
+        add_widget_driver(shape_key_block, armature, bone.name, settings)
         
-        # In Blender 4.0+, bone groups are called bone collections
-        if hasattr(armature.data, 'collections'):
-            # Blender 4.0+ uses bone collections
-            target_collection = None
-            for collection in armature.data.collections:
-                if collection.name == collection_name:
-                    target_collection = collection
-                    break
-            
-            if not target_collection:
-                target_collection = armature.data.collections.new(name=collection_name)
-            
-            # Remove bone from all collections first
-            for collection in armature.data.collections:
-                if bone.bone.name in [b.name for b in collection.bones]:
-                    collection.unassign(bone)
-            
-            # Add bone to target collection
-            target_collection.assign(bone)
-        else:
-            # Blender 3.x and earlier uses bone groups
-            target_group = None
-            for group in armature.pose.bone_groups:
-                if group.name == collection_name:
-                    target_group = group
-                    break
-            
-            if not target_group:
-                target_group = armature.pose.bone_groups.new(name=collection_name)
-            
-            bone.bone_group = target_group
-        
-        # Clear existing transformation locks on the bone
-        bone.lock_location = [False, False, False]
-        bone.lock_rotation = [False, False, False]
-        bone.lock_rotation_w = False
-        bone.lock_scale = [False, False, False]
-        
-        # Remove existing limit constraints that match the selected mode
-        constraint_type_map = {
-            'LOCATION': 'LIMIT_LOCATION',
-            'ROTATION': 'LIMIT_ROTATION',
-            'SCALE': 'LIMIT_SCALE'
-        }
-        constraint_type = constraint_type_map[settings.control_transform]
-        
-        # Remove matching constraints
-        for constraint in list(bone.constraints):
-            if constraint.type == constraint_type:
-                bone.constraints.remove(constraint)
-        
-        # Remove existing driver on the shape key value if present
-        try:
-            shape_key_block.driver_remove("value")
-        except Exception:
-            pass  # No driver to remove
-        
-        # Create new driver
-        fcurve = shape_key_block.driver_add("value")
-        driver = fcurve.driver
-        driver.type = 'SCRIPTED'
-        
-        # Add variable for bone transform
-        var = driver.variables.new()
-        var.name = "bone_transform"
-        var.type = 'TRANSFORMS'
-        
-        # Set up the variable target
-        target = var.targets[0]
-        target.id = armature
-        target.bone_target = bone.name
-        
-        # Set transform type based on selection
-        transform_prefix = {'LOCATION': 'LOC', 'ROTATION': 'ROT', 'SCALE': 'SCALE'}[settings.control_transform]
-        target.transform_type = f'{transform_prefix}_{settings.control_axis}'
-        target.transform_space = 'LOCAL_SPACE'
+        self.report({'INFO'}, f"Driver created: {bone.name} ({settings.control_transform} {settings.control_axis}) -> {settings.shape_key}")
         
-        # Create the driver expression to map bone transform range to shape key value range
-        # Formula: ((value - bone_start) / (bone_end - bone_start)) * (sk_max - sk_min) + sk_min
-        # Use appropriate range properties based on transform type
-        if settings.control_transform == 'ROTATION':
-            range_start = settings.range_start_rot
-            range_end = settings.range_end_rot
-        else:
-            range_start = settings.range_start
-            range_end = settings.range_end
-            
-        range_size = range_end - range_start
-        if abs(range_size) < 0.0001:
+        return {'FINISHED'}
+
+
+@instrumentation.instrumented
+class SHAPEKEY_OT_create_widget_board(bpy.types.Operator):
+    """Create one control bone per shape key of the target mesh, laid out on a grid, and drive every key"""
+    bl_idname = "shapekey.create_widget_board"
+    bl_label = "Create Widget Face Board"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    name_filter: StringProperty(
+        name="Filter",
+        description="Only shape keys whose name contains this text (case-insensitive)",
+        default=""
+    ) # type: ignore
+
+    skip_driven: BoolProperty(
+        name="Skip Driven Keys",
+        description="Leave shape keys that already have a driver alone",
+        default=True
+    ) # type: ignore
+
+    columns: IntProperty(
+        name="Columns",
+        description="Controls per row (0 picks a square grid)",
+        default=0,
+        min=0
+    ) # type: ignore
+
+    spacing: FloatProperty(
+        name="Spacing",
+        description="Distance between neighbouring controls",
+        default=0.25,
+        min=0.001,
+        subtype='DISTANCE'
+    ) # type: ignore
+
+    widget_size: FloatProperty(
+        name="Control Length",
+        description="Length of each control bone",
+        default=0.1,
+        min=0.001,
+        subtype='DISTANCE'
+    ) # type: ignore
+
+    add_board_bone: BoolProperty(
+        name="Board Bone",
+        description="Parent all controls to one board bone so the board moves as a whole",
+        default=True
+    ) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj and obj.type == 'ARMATURE' and obj.mode in {'OBJECT', 'POSE'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        settings = context.scene.shapekey_widget_settings
+        armature = context.active_object
+        target_obj = settings.target_mesh
+        if not target_obj or target_obj.type != 'MESH':
+            self.report({'ERROR'}, "No target mesh selected")
+            return {'CANCELLED'}
+        if not target_obj.data.shape_keys:
+            self.report({'ERROR'}, "Target mesh has no shape keys")
+            return {'CANCELLED'}
+        range_start, range_end = transform_range(settings)
+        if abs(range_end - range_start) < 0.0001:
             self.report({'ERROR'}, "Range start and end cannot be the same")
             return {'CANCELLED'}
-        
-        # Get shape key value range
-        sk_min = settings.shapekey_value_min
-        sk_max = settings.shapekey_value_max
-        sk_range = sk_max - sk_min
-        
-        # Build expression: normalized value (0-1) mapped to shape key range
-        normalized = f"(bone_transform - ({range_start})) / ({range_size})"
-        clamped = f"max(0, min(1, {normalized}))"
-        mapped = f"{clamped} * ({sk_range}) + ({sk_min})"
-        
-        driver.expression = mapped
-        
-        # Apply constraints if requested
-        if settings.lock_to_axis:
-            # Lock other axes based on transform type
-            lock_map = {
-                'X': [False, True, True],
-                'Y': [True, False, True],
-                'Z': [True, True, False]
-            }
-            lock_x, lock_y, lock_z = lock_map[settings.control_axis]
-            
-            if settings.control_transform == 'LOCATION':
-                # Lock all rotation and scale, and other location axes
-                bone.lock_location[0] = lock_x
-                bone.lock_location[1] = lock_y
-                bone.lock_location[2] = lock_z
-                bone.lock_rotation = [True, True, True]
-                bone.lock_rotation_w = True
-                bone.lock_scale = [True, True, True]
-            elif settings.control_transform == 'ROTATION':
-                # Lock all location and scale, and other rotation axes
-                bone.lock_location = [True, True, True]
-                bone.lock_rotation[0] = lock_x
-                bone.lock_rotation[1] = lock_y
-                bone.lock_rotation[2] = lock_z
-                bone.lock_scale = [True, True, True]
-            else:  # SCALE
-                # Lock all location and rotation, and other scale axes
-                bone.lock_location = [True, True, True]
-                bone.lock_rotation = [True, True, True]
-                bone.lock_rotation_w = True
-                bone.lock_scale[0] = lock_x
-                bone.lock_scale[1] = lock_y
-                bone.lock_scale[2] = lock_z
-        
-        if settings.constrain_to_range:
-            # Use appropriate range properties based on transform type
-            if settings.control_transform == 'ROTATION':
-                range_start = settings.range_start_rot
-                range_end = settings.range_end_rot
-            else:
-                range_start = settings.range_start
-                range_end = settings.range_end
-                
-            # Add appropriate limit constraint based on transform type
-            if settings.control_transform == 'LOCATION':
-                constraint = bone.constraints.new('LIMIT_LOCATION')
-                constraint.name = f"ShapeKey_{settings.shape_key}_Limit"
-                constraint.use_transform_limit = True
-                constraint.owner_space = 'LOCAL'
-                
-                axis_idx = {'X': 0, 'Y': 1, 'Z': 2}[settings.control_axis]
-                if axis_idx == 0:
-                    constraint.use_min_x = True
-                    constraint.use_max_x = True
-                    constraint.min_x = range_start
-                    constraint.max_x = range_end
-                elif axis_idx == 1:
-                    constraint.use_min_y = True
-                    constraint.use_max_y = True
-                    constraint.min_y = range_start
-                    constraint.max_y = range_end
-                else:
-                    constraint.use_min_z = True
-                    constraint.use_max_z = True
-                    constraint.min_z = range_start
-                    constraint.max_z = range_end
-                    
-            elif settings.control_transform == 'ROTATION':
-                constraint = bone.constraints.new('LIMIT_ROTATION')
-                constraint.name = f"ShapeKey_{settings.shape_key}_Limit"
-                constraint.use_transform_limit = True
-                constraint.owner_space = 'LOCAL'
-                
-                axis_idx = {'X': 0, 'Y': 1, 'Z': 2}[settings.control_axis]
-                if axis_idx == 0:
-                    constraint.use_limit_x = True
-                    constraint.min_x = range_start
-                    constraint.max_x = range_end
-                elif axis_idx == 1:
-                    constraint.use_limit_y = True
-                    constraint.min_y = range_start
-                    constraint.max_y = range_end
-                else:
-                    constraint.use_limit_z = True
-                    constraint.min_z = range_start
-                    constraint.max_z = range_end
-                    
-            else:  # SCALE
-                constraint = bone.constraints.new('LIMIT_SCALE')
-                constraint.name = f"ShapeKey_{settings.shape_key}_Limit"
-                constraint.use_transform_limit = True
-                constraint.owner_space = 'LOCAL'
-                
-                axis_idx = {'X': 0, 'Y': 1, 'Z': 2}[settings.control_axis]
-                if axis_idx == 0:
-                    constraint.use_min_x = True
-                    constraint.use_max_x = True
-                    constraint.min_x = range_start
-                    constraint.max_x = range_end
-                elif axis_idx == 1:
-                    constraint.use_min_y = True
-                    constraint.use_max_y = True
-                    constraint.min_y = range_start
-                    constraint.max_y = range_end
+
+        shape_keys = target_obj.data.shape_keys
+        driven = set()
+        if self.skip_driven and shape_keys.animation_data:
+            driven = {fc.data_path for fc in shape_keys.animation_data.drivers}
+        needle = self.name_filter.lower()
+        key_blocks = [
+            kb for kb in shape_keys.key_blocks[1:]
+            if needle in kb.name.lower() and kb.path_from_id("value") not in driven
+        ]
+        if not key_blocks:
+            self.report({'ERROR'}, "No shape keys to drive")
+            return {'CANCELLED'}
+
+        # Grid in the armature's XZ plane, seen from the front, starting at the 3D cursor
+        count = len(key_blocks)
+        columns = self.columns or int(np.ceil(np.sqrt(count)))
+        cells = np.arange(count)
+        to_armature = np.linalg.inv(geometry.matrix_to_array(armature.matrix_world))
+        origin = geometry.transform_points(to_armature, np.array([context.scene.cursor.location]))[0]
+        heads = np.zeros((count, 3))
+        heads[:, 0] = (cells % columns) * self.spacing
+        heads[:, 2] = -(cells // columns) * self.spacing
+        heads += origin
+        tails = heads + (0.0, 0.0, self.widget_size)
+
+        bone_names = [f"{target_obj.name}.{kb.name}_CTL" for kb in key_blocks]
+        board_name = f"{target_obj.name}.Board_CTL"
+
+        # All bones in one edit session; positions go in with one foreach_set
+        with edit_session.armature_edit(context, armature, restore_mode='POSE') as edit_bones:
+            board = None
+            if self.add_board_bone:
+                board = edit_bones.get(board_name) or edit_bones.new(board_name)
+                board.head = Vector(origin + (-self.spacing, 0.0, self.spacing))
+                board.tail = Vector(origin + (-self.spacing, 0.0, self.spacing + self.widget_size))
+            reused = 0
+            created = []
+            for name in bone_names:
+                bone = edit_bones.get(name)
+                if bone:
+                    reused += 1
                 else:
-                    constraint.use_min_z = True
-                    constraint.use_max_z = True
-                    constraint.min_z = range_start
-                    constraint.max_z = range_end
-        
-        self.report({'INFO'}, f"Driver created: {bone.name} ({settings.control_transform} {settings.control_axis}) -> {settings.shape_key}")
-        
+                    bone = edit_bones.new(name)
+                bone.parent = board
+                bone.use_deform = False
+                created.append(bone)
+            # Names Blender actually gave the bones (long names get truncated)
+            bone_names = [bone.name for bone in created]
+            board_name = board.name if board else board_name
+            index = {b.name: i for i, b in enumerate(edit_bones)}
+            rows = np.array([index[name] for name in bone_names], dtype=np.int64)
+
+            all_heads = np.empty(len(edit_bones) * 3, dtype=np.float32)
+            all_tails = np.empty(len(edit_bones) * 3, dtype=np.float32)
+            edit_bones.foreach_get("head", all_heads)
+            edit_bones.foreach_get("tail", all_tails)
+            all_heads = all_heads.reshape(-1, 3)
+            all_tails = all_tails.reshape(-1, 3)
+            all_heads[rows] = heads
+            all_tails[rows] = tails
+            edit_bones.foreach_set("head", all_heads.ravel())
+            edit_bones.foreach_set("tail", all_tails.ravel())
+            roll = np.empty(len(edit_bones), dtype=np.float32)
+            edit_bones.foreach_get("roll", roll)
+            roll[rows] = 0.0
+            edit_bones.foreach_set("roll", roll)
+            if board:
+                board.use_deform = False
+            instrumentation.count("bones_touched", count)
+
+        # Pose-level setup in a single pass, without further mode switches
+        collection_name = settings.bone_collection_name if settings.bone_collection_name else "CTL"
+        target_collection = get_bone_collection(armature, collection_name)
+        pose_bones = armature.pose.bones
+        if self.add_board_bone:
+            target_collection.assign(pose_bones[board_name])
+        for key_block, name in zip(key_blocks, bone_names):
+            pose_bone = pose_bones[name]
+            for collection in list(pose_bone.bone.collections):
+                if collection != target_collection:
+                    collection.unassign(pose_bone)
+            target_collection.assign(pose_bone)
+            setup_control(pose_bone, settings, key_block.name)
+            expand_slider(key_block, settings)
+            add_widget_driver(key_block, armature, name, settings)
+        instrumentation.count("drivers_created", count)
+
+        self.report({'INFO'}, f"Created {count - reused} controls ({reused} reused) driving {count} shape keys on '{target_obj.name}'")
+        return {'FINISHED'}
+
+
+@instrumentation.instrumented
+class SHAPEKEY_OT_share_widget_channels(bpy.types.Operator):
+    """Replace scripted widget drivers that read the same bone channel with one shared read per channel"""
+    bl_idname = "shapekey.share_widget_channels"
+    bl_label = "Share Widget Driver Channels"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    min_keys: IntProperty(
+        name="Min Keys per Channel",
+        description="Only share channels that drive at least this many shape keys",
+        default=2,
+        min=1
+    ) # type: ignore
+
+    def execute(self, context):
+        settings = context.scene.shapekey_widget_settings
+        target_obj = settings.target_mesh
+        if not target_obj or target_obj.type != 'MESH' or not target_obj.data.shape_keys:
+            self.report({'ERROR'}, "Target mesh has no shape keys")
+            return {'CANCELLED'}
+
+        shape_keys = target_obj.data.shape_keys
+        groups = widget_driver_groups(shape_keys)
+        converted = 0
+        channels = 0
+        for (armature, bone_name, channel, space), keys in groups.items():
+            if len(keys) < self.min_keys:
+                continue
+            channels += 1
+            for key_block, low, high in keys:
+                add_shared_driver(key_block, armature, bone_name, channel, space, low, high)
+                converted += 1
+        instrumentation.count("drivers_converted", converted)
+
+        if not converted:
+            self.report({'INFO'}, f"No bone channel drives {self.min_keys} or more shape keys with a widget driver")
+            return {'FINISHED'}
+        # Each channel is now read once by its router instead of once per shape key
+        self.report(
+            {'INFO'},
+            f"Shared {channels} bone channels: {converted} scripted drivers became single-property drivers, "
+            f"{converted - channels} redundant bone reads removed",
+        )
         return {'FINISHED'}
 
 
 def register():
     bpy.utils.register_class(SHAPEKEY_PG_widget_settings)
     bpy.utils.register_class(SHAPEKEY_OT_create_widget_driver)
+    bpy.utils.register_class(SHAPEKEY_OT_create_widget_board)
+    bpy.utils.register_class(SHAPEKEY_OT_share_widget_channels)
     bpy.types.Scene.shapekey_widget_settings = bpy.props.PointerProperty(type=SHAPEKEY_PG_widget_settings)
 
 
 def unregister():
     del bpy.types.Scene.shapekey_widget_settings
+    bpy.utils.unregister_class(SHAPEKEY_OT_share_widget_channels)
+    bpy.utils.unregister_class(SHAPEKEY_OT_create_widget_board)
     bpy.utils.unregister_class(SHAPEKEY_OT_create_widget_driver)
     bpy.utils.unregister_class(SHAPEKEY_PG_widget_settings)
@@ -0,0 +1,240 @@
+import bpy # type: ignore
+from bpy.props import BoolProperty, EnumProperty, StringProperty # type: ignore
+from . import instrumentation
+from . import rig_drivers
+from . import bulk_rename
+
+# Driver audit: finds drivers of a rig that cannot work. A driver whose
+# target or path is gone fails every frame and still costs evaluation time.
+# Every variable target is checked against a cache of resolved paths, so a
+# target shared by many drivers (a control bone's channel) is resolved once.
+
+
+class PathCache:
+    """Memoized path lookups against datablocks, keyed by the ID pointer"""
+    __slots__ = ("paths", "bones", "lookups")
+
+    def __init__(self):
+        self.paths = {}
+        self.bones = {}
+        self.lookups = 0
+
+    def resolves(self, id_data, path):
+        key = (id_data.as_pointer(), path)
+        hit = self.paths.get(key)
+        if hit is None:
+            self.lookups += 1
+            try:
+                id_data.path_resolve(path, False)
+                hit = True
+            except ValueError:
+                hit = False
+            self.paths[key] = hit
+        return hit
+
+    def has_bone(self, id_data, name):
+        key = id_data.as_pointer()
+        names = self.bones.get(key)
+        if names is None:
+            self.lookups += 1
+            pose = getattr(id_data, "pose", None)
+            names = self.bones[key] = {b.name for b in pose.bones} if pose else set()
+        return name in names
+
+
+def target_problems(variable, cache):
+    """(target, reason) for every target of variable that cannot be read"""
+    problems = []
+    for target in variable.targets:
+        if variable.type == 'CONTEXT_PROP':
+            if not target.data_path:
+                problems.append((target, "empty path"))
+            continue
+        if target.id is None:
+            problems.append((target, "no target datablock"))
+        elif variable.type == 'SINGLE_PROP':
+            if not target.data_path:
+                problems.append((target, "empty path"))
+            elif not cache.resolves(target.id, target.data_path):
+                problems.append((target, f"'{target.data_path}' not found on {target.id.name}"))
+        elif target.bone_target and not cache.has_bone(target.id, target.bone_target):
+            problems.append((target, f"bone '{target.bone_target}' not found on {target.id.name}"))
+    return problems
+
+
+def scan(arm_obj, include_muted=False):
+    """Broken drivers of the rig as (owner, fcurve, reasons, bad_targets), in rig order.
+
+    bad_targets are the (target, reason) pairs of target_problems. Muted
+    drivers are listed only with include_muted.
+    """
+    cache = PathCache()
+    found = []
+    for owner, fcurve in rig_drivers.rig_drivers(arm_obj):
+        driver = fcurve.driver
+        reasons = []
+        if fcurve.mute:
+            if not include_muted:
+                continue
+            reasons.append("muted")
+        if not cache.resolves(owner, fcurve.data_path):
+            reasons.append(f"driven property '{fcurve.data_path}' not found")
+        if not fcurve.is_valid:
+            reasons.append("F-curve flagged invalid")
+        if not driver.is_valid:
+            reasons.append("driver flagged invalid")
+        if driver.type == 'SCRIPTED' and not driver.expression.strip():
+            reasons.append("empty expression")
+        bad_targets = []
+        for variable in driver.variables:
+            if not variable.is_name_valid:
+                reasons.append(f"variable name '{variable.name}' is invalid")
+            problems = target_problems(variable, cache)
+            reasons.extend(f"{variable.name}: {reason}" for _, reason in problems)
+            bad_targets.extend(problems)
+        if reasons:
+            found.append((owner, fcurve, reasons, bad_targets))
+    instrumentation.count("path_lookups", cache.lookups)
+    return found
+
+
+def remove_drivers(found):
+    """Remove the F-curves of found from their owners. Returns the number removed"""
+    by_owner = {}
+    for owner, fcurve, _, _ in found:
+        by_owner.setdefault(owner.as_pointer(), (owner, []))[1].append(fcurve)
+    removed = 0
+    for owner, fcurves in by_owner.values():
+        drivers = owner.animation_data.drivers
+        for fcurve in fcurves:
+            drivers.remove(fcurve)
+            removed += 1
+    return removed
+
+
+def retarget_drivers(found, bone_map, target_object=None):
+    """Point the broken targets of found at renamed bones (old -> new) or, when
+    they have no datablock, at target_object. Retargeted drivers are flagged
+    valid again so Blender retries them. Returns the number of targets changed.
+    """
+    changed = 0
+    for _, fcurve, _, bad_targets in found:
+        before = changed
+        for target, _ in bad_targets:
+            touched = False
+            if target.id is None and target_object is not None and target.id_type == 'OBJECT':
+                target.id = target_object
+                touched = True
+            if target.bone_target in bone_map:
+                target.bone_target = bone_map[target.bone_target]
+                touched = True
+            path = bulk_rename.remap_path(target.data_path, bone_map)
+            if path != target.data_path:
+                target.data_path = path
+                touched = True
+            changed += touched
+        if changed != before:
+            fcurve.driver.is_valid = True
+            fcurve.is_valid = True
+    return changed
+
+
+@instrumentation.instrumented
+class ARMATURE_OT_driver_audit(bpy.types.Operator):
+    """Driver Audit: Find drivers of the armature, its meshes and their shape keys that cannot be evaluated"""
+    bl_idname = "armature.driver_audit"
+    bl_label = "Driver Audit"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    action: EnumProperty(
+        name="Action",
+        items=[
+            ('REPORT', "Report", "Only list the broken drivers"),
+            ('REMOVE', "Remove", "Delete the broken drivers"),
+            ('RETARGET', "Retarget", "Point the broken targets at another bone or object"),
+        ],
+        default='REPORT',
+    ) # type: ignore
+
+    include_muted: BoolProperty(
+        name="Include Muted Drivers",
+        description="Treat muted drivers as broken",
+        default=False,
+    ) # type: ignore
+
+    retarget_from: StringProperty(
+        name="Missing Bone",
+        description="Bone name the broken targets still use",
+        default="",
+    ) # type: ignore
+
+    retarget_to: StringProperty(
+        name="New Bone",
+        description="Bone to use instead",
+        default="",
+    ) # type: ignore
+
+    retarget_object: StringProperty(
+        name="Missing Object",
+        description="Object for targets that have none",
+        default="",
+    ) # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        return (context.active_object and context.active_object.type == 'ARMATURE')
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "action", expand=True)
+        layout.prop(self, "include_muted")
+        if self.action == 'RETARGET':
+            layout.prop(self, "retarget_from")
+            layout.prop_search(self, "retarget_to", context.active_object.data, "bones")
+            layout.prop_search(self, "retarget_object", bpy.data, "objects")
+
+    def execute(self, context):
+        arm_obj = context.active_object
+        found = scan(arm_obj, self.include_muted)
+
+        report_lines = [f"=== DRIVER AUDIT: {arm_obj.name} ===", ""]
+        for owner, fcurve, reasons, _ in found:
+            report_lines.append(f"- {rig_drivers.driver_label(owner, fcurve)}")
+            for reason in reasons:
+                report_lines.append(f"   - {reason}")
+        if not found:
+            report_lines.append("No broken drivers found.")
+        report_lines.append("")
+
+        if self.action == 'REMOVE' and found:
+            removed = remove_drivers(found)
+            report_lines.append(f"Removed {removed} drivers.")
+        elif self.action == 'RETARGET' and found:
+            bone_map = {self.retarget_from: self.retarget_to} if self.retarget_from and self.retarget_to else {}
+            target_object = bpy.data.objects.get(self.retarget_object) if self.retarget_object else None
+            if not bone_map and target_object is None:
+                self.report({'ERROR'}, "Nothing to retarget to")
+                return {'CANCELLED'}
+            changed = retarget_drivers(found, bone_map, target_object)
+            still_broken = len(scan(arm_obj, self.include_muted))
+            report_lines.append(f"Retargeted {changed} targets; {still_broken} drivers still broken.")
+
+        report_name = f"{arm_obj.name}_Driver_Audit"
+        text_block = bpy.data.texts.get(report_name) or bpy.data.texts.new(report_name)
+        text_block.clear()
+        text_block.write("\n".join(report_lines))
+
+        self.report({'WARNING'} if found else {'INFO'},
+                    f"{len(found)} broken drivers; report saved to text block: {report_name}")
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(ARMATURE_OT_driver_audit)
+
+
+def unregister():
+    bpy.utils.unregister_class(ARMATURE_OT_driver_audit)
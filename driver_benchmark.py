@@ -0,0 +1,227 @@
+import bpy # type: ignore
+import json
+from time import perf_counter
+import numpy as np
+from . import instrumentation
+from . import rig_drivers
+
+# Times depsgraph evaluation of a rig across a frame range and attributes the
+# cost to its drivers. Drivers are grouped by owning datablock and kind
+# (simple expression, Python expression, non-scripted); each group is muted in
+# turn and the frame range re-timed, the time saved being the group's cost.
+# The slowest drivers of the costliest groups are then muted one at a time.
+#
+# Runs headless:
+#   blender -b rig.blend --python-expr "import bpy; bpy.ops.wm.johnnygizmo_driver_benchmark(armature_name='Rig', filepath='//bench.json')"
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def time_frames(scene, frames, passes):
+    """Seconds to evaluate every frame, the fastest of passes runs per frame"""
+    best = np.full(len(frames), np.inf)
+    for _ in range(passes):
+        for i, frame in enumerate(frames):
+            start = perf_counter()
+            scene.frame_set(frame)
+            best[i] = min(best[i], perf_counter() - start)
+    return best
+
+
+def time_muted(scene, frames, passes, fcurves):
+    """time_frames() with fcurves muted; they are unmuted again afterwards"""
+    for fcurve in fcurves:
+        fcurve.mute = True
+    try:
+        return time_frames(scene, frames, passes)
+    finally:
+        for fcurve in fcurves:
+            fcurve.mute = False
+
+
+def frame_stats(seconds):
+    ms = seconds * 1000.0
+    stats = {f"p{p}": float(np.percentile(ms, p)) for p in PERCENTILES}
+    stats["mean"] = float(ms.mean())
+    stats["max"] = float(ms.max())
+    return stats
+
+
+def benchmark(scene, arm_obj, frames, passes, individual):
+    """Run the benchmark and return the report as plain data"""
+    entries = []
+    for owner, fcurve in rig_drivers.rig_drivers(arm_obj):
+        driver = fcurve.driver
+        entries.append({
+            "driver": rig_drivers.driver_label(owner, fcurve),
+            "owner": owner.name,
+            "data_path": fcurve.data_path,
+            "index": fcurve.array_index,
+            "class": rig_drivers.classify(driver),
+            "expression": driver.expression if driver.type == 'SCRIPTED' else driver.type,
+            "variables": len(driver.variables),
+            "muted": fcurve.mute,
+            "fcurve": fcurve,
+        })
+    active = [e for e in entries if not e["muted"]]
+
+    groups = {}
+    for entry in active:
+        groups.setdefault((entry["owner"], entry["class"]), []).append(entry)
+
+    # Warm up caches and the Python expression namespace before timing
+    time_frames(scene, frames[:1], 1)
+    baseline = time_frames(scene, frames, passes)
+    total = float(baseline.sum())
+    muted = time_muted(scene, frames, passes, [e["fcurve"] for e in active]) if active else baseline
+    without = float(muted.sum())
+
+    ranked_groups = []
+    for (owner, kind), members in groups.items():
+        cost = max(total - float(time_muted(scene, frames, passes, [e["fcurve"] for e in members]).sum()), 0.0)
+        for entry in members:
+            entry["cost_ms"] = cost * 1000.0 / len(members)
+            entry["measured"] = len(members) == 1
+        ranked_groups.append({
+            "owner": owner,
+            "class": kind,
+            "drivers": len(members),
+            "cost_ms": cost * 1000.0,
+            "cost_per_frame_ms": cost * 1000.0 / len(frames),
+        })
+    ranked_groups.sort(key=lambda g: -g["cost_ms"])
+
+    # Split the estimates of the costliest shared groups into measured costs
+    budget = individual
+    for group in ranked_groups:
+        if budget <= 0:
+            break
+        if group["drivers"] < 2:
+            continue
+        for entry in groups[(group["owner"], group["class"])][:budget]:
+            cost = max(total - float(time_muted(scene, frames, passes, [entry["fcurve"]]).sum()), 0.0)
+            entry["cost_ms"] = cost * 1000.0
+            entry["measured"] = True
+            budget -= 1
+
+    for entry in active:
+        entry["cost_per_frame_ms"] = entry["cost_ms"] / len(frames)
+    ranked_drivers = sorted(active, key=lambda e: -e["cost_ms"])
+    for entry in entries:
+        del entry["fcurve"]
+
+    classes = {}
+    for entry in entries:
+        classes[entry["class"]] = classes.get(entry["class"], 0) + 1
+
+    driver_time = max(total - without, 0.0)
+    return {
+        "armature": arm_obj.name,
+        "blender": bpy.app.version_string,
+        "frames": [frames[0], frames[-1]],
+        "passes": passes,
+        "frame_ms": frame_stats(baseline),
+        "frame_ms_drivers_muted": frame_stats(muted),
+        "total_ms": total * 1000.0,
+        "drivers_ms": driver_time * 1000.0,
+        "driver_share": driver_time / total if total > 0.0 else 0.0,
+        "driver_count": len(entries),
+        "already_muted": len(entries) - len(active),
+        "classes": classes,
+        "groups": ranked_groups,
+        "drivers": ranked_drivers,
+    }
+
+
+@instrumentation.instrumented
+class WM_OT_johnnygizmo_driver_benchmark(bpy.types.Operator):
+    """Time the rig's evaluation over a frame range and rank its drivers by cost"""
+    bl_idname = "wm.johnnygizmo_driver_benchmark"
+    bl_label = "Benchmark Rig Drivers"
+    bl_options = {'REGISTER'}
+
+    armature_name: bpy.props.StringProperty(
+        name="Armature",
+        description="Armature object to benchmark (leave empty to use the active object)",
+        default="",
+    ) # type: ignore
+
+    frame_start: bpy.props.IntProperty(
+        name="Start Frame",
+        description="First frame to evaluate (-1 uses the scene range)",
+        default=-1,
+    ) # type: ignore
+
+    frame_end: bpy.props.IntProperty(
+        name="End Frame",
+        description="Last frame to evaluate (-1 uses the scene range)",
+        default=-1,
+    ) # type: ignore
+
+    passes: bpy.props.IntProperty(
+        name="Passes",
+        description="Runs per timing; each frame keeps its fastest run",
+        default=3,
+        min=1,
+        max=50,
+    ) # type: ignore
+
+    individual: bpy.props.IntProperty(
+        name="Individual Timings",
+        description="Drivers of the costliest groups to time one at a time",
+        default=20,
+        min=0,
+        max=1000,
+    ) # type: ignore
+
+    filepath: bpy.props.StringProperty(
+        name="File Path",
+        description="JSON output file (leave empty to write a text block)",
+        subtype='FILE_PATH',
+        default="",
+    ) # type: ignore
+
+    def execute(self, context):
+        scene = context.scene
+        arm_obj = bpy.data.objects.get(self.armature_name) if self.armature_name else context.active_object
+        if arm_obj is None or arm_obj.type != 'ARMATURE':
+            self.report({'ERROR'}, "No armature to benchmark")
+            return {'CANCELLED'}
+
+        start = scene.frame_start if self.frame_start < 0 else self.frame_start
+        end = scene.frame_end if self.frame_end < 0 else self.frame_end
+        if end < start:
+            self.report({'ERROR'}, "End frame is before start frame")
+            return {'CANCELLED'}
+        frames = list(range(start, end + 1))
+
+        current = scene.frame_current
+        try:
+            report = benchmark(scene, arm_obj, frames, self.passes, self.individual)
+        finally:
+            scene.frame_set(current)
+
+        output = json.dumps(report, indent=2)
+        if self.filepath:
+            with open(bpy.path.abspath(self.filepath), "w", encoding="utf-8") as f:
+                f.write(output)
+            target = self.filepath
+        else:
+            target = f"{arm_obj.name}_Driver_Benchmark"
+            text_block = bpy.data.texts.get(target) or bpy.data.texts.new(target)
+            text_block.clear()
+            text_block.write(output)
+        if bpy.app.background:
+            print(output)
+
+        self.report({'INFO'}, f"{report['driver_count']} drivers, {report['driver_share']:.0%} of "
+                              f"{report['frame_ms']['mean']:.2f} ms per frame; report written to {target}")
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(WM_OT_johnnygizmo_driver_benchmark)
+
+
+def unregister():
+    bpy.utils.unregister_class(WM_OT_johnnygizmo_driver_benchmark)
@@ -0,0 +1,55 @@
+from contextlib import contextmanager
+from . import instrumentation
+
+# Edit bones only exist while their armature is in Edit Mode, so tools that
+# run from a mesh have to leave the mesh's mode, make the armature active,
+# edit it and then put everything back. These helpers do that with the fewest
+# mode switches (each one counted as 'mode_set' by instrumentation):
+#
+#   armature already in Edit Mode         0
+#   armature active in Object/Pose Mode   2 (enter, restore)
+#   other object in Object Mode           2
+#   other object in Edit/Paint Mode       4 (leave, enter, leave, restore)
+
+
+def ensure_mode(context, obj, mode):
+    """Make obj the active object in mode, switching modes only when needed"""
+    view_layer = context.view_layer
+    active = view_layer.objects.active
+    if active == obj and obj.mode == mode:
+        return
+    if active is not None and active != obj and active.mode != 'OBJECT':
+        instrumentation.mode_set(mode='OBJECT')
+    view_layer.objects.active = obj
+    if obj.mode != mode:
+        instrumentation.mode_set(mode=mode)
+
+
+@contextmanager
+def armature_edit(context, arm_obj, restore_mode=None):
+    """Yield the edit bones of arm_obj inside a single armature Edit Mode session.
+
+    All edit bone writes of an operator belong in one session. On exit the
+    previously active object and its mode are restored exactly once, even if
+    the body raises. restore_mode overrides the mode to return to, e.g.
+    'OBJECT' when the caller continues with Object Mode only work.
+    Edit bone references are invalid after the session; keep names instead.
+    """
+    view_layer = context.view_layer
+    prev_active = view_layer.objects.active
+    prev_mode = prev_active.mode if prev_active is not None else 'OBJECT'
+    if restore_mode is None:
+        restore_mode = prev_mode
+
+    ensure_mode(context, arm_obj, 'EDIT')
+    try:
+        yield arm_obj.data.edit_bones
+    finally:
+        if prev_active == arm_obj:
+            if restore_mode != 'EDIT':
+                instrumentation.mode_set(mode=restore_mode)
+        else:
+            instrumentation.mode_set(mode='OBJECT')
+            view_layer.objects.active = prev_active
+            if prev_active is not None and restore_mode != 'OBJECT':
+                instrumentation.mode_set(mode=restore_mode)
@@ -0,0 +1,141 @@
+import re
+import bpy # type: ignore
+from bpy.app.handlers import persistent # type: ignore
+from bpy.props import EnumProperty # type: ignore
+import numpy as np
+from . import selection_cache
+
+# Name lists that stay responsive with thousands of vertex groups or shape
+# keys. template_list only draws the rows in view; what remains per redraw is
+# filtering and sorting, which filter_items() would otherwise redo for every
+# item on every redraw. Names are read once per datablock update, and the
+# filter flags and sort order are cached per filter setting.
+
+_cache = {}
+
+
+class _NameFilter:
+    filter_mode: EnumProperty(
+        name="Filter Mode",
+        items=[
+            ('CONTAINS', "Contains", "Show names containing the filter text"),
+            ('PREFIX', "Prefix", "Show names starting with the filter text"),
+            ('REGEX', "Regex", "Show names matching the filter as a regular expression"),
+        ],
+        default='CONTAINS',
+    ) # type: ignore
+
+    def hidden_rows(self, data):
+        """Rows that never show, whatever the filter"""
+        return ()
+
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        id_data = data.id_data
+        key = (type(self).__name__, self.list_id, id_data.as_pointer(), propname)
+        version = (selection_cache.data_version(id_data), len(items))
+        state = (self.filter_name, self.filter_mode, self.use_filter_invert, self.use_filter_sort_alpha)
+
+        hit = _cache.get(key)
+        if hit is not None and hit[0] == version:
+            names = hit[1]
+            if hit[2] == state:
+                return hit[3]
+        else:
+            names = [item.name.lower() for item in items]
+
+        flags = np.full(len(names), self.bitflag_filter_item, dtype=np.int64)
+        pattern = self.filter_name.lower()
+        if pattern:
+            if self.filter_mode == 'REGEX':
+                try:
+                    matcher = re.compile(self.filter_name, re.IGNORECASE)
+                    keep = [matcher.search(name) is not None for name in names]
+                except re.error:
+                    keep = [True] * len(names)
+            elif self.filter_mode == 'PREFIX':
+                keep = [name.startswith(pattern) for name in names]
+            else:
+                keep = [pattern in name for name in names]
+            keep = np.array(keep, dtype=bool)
+            if self.use_filter_invert:
+                keep = ~keep
+            flags[~keep] = 0
+        for row in self.hidden_rows(data):
+            flags[row] = 0
+
+        order = []
+        if self.use_filter_sort_alpha:
+            # neworder holds the new position of every item
+            ranked = sorted(range(len(names)), key=names.__getitem__)
+            neworder = np.empty(len(names), dtype=np.int64)
+            neworder[ranked] = np.arange(len(names))
+            order = neworder.tolist()
+
+        result = (flags.tolist(), order)
+        _cache[key] = (version, names, state, result)
+        return result
+
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.alert = self.filter_mode == 'REGEX' and not _valid_regex(self.filter_name)
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "use_filter_invert", text="", icon='ARROW_LEFTRIGHT')
+        row = layout.row(align=True)
+        row.prop(self, "filter_mode", expand=True)
+        row.separator()
+        row.prop(self, "use_filter_sort_alpha", text="", icon='SORTALPHA')
+        row.prop(self, "use_filter_sort_reverse", text="", icon='SORT_DESC' if self.use_filter_sort_reverse else 'SORT_ASC')
+
+
+def _valid_regex(pattern):
+    try:
+        re.compile(pattern)
+    except re.error:
+        return False
+    return True
+
+
+class MESH_UL_johnnygizmo_vgroups(_NameFilter, bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        if self.layout_type in {'DEFAULT', 'COMPACT'}:
+            layout.prop(item, "name", text="", emboss=False, icon_value=icon)
+            layout.prop(item, "lock_weight", text="", icon='LOCKED' if item.lock_weight else 'UNLOCKED', emboss=False)
+        elif self.layout_type == 'GRID':
+            layout.alignment = 'CENTER'
+            layout.label(text="", icon_value=icon)
+
+
+class SHAPEKEY_UL_widget_keys(_NameFilter, bpy.types.UIList):
+    def hidden_rows(self, data):
+        # The basis is not a key to drive
+        return (0,)
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        if self.layout_type in {'DEFAULT', 'COMPACT'}:
+            row = layout.row(align=True)
+            row.label(text=item.name, icon='SHAPEKEY_DATA')
+            driven = data.animation_data and data.animation_data.drivers.find(item.path_from_id("value"))
+            if driven:
+                row.label(text="", icon='DRIVER')
+        elif self.layout_type == 'GRID':
+            layout.alignment = 'CENTER'
+            layout.label(text="", icon_value=icon)
+
+
+@persistent
+def _on_load(*args):
+    _cache.clear()
+
+
+def register():
+    bpy.utils.register_class(MESH_UL_johnnygizmo_vgroups)
+    bpy.utils.register_class(SHAPEKEY_UL_widget_keys)
+    bpy.app.handlers.load_post.append(_on_load)
+
+
+def unregister():
+    bpy.app.handlers.load_post.remove(_on_load)
+    bpy.utils.unregister_class(SHAPEKEY_UL_widget_keys)
+    bpy.utils.unregister_class(MESH_UL_johnnygizmo_vgroups)
+    _on_load()
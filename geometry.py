@@ -0,0 +1,184 @@
+import numpy as np
+
+
+def matrix_to_array(matrix):
+    """Return a mathutils 4x4 Matrix as a (4, 4) float64 array"""
+    return np.array(matrix, dtype=np.float64)
+
+
+def transform_points(matrix, points):
+    """Apply a 4x4 matrix (mathutils or array) to an (N, 3) array of points"""
+    m = matrix_to_array(matrix)
+    return points @ m[:3, :3].T + m[:3, 3]
+
+
+def transform_directions(matrix, vectors):
+    """Apply the 3x3 part of a 4x4 matrix to an (N, 3) array of vectors"""
+    m = matrix_to_array(matrix)
+    return vectors @ m[:3, :3].T
+
+
+def read_vertex_coords(mesh):
+    """Return all vertex coordinates of mesh as an (N, 3) float64 array"""
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", co)
+    return co.reshape(-1, 3)
+
+
+def read_vertex_selection(mesh):
+    """Return the vertex selection of mesh as a boolean array"""
+    sel = np.empty(len(mesh.vertices), dtype=bool)
+    mesh.vertices.foreach_get("select", sel)
+    return sel
+
+
+def read_edge_vertices(mesh):
+    """Return the vertex indices of every edge as an (E, 2) int array"""
+    ev = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", ev)
+    return ev.reshape(-1, 2)
+
+
+def connected_components(num_verts, edges, mask=None):
+    """Label connected components of a vertex graph.
+
+    Vectorized union-find: every pass hooks each edge's larger label onto the
+    smaller one and then compresses paths by pointer jumping, so the number of
+    passes grows with the log of the component diameter rather than its size.
+    Vertices outside mask get the label -1.
+    """
+    labels = np.arange(num_verts, dtype=np.int64)
+    if mask is not None:
+        keep = mask[edges[:, 0]] & mask[edges[:, 1]]
+        edges = edges[keep]
+    a = edges[:, 0]
+    b = edges[:, 1]
+
+    while True:
+        la = labels[a]
+        lb = labels[b]
+        low = np.minimum(la, lb)
+        high = np.maximum(la, lb)
+        changed = low != high
+        if not changed.any():
+            break
+        np.minimum.at(labels, high[changed], low[changed])
+        # Pointer jumping until every vertex points at its root
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+    if mask is not None:
+        labels[~mask] = -1
+    return labels
+
+
+def split_islands(labels):
+    """Group vertex indices by component label, ignoring label -1"""
+    idx = np.flatnonzero(labels >= 0)
+    if not len(idx):
+        return []
+    order = idx[np.argsort(labels[idx], kind="stable")]
+    _, starts = np.unique(labels[order], return_index=True)
+    return np.split(order, starts[1:])
+
+
+def principal_axes(points):
+    """Return (centroid, axes, singular_values) of an (N, 3) point cloud.
+
+    Rows of axes are the principal directions sorted by decreasing variance.
+    """
+    centroid = points.mean(axis=0)
+    centered = points - centroid
+    if len(points) < 2:
+        return centroid, np.eye(3), np.zeros(3)
+    _, s, vt = np.linalg.svd(centered, full_matrices=False)
+    if len(s) < 3:
+        # Fewer than three points: complete the basis with an orthogonal axis
+        axes = np.eye(3)
+        axes[:len(s)] = vt
+        if len(s) == 2:
+            axes[2] = np.cross(vt[0], vt[1])
+        else:
+            helper = np.eye(3)[np.argmin(np.abs(vt[0]))]
+            axes[1] = np.cross(vt[0], helper)
+            axes[1] /= np.linalg.norm(axes[1])
+            axes[2] = np.cross(vt[0], axes[1])
+        s = np.concatenate([s, np.zeros(3 - len(s))])
+        vt = axes
+    return centroid, vt, s
+
+
+def orient_axis(axis, preferred):
+    """Flip axis so it points into the same half-space as preferred"""
+    return -axis if np.dot(axis, preferred) < 0.0 else axis
+
+
+def build_adjacency(num_nodes, edges):
+    """Return a CSR (indptr, indices) adjacency for an undirected edge array"""
+    src = np.concatenate([edges[:, 0], edges[:, 1]])
+    dst = np.concatenate([edges[:, 1], edges[:, 0]])
+    order = np.argsort(src, kind="stable")
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=num_nodes), out=indptr[1:])
+    return indptr, dst[order]
+
+
+def gather_neighbors(indptr, indices, nodes):
+    """Return the concatenated CSR neighbours of nodes"""
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    total = counts.sum()
+    if not total:
+        return np.empty(0, dtype=indices.dtype)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return indices[offsets + np.arange(total)]
+
+
+def bfs_distances(indptr, indices, sources):
+    """Hop distance from sources to every node, -1 where unreachable.
+
+    Expands a whole frontier per step, so the cost is linear in the number of
+    edges and the Python loop only runs once per BFS level.
+    """
+    num_nodes = len(indptr) - 1
+    dist = np.full(num_nodes, -1, dtype=np.int64)
+    frontier = np.unique(np.asarray(sources, dtype=np.int64))
+    dist[frontier] = 0
+    level = 0
+    while len(frontier):
+        level += 1
+        nbrs = gather_neighbors(indptr, indices, frontier)
+        nbrs = np.unique(nbrs[dist[nbrs] < 0])
+        dist[nbrs] = level
+        frontier = nbrs
+    return dist
+
+
+def read_bone_matrices(bones):
+    """Return the rest matrices (matrix_local) of armature bones as an (N, 4, 4) array"""
+    flat = np.empty(len(bones) * 16, dtype=np.float32)
+    bones.foreach_get("matrix_local", flat)
+    # RNA stores matrices column-major
+    return flat.reshape(-1, 4, 4).transpose(0, 2, 1).astype(np.float64)
+
+
+def bone_tail_matrices(arm_obj, bone_names):
+    """World matrices that children parented to the named bones are relative to.
+
+    Bone parenting is relative to the bone tail, so this is
+    armature world @ bone rest matrix @ translation(0, length, 0).
+    """
+    bones = arm_obj.data.bones
+    rest = read_bone_matrices(bones)
+    lengths = np.empty(len(bones), dtype=np.float32)
+    bones.foreach_get("length", lengths)
+    index = {b.name: i for i, b in enumerate(bones)}
+    rows = np.array([index[name] for name in bone_names], dtype=np.int64)
+
+    mats = rest[rows].copy()
+    # Translating along local Y by the length moves the origin to the tail
+    mats[:, :3, 3] += mats[:, :3, 1] * lengths[rows, None]
+    return matrix_to_array(arm_obj.matrix_world) @ mats
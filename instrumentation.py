@@ -0,0 +1,195 @@
+import bpy # type: ignore
+import functools
+import json
+import os
+from contextlib import nullcontext
+from time import perf_counter
+
+# Lightweight instrumentation for the add-on. Off by default: span() then
+# returns a shared no-op context manager and count() returns immediately.
+# When enabled, every operator execute is timed as a span named after its
+# bl_idname, and counters (mode_set calls, RNA writes, bones touched, ...)
+# are added to every open span as well as to the session totals.
+#
+# Enable for batch runs with the JOHNNYGIZMO_INSTRUMENT=1 environment variable.
+
+TEXT_NAME = "JohnnyGizmo_Instrumentation"
+
+_enabled = os.environ.get("JOHNNYGIZMO_INSTRUMENT", "") not in {"", "0"}
+_null = nullcontext()
+_stack = []
+_spans = {}
+_totals = {}
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_enabled(enabled):
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def reset():
+    _stack.clear()
+    _spans.clear()
+    _totals.clear()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        _stack.append(self)
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = perf_counter() - self.start
+        _stack.pop()
+        stats = _span_stats(self.name)
+        stats["calls"] += 1
+        stats["total"] += elapsed
+        stats["max"] = max(stats["max"], elapsed)
+        return False
+
+
+def _span_stats(name):
+    stats = _spans.get(name)
+    if stats is None:
+        stats = _spans[name] = {"calls": 0, "total": 0.0, "max": 0.0, "counters": {}}
+    return stats
+
+
+def span(name):
+    """Context manager timing a named block"""
+    if not _enabled:
+        return _null
+    return _Span(name)
+
+
+def count(name, amount=1):
+    """Add amount to a named counter in the session and every open span"""
+    if not _enabled:
+        return
+    _totals[name] = _totals.get(name, 0) + amount
+    for open_span in _stack:
+        counters = _span_stats(open_span.name)["counters"]
+        counters[name] = counters.get(name, 0) + amount
+
+
+def mode_set(mode):
+    """bpy.ops.object.mode_set that is counted as 'mode_set'"""
+    count("mode_set")
+    return bpy.ops.object.mode_set(mode=mode)
+
+
+def instrumented(cls):
+    """Class decorator timing an operator's execute as a span named after bl_idname"""
+    execute = cls.execute
+    name = cls.bl_idname
+
+    @functools.wraps(execute)
+    def wrapper(self, context):
+        if not _enabled:
+            return execute(self, context)
+        with _Span(name):
+            return execute(self, context)
+
+    cls.execute = wrapper
+    return cls
+
+
+def as_dict():
+    """Session data as plain JSON-serializable data"""
+    return {
+        "spans": {
+            name: {
+                "calls": s["calls"],
+                "total_ms": s["total"] * 1000.0,
+                "mean_ms": s["total"] * 1000.0 / s["calls"] if s["calls"] else 0.0,
+                "max_ms": s["max"] * 1000.0,
+                "counters": dict(s["counters"]),
+            }
+            for name, s in _spans.items()
+        },
+        "counters": dict(_totals),
+    }
+
+
+def to_json():
+    return json.dumps(as_dict(), indent=2, sort_keys=True)
+
+
+def format_table():
+    """Session data as a fixed-width text table, slowest spans first"""
+    data = as_dict()
+    lines = [f"{'Span':<48} {'Calls':>6} {'Total ms':>10} {'Mean ms':>9} {'Max ms':>9}  Counters"]
+    for name, s in sorted(data["spans"].items(), key=lambda item: -item[1]["total_ms"]):
+        counters = ", ".join(f"{k}={v}" for k, v in sorted(s["counters"].items()))
+        lines.append(f"{name:<48} {s['calls']:>6} {s['total_ms']:>10.2f} {s['mean_ms']:>9.2f} {s['max_ms']:>9.2f}  {counters}")
+    lines.append("")
+    lines.append("Session counters:")
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f"   {name}: {value}")
+    return "\n".join(lines)
+
+
+class WM_OT_johnnygizmo_instrumentation(bpy.types.Operator):
+    """Enable, inspect or reset the rigging tools instrumentation"""
+    bl_idname = "wm.johnnygizmo_instrumentation"
+    bl_label = "Rigging Tools Instrumentation"
+    bl_options = {'REGISTER'}
+
+    action: bpy.props.EnumProperty(
+        name="Action",
+        items=[
+            ('ENABLE', "Enable", "Start recording spans and counters"),
+            ('DISABLE', "Disable", "Stop recording"),
+            ('TEXT', "Show Table", "Write the session table to a text block"),
+            ('JSON', "Dump JSON", "Write the session data as JSON to a file, or a text block if no path is given"),
+            ('RESET', "Reset", "Clear all recorded data"),
+        ],
+        default='TEXT',
+    ) # type: ignore
+
+    filepath: bpy.props.StringProperty(
+        name="File Path",
+        description="JSON output file (leave empty to write a text block)",
+        subtype='FILE_PATH',
+        default="",
+    ) # type: ignore
+
+    def execute(self, context):
+        if self.action == 'ENABLE':
+            set_enabled(True)
+            self.report({'INFO'}, "Instrumentation enabled")
+        elif self.action == 'DISABLE':
+            set_enabled(False)
+            self.report({'INFO'}, "Instrumentation disabled")
+        elif self.action == 'RESET':
+            reset()
+            self.report({'INFO'}, "Instrumentation data cleared")
+        elif self.action == 'JSON' and self.filepath:
+            with open(bpy.path.abspath(self.filepath), "w", encoding="utf-8") as f:
+                f.write(to_json())
+            self.report({'INFO'}, f"Instrumentation written to {self.filepath}")
+        else:
+            name = TEXT_NAME + (".json" if self.action == 'JSON' else "")
+            text_block = bpy.data.texts.get(name) or bpy.data.texts.new(name)
+            text_block.clear()
+            text_block.write(to_json() if self.action == 'JSON' else format_table())
+            self.report({'INFO'}, f"Instrumentation saved to text block: {name}")
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(WM_OT_johnnygizmo_instrumentation)
+
+
+def unregister():
+    bpy.utils.unregister_class(WM_OT_johnnygizmo_instrumentation)
@@ -1,7 +1,12 @@
 import bpy # type: ignore
 import bmesh # type: ignore
 from mathutils import Vector # type: ignore
+import numpy as np
+from . import geometry
+from . import instrumentation
+from . import edit_session
 
+@instrumentation.instrumented
 class OBJECT_OT_johnnygizmo_add_bone_at_selected(bpy.types.Operator):
     bl_idname = "mesh.johnnygizmo_add_bone_at_selected"
     bl_label = "Add Bone at Selected"
@@ -9,6 +14,16 @@ class OBJECT_OT_johnnygizmo_add_bone_at_selected(bpy.types.Operator):
     bl_options = {'REGISTER','UNDO'}
 
 
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        description="How bones are created from the selection",
+        items=[
+            ('CENTER', "Selection Center", "Add one bone at the center of all selected vertices"),
+            ('ISLANDS', "Each Island", "Add one bone per connected island of selected vertices, aligned to its principal axis"),
+        ],
+        default='CENTER'
+    ) # type: ignore
+
     bone_name: bpy.props.StringProperty(
         name="Bone Name",
         description="Name for the new bone",
@@ -36,6 +51,12 @@ class OBJECT_OT_johnnygizmo_add_bone_at_selected(bpy.types.Operator):
     ) # type: ignore
     use_deform: bpy.props.BoolProperty(name="Use Deform", default=True) # type: ignore
 
+    fit_island_length: bpy.props.BoolProperty(
+        name="Fit Island Length",
+        description="Span each island along its principal axis instead of using Tail Length",
+        default=True
+    ) # type: ignore
+
 
 
     @classmethod
@@ -46,6 +67,17 @@ class OBJECT_OT_johnnygizmo_add_bone_at_selected(bpy.types.Operator):
     def invoke(self, context, event):
         return context.window_manager.invoke_props_dialog(self)
 
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "mode", expand=True)
+        layout.prop(self, "bone_name")
+        layout.prop(self, "tail_direction")
+        if self.mode == 'ISLANDS':
+            layout.prop(self, "fit_island_length")
+        if self.mode == 'CENTER' or not self.fit_island_length:
+            layout.prop(self, "tail_length")
+        layout.prop(self, "use_deform")
+
     def execute(self, context):
         mesh_obj = context.active_object
 
@@ -54,6 +86,9 @@ class OBJECT_OT_johnnygizmo_add_bone_at_selected(bpy.types.Operator):
             self.report({'ERROR'}, "Mesh must be parented to an armature")
             return {'CANCELLED'}
 
+        if self.mode == 'ISLANDS':
+            return self.execute_islands(context, mesh_obj, armature_obj)
+
         # Get selected vertex positions
         bm = bmesh.from_edit_mesh(mesh_obj.data)
         selected_world_verts = [mesh_obj.matrix_world @ v.co for v in bm.verts if v.select]
@@ -66,15 +101,6 @@ class OBJECT_OT_johnnygizmo_add_bone_at_selected(bpy.types.Operator):
         # Convert world space to armature edit space
         center = armature_obj.matrix_world.inverted() @ center_world
 
-        # Switch to edit armature
-        bpy.ops.object.mode_set(mode='OBJECT')
-        context.view_layer.objects.active = armature_obj
-        bpy.ops.object.mode_set(mode='EDIT')
-
-        arm = armature_obj.data
-        new_bone = arm.edit_bones.new(self.bone_name)
-        new_bone.head = center
-
         direction_map = {
                     '+X': Vector((self.tail_length, 0, 0)),
                     '-X': Vector((-self.tail_length, 0, 0)),
@@ -84,17 +110,73 @@ class OBJECT_OT_johnnygizmo_add_bone_at_selected(bpy.types.Operator):
                     '-Z': Vector((0, 0, -self.tail_length)),
                 }
         direction_vector = direction_map[self.tail_direction]
-        new_bone.tail = center + direction_vector
-        new_bone.use_deform = self.use_deform
 
-        bpy.ops.object.mode_set(mode='OBJECT')
-        #context.view_layer.update()
-        #bpy.ops.object.mode_set(mode='OBJECT')
-        context.view_layer.objects.active = mesh_obj
-        bpy.ops.object.mode_set(mode='EDIT')
+        # Edit the armature, then come back to the mesh in Edit Mode
+        with edit_session.armature_edit(context, armature_obj) as edit_bones:
+            new_bone = edit_bones.new(self.bone_name)
+            new_bone.head = center
+            new_bone.tail = center + direction_vector
+            new_bone.use_deform = self.use_deform
 
         return {'FINISHED'}
 
+    def execute_islands(self, context, mesh_obj, armature_obj):
+        # Sync the edit-mesh into mesh data so it can be read with foreach_get
+        mesh_obj.update_from_editmode()
+        mesh = mesh_obj.data
+
+        selected = geometry.read_vertex_selection(mesh)
+        if not selected.any():
+            self.report({'ERROR'}, "No vertices selected")
+            return {'CANCELLED'}
+
+        labels = geometry.connected_components(len(mesh.vertices), geometry.read_edge_vertices(mesh), selected)
+        islands = geometry.split_islands(labels)
+
+        # Work in armature space so the bones can be written directly
+        to_armature = np.linalg.inv(geometry.matrix_to_array(armature_obj.matrix_world)) @ geometry.matrix_to_array(mesh_obj.matrix_world)
+        coords = geometry.transform_points(to_armature, geometry.read_vertex_coords(mesh))
+
+        direction_map = {
+            '+X': (1, 0, 0), '-X': (-1, 0, 0),
+            '+Y': (0, 1, 0), '-Y': (0, -1, 0),
+            '+Z': (0, 0, 1), '-Z': (0, 0, -1),
+        }
+        preferred = np.array(direction_map[self.tail_direction], dtype=np.float64)
+
+        bone_points = []
+        for island in islands:
+            points = coords[island]
+            centroid, axes, singular = geometry.principal_axes(points)
+            if singular[0] > 1e-6:
+                axis = geometry.orient_axis(axes[0], preferred)
+            else:
+                # Single vertex or coincident points: no principal axis
+                axis = preferred
+
+            head = centroid
+            tail = centroid + axis * self.tail_length
+            if self.fit_island_length:
+                proj = (points - centroid) @ axis
+                extent = proj.max() - proj.min()
+                if extent > 1e-6:
+                    head = centroid + axis * proj.min()
+                    tail = centroid + axis * proj.max()
+            bone_points.append((head, tail))
+
+        # Create every bone in a single armature edit session
+        with edit_session.armature_edit(context, armature_obj) as edit_bones:
+            for i, (head, tail) in enumerate(bone_points):
+                new_bone = edit_bones.new(f"{self.bone_name}_{i:03d}")
+                new_bone.head = Vector(head)
+                new_bone.tail = Vector(tail)
+                new_bone.use_deform = self.use_deform
+        instrumentation.count("bones_touched", len(bone_points))
+        instrumentation.count("rna_writes", 3 * len(bone_points))
+
+        self.report({'INFO'}, f"Created {len(bone_points)} bones, one per island")
+        return {'FINISHED'}
+
 def menu_func(self, context):
     ob = context.active_object
     if ob and ob.type == 'MESH' and ob.parent and ob.parent.type == 'ARMATURE' and ob.mode == 'EDIT':
@@ -1,8 +1,13 @@
 import bpy # type: ignore
 import bmesh # type: ignore
 from mathutils import Vector # type: ignore
+import numpy as np
+from . import instrumentation
+from . import armature_snapshot
+from . import edit_session
 
 BONE_LOCATIONS = {}
+ENUM_ITEMS = []
 
 def get_selected_vert_center(context):
     obj = context.edit_object
@@ -14,7 +19,6 @@ def get_selected_vert_center(context):
     return obj.matrix_world @ center
 
 def get_bone_endpoints(self, context):
-    global BONE_LOCATIONS
     bone_points = []
     center = get_selected_vert_center(context)
     obj = context.edit_object
@@ -22,22 +26,26 @@ def get_bone_endpoints(self, context):
 
     BONE_LOCATIONS.clear()
 
-    for bone in armature_obj.data.bones:
-        head_label = f"{bone.name} >>> Head"
-        tail_label = f"{bone.name} >>> Tail"
-
-        head_loc = armature_obj.matrix_world @ bone.head_local
-        tail_loc = armature_obj.matrix_world @ bone.tail_local
-
-        BONE_LOCATIONS[head_label] = head_loc
-        BONE_LOCATIONS[tail_label] = tail_loc
-
-        bone_points.append((head_label, head_label, head_loc))
-        bone_points.append((tail_label, tail_label, tail_loc))
-
-    bone_points.sort(key=lambda x: (x[2] - center).length)
-    return [(x[0], x[1], f"Distance: {(x[2] - center).length:.2f}") for x in bone_points]
-
+    # Heads and tails of every bone, sorted by distance in one vectorized pass
+    snap = armature_snapshot.snapshot(armature_obj.data)
+    points = np.concatenate([
+        snap.world_points(armature_obj.matrix_world, 'HEAD'),
+        snap.world_points(armature_obj.matrix_world, 'TAIL'),
+    ])
+    dist = np.linalg.norm(points - np.array(center), axis=1)
+    count = len(snap)
+
+    for i in np.argsort(dist, kind='stable'):
+        name = snap.names[i % count]
+        label = f"{name} >>> {'Head' if i < count else 'Tail'}"
+        BONE_LOCATIONS[label] = Vector(points[i])
+        bone_points.append((label, label, f"Distance: {dist[i]:.2f}"))
+
+    # Blender needs the enum item strings to stay referenced from Python
+    ENUM_ITEMS[:] = bone_points
+    return ENUM_ITEMS
+
+@instrumentation.instrumented
 class MESH_OT_johnnygizmo_mesh_bone_magnet_operator(bpy.types.Operator):
     bl_idname = "object.johnnygizmo_mesh_bone_magnet"
     bl_label = "Mesh Bone Magnet"
@@ -90,43 +98,38 @@ class MESH_OT_johnnygizmo_mesh_bone_magnet_operator(bpy.types.Operator):
         bone_name, part = self.target_bone_part.split(" >>> ")
         bpy.ops.view3d.snap_cursor_to_selected()
         
-        bpy.ops.object.mode_set(mode='OBJECT')
-        context.view_layer.objects.active = arm_obj
-        bpy.ops.object.mode_set(mode='EDIT')
-
-        bone = arm_obj.data.edit_bones.get(bone_name)
-        if not bone:
-            self.report({'ERROR'}, "Bone not found.")
-            return {'CANCELLED'}
-
-        
         cursor_world = context.scene.cursor.location
         cursor_local = arm_obj.matrix_world.inverted() @ cursor_world
 
-        # if part == "Head":
-        #     # Keep tail in world space
-        #     world_tail = arm_obj.matrix_world @ bone.tail
-        #     bone.head = cursor_local
-        #     bone.tail = arm_obj.matrix_world.inverted() @ world_tail
-        if part == "Head":
-            if self.move_tail_with_head:
-                # Move both head and tail, preserving bone vector
-                delta = cursor_local - bone.head
-                bone.head = cursor_local
-                bone.tail += delta
-            else:
-                # Move just the head, preserve world-space tail
-                world_tail = arm_obj.matrix_world @ bone.tail
-                bone.head = cursor_local
-                bone.tail = arm_obj.matrix_world.inverted() @ world_tail
-
-
-        elif part == "Tail":
-            bone.tail = cursor_local
-
-        bpy.ops.object.mode_set(mode='OBJECT')
-        context.view_layer.objects.active = mesh_obj
-        bpy.ops.object.mode_set(mode='EDIT')
+        # Edit the armature, then come back to the mesh in Edit Mode
+        with edit_session.armature_edit(context, arm_obj) as edit_bones:
+            bone = edit_bones.get(bone_name)
+            found = bone is not None
+            if found:
+                # if part == "Head":
+                #     # Keep tail in world space
+                #     world_tail = arm_obj.matrix_world @ bone.tail
+                #     bone.head = cursor_local
+                #     bone.tail = arm_obj.matrix_world.inverted() @ world_tail
+                if part == "Head":
+                    if self.move_tail_with_head:
+                        # Move both head and tail, preserving bone vector
+                        delta = cursor_local - bone.head
+                        bone.head = cursor_local
+                        bone.tail += delta
+                    else:
+                        # Move just the head, preserve world-space tail
+                        world_tail = arm_obj.matrix_world @ bone.tail
+                        bone.head = cursor_local
+                        bone.tail = arm_obj.matrix_world.inverted() @ world_tail
+
+
+                elif part == "Tail":
+                    bone.tail = cursor_local
+
+        if not found:
+            self.report({'ERROR'}, "Bone not found.")
+            return {'CANCELLED'}
 
         # Restore armature visual settings
         arm_obj.data.show_names = self._show_names_prev
@@ -0,0 +1,304 @@
+import bpy # type: ignore
+from mathutils import Vector # type: ignore
+import numpy as np
+from . import geometry
+from . import instrumentation
+
+# Half of the 26-neighbourhood; the other half is covered by symmetry
+NEIGHBOR_OFFSETS = np.array(
+    [(dx, dy, dz)
+     for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+     if (dx, dy, dz) > (0, 0, 0)],
+    dtype=np.int64,
+)
+
+
+def voxelize(points, edge_length, resolution, max_voxels):
+    """Quantize points into a sparse voxel set.
+
+    The voxel size starts at the bounding box divided by resolution, is never
+    smaller than the typical edge length (so the surface shell stays
+    connected) and grows until the occupied voxel count fits in max_voxels.
+    Returns (voxel_size, origin, coords) where coords are the integer
+    coordinates of the occupied voxels.
+    """
+    origin = points.min(axis=0)
+    extent = points.max(axis=0) - origin
+    voxel_size = max(extent.max() / resolution, edge_length, 1e-6)
+
+    while True:
+        cells = np.floor((points - origin) / voxel_size).astype(np.int64)
+        dims = cells.max(axis=0) + 1
+        keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+        unique_keys = np.unique(keys)
+        if len(unique_keys) <= max_voxels:
+            break
+        voxel_size *= max((len(unique_keys) / max_voxels) ** 0.5, 1.1)
+
+    coords = np.stack(np.unravel_index(unique_keys, dims), axis=1)
+    return voxel_size, origin, coords
+
+
+def voxel_edges(coords):
+    """Return the 26-connected neighbour pairs of a sparse voxel set"""
+    dims = coords.max(axis=0) + 3
+    shifted = coords + 1
+    keys = (shifted[:, 0] * dims[1] + shifted[:, 1]) * dims[2] + shifted[:, 2]
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+
+    edges = []
+    for offset in NEIGHBOR_OFFSETS:
+        n = shifted + offset
+        nkeys = (n[:, 0] * dims[1] + n[:, 1]) * dims[2] + n[:, 2]
+        pos = np.clip(np.searchsorted(sorted_keys, nkeys), 0, len(sorted_keys) - 1)
+        hit = sorted_keys[pos] == nkeys
+        edges.append(np.stack([np.flatnonzero(hit), order[pos[hit]]], axis=1))
+    return np.concatenate(edges)
+
+
+def skeleton_graph(positions, edges, root, levels):
+    """Contract geodesic level sets of the voxel graph into a tree.
+
+    Voxels are binned into bands of equal geodesic distance from root; every
+    connected piece of a band becomes a node at its centroid. On a tube each
+    band is a ring whose centroid lies on the medial curve, and a band that
+    splits into several pieces marks a branch point.
+    Returns (node_positions, node_parent, node_level) with -1 as the root's parent.
+    """
+    indptr, indices = geometry.build_adjacency(len(positions), edges)
+    dist = geometry.bfs_distances(indptr, indices, [root])
+    reached = dist >= 0
+    step = max(1, int(np.ceil(dist.max() / levels)))
+    band = np.where(reached, dist // step, -1)
+
+    # Pieces of each band
+    same = band[edges[:, 0]] == band[edges[:, 1]]
+    labels = geometry.connected_components(len(positions), edges[same], reached)
+    node_ids, voxel_node = np.unique(labels[reached], return_inverse=True)
+    voxel_node = voxel_node.reshape(-1)
+    num_nodes = len(node_ids)
+
+    counts = np.bincount(voxel_node, minlength=num_nodes)
+    node_positions = np.stack(
+        [np.bincount(voxel_node, weights=positions[reached][:, i], minlength=num_nodes) for i in range(3)],
+        axis=1,
+    ) / counts[:, None]
+    node_level = np.zeros(num_nodes, dtype=np.int64)
+    node_level[voxel_node] = band[reached]
+
+    # Link every node to a touching node one band closer to the root
+    node_of = np.full(len(positions), -1, dtype=np.int64)
+    node_of[reached] = voxel_node
+    a = node_of[edges[:, 0]]
+    b = node_of[edges[:, 1]]
+    valid = (a >= 0) & (b >= 0)
+    a, b = a[valid], b[valid]
+    child = np.concatenate([a, b])
+    parent = np.concatenate([b, a])
+    down = node_level[parent] == node_level[child] - 1
+    node_parent = np.full(num_nodes, -1, dtype=np.int64)
+    node_parent[child[down]] = parent[down]
+    return node_positions, node_parent, node_level
+
+
+def prune_branches(node_parent, min_length):
+    """Return a keep mask that drops leaf branches shorter than min_length nodes"""
+    num_nodes = len(node_parent)
+    keep = np.ones(num_nodes, dtype=bool)
+    if min_length <= 1:
+        return keep
+    child_count = np.bincount(node_parent[node_parent >= 0], minlength=num_nodes)
+    for leaf in np.flatnonzero(child_count == 0):
+        branch = [leaf]
+        node = node_parent[leaf]
+        while node >= 0 and child_count[node] == 1 and node_parent[node] >= 0:
+            branch.append(node)
+            node = node_parent[node]
+        # Only prune twigs that hang off a branch point
+        if node >= 0 and child_count[node] > 1 and len(branch) < min_length:
+            keep[branch] = False
+    return keep
+
+
+@instrumentation.instrumented
+class MESH_OT_johnnygizmo_curve_skeleton(bpy.types.Operator):
+    bl_idname = "mesh.johnnygizmo_curve_skeleton"
+    bl_label = "Curve Skeleton Armature"
+    bl_description = (
+        "Create an armature following the curve skeleton of the selection (or whole mesh in Object Mode). "
+        "Branching shapes produce branching bone chains"
+    )
+    bl_options = {'REGISTER', 'UNDO'}
+
+    bones_per_path: bpy.props.IntProperty(
+        name="Bones Along Longest Path",
+        description="Number of bones along the longest path from the root",
+        default=12,
+        min=1,
+        max=500,
+    )  # type: ignore
+
+    resolution: bpy.props.IntProperty(
+        name="Voxel Resolution",
+        description="Voxels along the largest dimension of the selection (coarsened automatically for sparse meshes)",
+        default=96,
+        min=8,
+        max=1024,
+    )  # type: ignore
+
+    max_voxels: bpy.props.IntProperty(
+        name="Max Voxels",
+        description="Upper bound on occupied voxels; the voxel size grows until the selection fits",
+        default=2000000,
+        min=1000,
+    )  # type: ignore
+
+    root: bpy.props.EnumProperty(
+        name="Root",
+        description="Where the chain starts",
+        items=[
+            ('CURSOR', "3D Cursor", "Start at the part of the mesh closest to the 3D cursor"),
+            ('EXTREMITY', "Extremity", "Start at the end farthest from the rest of the mesh"),
+        ],
+        default='CURSOR',
+    )  # type: ignore
+
+    min_branch_bones: bpy.props.IntProperty(
+        name="Min Branch Bones",
+        description="Side branches with fewer bones than this are removed as noise",
+        default=2,
+        min=1,
+    )  # type: ignore
+
+    bone_name: bpy.props.StringProperty(
+        name="Bone Name",
+        description="Base name for the new bones",
+        default="Skel",
+    )  # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj and obj.type == 'MESH' and obj.mode in {'EDIT', 'OBJECT'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        mesh_obj = context.active_object
+        in_edit = mesh_obj.mode == 'EDIT'
+        if in_edit:
+            mesh_obj.update_from_editmode()
+        mesh = mesh_obj.data
+
+        coords = geometry.read_vertex_coords(mesh)
+        edges = geometry.read_edge_vertices(mesh)
+        if in_edit:
+            mask = geometry.read_vertex_selection(mesh)
+            edges = edges[mask[edges[:, 0]] & mask[edges[:, 1]]]
+            if not mask.any():
+                self.report({'ERROR'}, "No vertices selected")
+                return {'CANCELLED'}
+        else:
+            mask = np.ones(len(coords), dtype=bool)
+        if not len(coords):
+            self.report({'ERROR'}, "Mesh has no vertices")
+            return {'CANCELLED'}
+
+        points = geometry.transform_points(mesh_obj.matrix_world, coords)
+        if len(edges):
+            lengths = np.linalg.norm(points[edges[:, 0]] - points[edges[:, 1]], axis=1)
+            edge_length = float(np.percentile(lengths, 90))
+        else:
+            edge_length = 0.0
+        points = points[mask]
+
+        voxel_size, origin, cells = voxelize(points, edge_length, self.resolution, self.max_voxels)
+        positions = origin + (cells + 0.5) * voxel_size
+        vedges = voxel_edges(cells)
+
+        if self.root == 'CURSOR':
+            cursor = np.array(context.scene.cursor.location)
+            root = int(np.argmin(np.linalg.norm(positions - cursor, axis=1)))
+        else:
+            # Double sweep: the farthest voxel from anywhere is an extremity
+            indptr, indices = geometry.build_adjacency(len(positions), vedges)
+            dist = geometry.bfs_distances(indptr, indices, [0])
+            root = int(np.argmax(dist))
+
+        node_positions, node_parent, node_level = skeleton_graph(positions, vedges, root, self.bones_per_path)
+        keep = prune_branches(node_parent, self.min_branch_bones)
+
+        # Name bones by branch: a new branch starts below the root and at every fork
+        order = np.argsort(node_level, kind='stable')
+        child_count = np.bincount(node_parent[keep & (node_parent >= 0)], minlength=len(node_parent))
+        branch_of = {}
+        segment_of = {}
+        next_branch = 0
+        for node in order:
+            parent = node_parent[node]
+            if not keep[node] or parent < 0:
+                continue
+            if parent in branch_of and child_count[parent] == 1:
+                branch_of[node] = branch_of[parent]
+                segment_of[node] = segment_of[parent] + 1
+            else:
+                branch_of[node] = next_branch
+                segment_of[node] = 1
+                next_branch += 1
+
+        if not branch_of:
+            self.report({'ERROR'}, "Selection is too small to build a skeleton; lower the voxel resolution")
+            return {'CANCELLED'}
+
+        root_node = int(order[0])
+        root_world = Vector(node_positions[root_node])
+
+        if in_edit:
+            instrumentation.mode_set(mode='OBJECT')
+
+        arm_data = bpy.data.armatures.new(mesh_obj.name + "_Skeleton")
+        arm_obj = bpy.data.objects.new(mesh_obj.name + "_Skeleton", arm_data)
+        arm_obj.location = root_world
+        context.collection.objects.link(arm_obj)
+
+        bpy.ops.object.select_all(action='DESELECT')
+        arm_obj.select_set(True)
+        context.view_layer.objects.active = arm_obj
+        instrumentation.mode_set(mode='EDIT')
+
+        edit_bones = arm_data.edit_bones
+        bone_of = {}
+        for node in order:
+            if node not in branch_of:
+                continue
+            parent = node_parent[node]
+            bone = edit_bones.new(f"{self.bone_name}_{branch_of[node]:02d}_{segment_of[node]:02d}")
+            bone.head = Vector(node_positions[parent]) - root_world
+            bone.tail = Vector(node_positions[node]) - root_world
+            if parent in bone_of:
+                bone.parent = bone_of[parent]
+                bone.use_connect = True
+            bone_of[node] = bone
+        instrumentation.count("bones_touched", len(bone_of))
+        instrumentation.count("rna_writes", 4 * len(bone_of))
+
+        instrumentation.mode_set(mode='OBJECT')
+
+        self.report({'INFO'}, f"Created {len(bone_of)} bones in {next_branch} branches (voxel size {voxel_size:.4f})")
+        return {'FINISHED'}
+
+
+def menu_func(self, context):
+    self.layout.operator(MESH_OT_johnnygizmo_curve_skeleton.bl_idname, icon='OUTLINER_OB_ARMATURE')
+
+
+def register():
+    bpy.utils.register_class(MESH_OT_johnnygizmo_curve_skeleton)
+    bpy.types.VIEW3D_MT_edit_mesh.append(menu_func)
+
+
+def unregister():
+    bpy.types.VIEW3D_MT_edit_mesh.remove(menu_func)
+    bpy.utils.unregister_class(MESH_OT_johnnygizmo_curve_skeleton)
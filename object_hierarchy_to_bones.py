@@ -0,0 +1,175 @@
+import bpy # type: ignore
+from mathutils import Vector, Matrix # type: ignore
+import numpy as np
+from . import geometry
+from . import instrumentation
+
+
+def collect_hierarchy(roots, objects):
+    """Breadth-first list of roots and all their descendants with a parent index array.
+
+    Children are gathered in a single pass over objects, since Object.children
+    scans the whole file on every access.
+    """
+    children = {}
+    for obj in objects:
+        if obj.parent is not None:
+            children.setdefault(obj.parent.name, []).append(obj)
+
+    nodes = list(roots)
+    parents = [-1] * len(nodes)
+    i = 0
+    while i < len(nodes):
+        for child in children.get(nodes[i].name, ()):
+            nodes.append(child)
+            parents.append(i)
+        i += 1
+    return nodes, np.array(parents, dtype=np.int64)
+
+
+@instrumentation.instrumented
+class OBJECT_OT_johnnygizmo_hierarchy_to_bones(bpy.types.Operator):
+    """Build a bone hierarchy that matches the parenting of the selected objects and their children"""
+    bl_idname = "object.johnnygizmo_hierarchy_to_bones"
+    bl_label = "Object Hierarchy to Bones"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    include_types: bpy.props.EnumProperty(
+        name="Objects",
+        description="Which objects become bones",
+        items=[
+            ('ALL', "Empties and Meshes", "Every object in the hierarchy gets a bone"),
+            ('EMPTY', "Empties Only", "Only empties get bones; meshes are parented to their nearest empty's bone"),
+        ],
+        default='ALL',
+    )  # type: ignore
+
+    leaf_length: bpy.props.FloatProperty(
+        name="Leaf Length",
+        description="Length of bones without children, relative to their parent bone (0 uses the median bone length)",
+        default=0.5,
+        min=0.0,
+    )  # type: ignore
+
+    parent_objects: bpy.props.BoolProperty(
+        name="Parent Objects to Bones",
+        description="Parent every mesh (and empty) to its bone, keeping its world transform",
+        default=True,
+    )  # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT' and bool(context.selected_objects)
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        selected = set(context.selected_objects)
+        roots = [o for o in context.selected_objects
+                 if o.type in {'EMPTY', 'MESH'} and o.parent not in selected]
+        if not roots:
+            self.report({'ERROR'}, "Select the root empties or meshes of a hierarchy")
+            return {'CANCELLED'}
+
+        nodes, parents = collect_hierarchy(roots, context.scene.objects)
+        wanted = {'EMPTY'} if self.include_types == 'EMPTY' else {'EMPTY', 'MESH'}
+
+        # Nodes that get a bone, and for every node the bone node it belongs to
+        has_bone = np.array([o.type in wanted for o in nodes], dtype=bool)
+        owner = np.full(len(nodes), -1, dtype=np.int64)
+        for i in range(len(nodes)):
+            if has_bone[i]:
+                owner[i] = i
+            elif parents[i] >= 0:
+                owner[i] = owner[parents[i]]
+        bone_parent = np.where(parents >= 0, owner[np.maximum(parents, 0)], -1)
+
+        # Batched rest poses from world matrices
+        worlds = np.array([geometry.matrix_to_array(o.matrix_world) for o in nodes])
+        heads = worlds[:, :3, 3]
+        y_axes = worlds[:, :3, 1]
+        z_axes = worlds[:, :3, 2]
+
+        bone_nodes = np.flatnonzero(has_bone)
+        linked = bone_nodes[bone_parent[bone_nodes] >= 0]
+        child_sum = np.zeros_like(heads)
+        child_count = np.zeros(len(nodes), dtype=np.int64)
+        np.add.at(child_sum, bone_parent[linked], heads[linked])
+        np.add.at(child_count, bone_parent[linked], 1)
+
+        # Bones with children point at the average child; leaves follow their local Y
+        to_children = child_sum / np.maximum(child_count, 1)[:, None] - heads
+        reach = np.linalg.norm(to_children, axis=1)
+        branch = (child_count > 0) & (reach > 1e-6)
+        lengths = np.where(branch, reach, 0.0)
+        directions = np.where(branch[:, None], to_children / np.maximum(reach, 1e-12)[:, None], 0.0)
+
+        y_norm = np.linalg.norm(y_axes, axis=1)
+        y_dirs = np.where(y_norm[:, None] > 1e-12, y_axes / np.maximum(y_norm, 1e-12)[:, None], (0.0, 1.0, 0.0))
+        leaves = has_bone & ~branch
+        fallback = float(np.median(lengths[branch])) if branch.any() else 0.1
+        if self.leaf_length > 0.0:
+            parent_len = np.where(bone_parent >= 0, lengths[np.maximum(bone_parent, 0)], 0.0)
+            leaf_len = np.where(parent_len > 0.0, parent_len * self.leaf_length, fallback)
+        else:
+            leaf_len = np.full(len(nodes), fallback)
+        lengths[leaves] = leaf_len[leaves]
+        directions[leaves] = y_dirs[leaves]
+        tails = heads + directions * lengths[:, None]
+
+        arm_data = bpy.data.armatures.new(roots[0].name + "_Rig")
+        arm_obj = bpy.data.objects.new(roots[0].name + "_Armature", arm_data)
+        context.collection.objects.link(arm_obj)
+
+        # Single edit session; nodes are breadth-first so parents exist first
+        bpy.ops.object.select_all(action='DESELECT')
+        arm_obj.select_set(True)
+        context.view_layer.objects.active = arm_obj
+        instrumentation.mode_set(mode='EDIT')
+        edit_bones = arm_data.edit_bones
+        bone_names = {}
+        created = {}
+        for i in bone_nodes:
+            bone = edit_bones.new(nodes[i].name)
+            bone.head = Vector(heads[i])
+            bone.tail = Vector(tails[i])
+            bone.align_roll(Vector(z_axes[i]))
+            if bone_parent[i] >= 0:
+                bone.parent = created[bone_parent[i]]
+            created[i] = bone
+            bone_names[i] = bone.name
+        instrumentation.count("bones_touched", len(bone_nodes))
+        instrumentation.count("rna_writes", 4 * len(bone_nodes))
+        instrumentation.mode_set(mode='OBJECT')
+
+        parented = 0
+        if self.parent_objects:
+            targets = [i for i in range(len(nodes)) if owner[i] >= 0]
+            parent_mats = geometry.bone_tail_matrices(arm_obj, [bone_names[owner[i]] for i in targets])
+            parent_inverses = np.linalg.inv(parent_mats)
+            for k, i in enumerate(targets):
+                obj = nodes[i]
+                obj.parent = arm_obj
+                obj.parent_type = 'BONE'
+                obj.parent_bone = bone_names[owner[i]]
+                obj.matrix_parent_inverse = Matrix(parent_inverses[k].tolist())
+                obj.matrix_basis = Matrix(worlds[i].tolist())
+                parented += 1
+
+        self.report({'INFO'}, f"Created {len(bone_nodes)} bones from {len(nodes)} objects, parented {parented}")
+        return {'FINISHED'}
+
+
+def menu_func(self, context):
+    self.layout.operator(OBJECT_OT_johnnygizmo_hierarchy_to_bones.bl_idname, icon='OUTLINER_OB_ARMATURE')
+
+
+def register():
+    bpy.utils.register_class(OBJECT_OT_johnnygizmo_hierarchy_to_bones)
+    bpy.types.VIEW3D_MT_object_parent.append(menu_func)
+
+
+def unregister():
+    bpy.types.VIEW3D_MT_object_parent.remove(menu_func)
+    bpy.utils.unregister_class(OBJECT_OT_johnnygizmo_hierarchy_to_bones)
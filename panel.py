@@ -1,4 +1,5 @@
 import bpy # type: ignore
+from . import instrumentation
 
 
 
@@ -49,7 +50,7 @@ def vertex_group_picker_menu(self, context,parent=None):
         rows = 5
 
     row = layout.row()
-    row.template_list("MESH_UL_vgroups", "", ob, "vertex_groups", ob.vertex_groups, "active_index", rows=rows)
+    row.template_list("MESH_UL_johnnygizmo_vgroups", "", ob, "vertex_groups", ob.vertex_groups, "active_index", rows=rows)
 
     col = row.column(align=True)
 
@@ -105,6 +106,7 @@ class VIEW3D_PT_johnnygizmo_rigging_tools(bpy.types.Panel):
             tools_head.label(text="Mesh Rigging Tools")
             if tools_display:
                 tools_display.operator("mesh.johnnygizmo_create_rig_and_assign", text="Create Parent Armature", icon='OUTLINER_OB_ARMATURE')
+                tools_display.operator("mesh.johnnygizmo_curve_skeleton", text="Curve Skeleton Armature", icon='OUTLINER_OB_ARMATURE')
               
         elif ob and ob.type == 'MESH' and ob.mode == 'EDIT' and ob.parent and ob.parent.type == 'ARMATURE':
             (tools_head, tools_display) = layout.panel("tools_disp")
@@ -128,6 +130,8 @@ class VIEW3D_PT_johnnygizmo_rigging_tools(bpy.types.Panel):
                 
                 tools_display.operator("armature.align_bone_to_face", text="Bone Align to Face", icon='SNAP_ON')
                 tools_display.operator("armature.align_connected_children", text="Bone Chain Align", icon='SNAP_ON')
+                tools_display.operator("armature.fit_chain_plane", text="Fit Chains to Plane", icon='MESH_PLANE')
+                tools_display.operator("armature.fit_chain_to_curve", text="Fit Chain to Curve", icon='CURVE_DATA')
     
         elif ob and ob.type == 'ARMATURE' and ob.mode == 'OBJECT' and meshes and len(meshes) > 0:
             (tools_head, tools_display) = layout.panel("tools_disp")
@@ -135,6 +139,12 @@ class VIEW3D_PT_johnnygizmo_rigging_tools(bpy.types.Panel):
             if tools_display:
                 tools_display.operator("object.parent_meshes_to_nearest_bone", text="Parent Meshes to Bones", icon='SNAP_ON')
 
+        elif ob and ob.type == 'EMPTY' and ob.mode == 'OBJECT':
+            (tools_head, tools_display) = layout.panel("tools_disp")
+            tools_head.label(text="Object Rigging Tools")
+            if tools_display:
+                tools_display.operator("object.johnnygizmo_hierarchy_to_bones", text="Hierarchy to Bones", icon='OUTLINER_OB_ARMATURE')
+
         elif ob and ob.type == 'ARMATURE' and ob.mode == 'POSE':    
             (tools_head, tools_display1) = layout.panel("tools_disp")
             tools_head.label(text="Armature Pose Rigging Tools")    
@@ -142,6 +152,7 @@ class VIEW3D_PT_johnnygizmo_rigging_tools(bpy.types.Panel):
             if tools_display1:
                 row = tools_display1.row()
                 row.operator("armature.bone_doctor", text="Bone Doctor", icon='SHADING_BBOX')
+                row.operator("armature.driver_audit", text="Driver Audit", icon='DRIVER')
                 if (len(context.selected_pose_bones) >=1 ):       
                     row = tools_display1.row()
                     row.operator("jg.bone_chain_rename", text="Chain Rename", icon='FONT_DATA')                 
@@ -173,6 +184,8 @@ class VIEW3D_PT_johnnygizmo_rigging_tools(bpy.types.Panel):
             mesh_head.label(text="Mesh: "+ob.name)
             if(mesh_display):
                 mesh_display.operator("mesh.johnnygizmo_create_rig_and_assign", text="Create Parent Bone", icon='BONE_DATA')   
+                if ob.mode == 'OBJECT' and len(meshes) > 1:
+                    mesh_display.operator("object.johnnygizmo_rig_selected_meshes", text="Rig Selected Meshes", icon='OUTLINER_OB_ARMATURE')
 
         if ob and ob.type == 'MESH' and ob.parent and ob.parent.type == 'ARMATURE' and ob.parent_type == "BONE":
             (mesh_head, mesh_display) = layout.panel("arm_disp")
@@ -291,6 +304,21 @@ class VIEW3D_PT_johnnygizmo_rigging_tools(bpy.types.Panel):
         #     if bone_group_display:
         #         bone_group_picker(self, context, tools_display)
 
+        (inst_head, inst_display) = layout.panel("instrumentation_disp", default_closed=True)
+        inst_head.label(text="Instrumentation")
+        if inst_display:
+            row = inst_display.row(align=True)
+            if instrumentation.is_enabled():
+                row.operator("wm.johnnygizmo_instrumentation", text="Disable", icon='PAUSE').action = 'DISABLE'
+            else:
+                row.operator("wm.johnnygizmo_instrumentation", text="Enable", icon='PLAY').action = 'ENABLE'
+            row.operator("wm.johnnygizmo_instrumentation", text="Reset", icon='X').action = 'RESET'
+            row = inst_display.row(align=True)
+            row.operator("wm.johnnygizmo_instrumentation", text="Show Table", icon='TEXT').action = 'TEXT'
+            row.operator("wm.johnnygizmo_instrumentation", text="Dump JSON", icon='FILE').action = 'JSON'
+            if ob and ob.type == 'ARMATURE':
+                inst_display.operator("wm.johnnygizmo_driver_benchmark", text="Benchmark Rig Drivers", icon='TIME')
+
 def register():
     bpy.utils.register_class(VIEW3D_PT_johnnygizmo_rigging_tools)
 
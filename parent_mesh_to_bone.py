@@ -1,5 +1,7 @@
 import bpy  # type: ignore
+from . import instrumentation
 
+@instrumentation.instrumented
 class OBJECT_OT_johnnygizmo_parent_mesh_to_selected_bone(bpy.types.Operator):
     """Parent a mesh to a selected bone via popup"""
     bl_idname = "object.johnnygizmo_parent_mesh_to_selected_bone"
@@ -1,7 +1,10 @@
 import bpy # type: ignore
-import bmesh # type: ignore
 from mathutils import Vector # type: ignore
+from . import geometry
+from . import instrumentation
+from . import armature_snapshot
 
+@instrumentation.instrumented
 class OBJECT_OT_parent_meshes_to_nearest_bone(bpy.types.Operator):
     """Parent selected mesh objects to nearest bone of active armature"""
     bl_idname = "object.parent_meshes_to_nearest_bone"
@@ -78,42 +81,18 @@ class OBJECT_OT_parent_meshes_to_nearest_bone(bpy.types.Operator):
         eval_obj = obj.evaluated_get(depsgraph)
         mesh = eval_obj.to_mesh()
 
-        bm = bmesh.new()
-        bm.from_mesh(mesh)
-        bm.verts.ensure_lookup_table()
+        coords = geometry.read_vertex_coords(mesh)
+        avg = obj.matrix_world @ Vector(coords.mean(axis=0)) if len(coords) else obj.matrix_world.translation.copy()
 
-        total = Vector((0, 0, 0))
-        for vert in bm.verts:
-            total += obj.matrix_world @ vert.co
-        avg = total / len(bm.verts)
-
-        bm.free()
         eval_obj.to_mesh_clear()
 
         return avg
 
     def find_nearest_bone(self, armature, location_world):
-        min_distance = float('inf')
-        nearest_bone_name = None
-
-        for bone in armature.data.bones:
-            if self.only_deform and bone.use_deform is False:
-                continue
-            if self.bone_point == 'HEAD':
-                point = bone.head_local
-            elif self.bone_point == 'TAIL':
-                point = bone.tail_local
-            else:  # CENTER
-                point = (bone.head_local + bone.tail_local) / 2
-
-            bone_point_world = armature.matrix_world @ point
-            dist = (location_world - bone_point_world).length
-
-            if dist < min_distance:
-                min_distance = dist
-                nearest_bone_name = bone.name
-
-        return nearest_bone_name
+        snap = armature_snapshot.snapshot(armature.data, edit=False)
+        mask = snap.deform if self.only_deform else None
+        row = snap.nearest(armature.matrix_world, location_world, self.bone_point, mask)
+        return snap.names[row] if row >= 0 else None
 
 def register():
     bpy.utils.register_class(OBJECT_OT_parent_meshes_to_nearest_bone)
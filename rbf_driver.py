@@ -0,0 +1,564 @@
+import time
+import bpy # type: ignore
+from mathutils import Matrix, Quaternion # type: ignore
+import numpy as np
+from . import instrumentation
+
+# Pose-space corrective drivers. A network maps the local rotations of one
+# or more driver bones to the values of a set of shape keys through Gaussian
+# radial basis functions centred on sample poses:
+#
+#   value_k(q) = bias_k + sum_p W[p, k] * exp(-d(q, q_p)^2 / sigma^2)
+#   d(q, q_p)^2 = sum over bones of 1 - (q_b . q_pb)^2
+#
+# The distance is the same for q and -q, so quaternion sign flips don't
+# matter. W is solved once in NumPy. At runtime every pose kernel is one driver
+# writing a property on the mesh's Key, and every shape key is one driver
+# summing the weighted kernels. Both stay within Blender's simple expression
+# subset, so no Python runs during playback, and the bones are read once per
+# pose instead of once per pose and shape key.
+
+QUAT_COMPONENTS = "wxyz"
+
+
+def pose_distances(a, b):
+    """Squared pose distances between (P, B, 4) and (Q, B, 4) quaternion sets, as (P, Q)"""
+    dots = np.einsum('pbc,qbc->pqb', a, b)
+    return (1.0 - dots * dots).sum(axis=2)
+
+
+def solve(features, values, radius=0.0, smoothing=0.0):
+    """Solve the RBF weights of a network.
+
+    features: (P, B, 4) unit quaternions of the driver bones in every pose
+    values: (P, K) shape key values in every pose
+    radius: kernel width; 0 uses the mean distance between neighbouring poses
+    smoothing: added to the kernel diagonal, trading exact fit for smoothness
+    Returns (weights (P, K), bias (K,), sigma).
+    """
+    d2 = np.maximum(pose_distances(features, features), 0.0)
+    if radius > 0.0:
+        sigma = radius
+    else:
+        nearest = np.sqrt(d2 + np.diag(np.full(len(d2), np.inf))).min(axis=1)
+        nearest = nearest[np.isfinite(nearest)]
+        sigma = float(nearest.mean()) if len(nearest) and nearest.mean() > 1e-6 else 1.0
+    phi = np.exp(-d2 / (sigma * sigma)) + smoothing * np.eye(len(d2))
+    bias = values.mean(axis=0)
+    try:
+        weights = np.linalg.solve(phi, values - bias)
+    except np.linalg.LinAlgError:
+        # Duplicate poses make the kernel matrix singular
+        weights = np.linalg.lstsq(phi, values - bias, rcond=None)[0]
+    return weights, bias, sigma
+
+
+def kernel_expression(center, inv_sigma2):
+    """Simple expression of one pose kernel over the variables b{i}{w,x,y,z}"""
+    terms = []
+    for i, quat in enumerate(center):
+        dot = " + ".join(f"{c:.6g}*b{i}{name}" for c, name in zip(quat, QUAT_COMPONENTS))
+        terms.append(f"(1 - pow({dot}, 2))")
+    return f"exp(-({' + '.join(terms)})*{inv_sigma2:.6g})"
+
+
+def sum_expression(weights, bias):
+    """Simple expression of one shape key over the kernel variables k{p}"""
+    return f"{bias:.6g}" + "".join(f" + {w:.6g}*k{p}" for p, w in enumerate(weights))
+
+
+class RBF_PG_value(bpy.types.PropertyGroup):
+    value: bpy.props.FloatProperty()  # type: ignore
+
+
+class RBF_PG_pose(bpy.types.PropertyGroup):
+    # Quaternion (w, x, y, z) of every network bone, then every shape key value
+    features: bpy.props.CollectionProperty(type=RBF_PG_value)  # type: ignore
+    values: bpy.props.CollectionProperty(type=RBF_PG_value)  # type: ignore
+
+
+def _set_enabled(self, context):
+    for fcurve in network_drivers(self):
+        fcurve.mute = not self.enabled
+
+
+class RBF_PG_network(bpy.types.PropertyGroup):
+    bones: bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)  # type: ignore
+    shape_keys: bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)  # type: ignore
+    poses: bpy.props.CollectionProperty(type=RBF_PG_pose)  # type: ignore
+    active_pose: bpy.props.IntProperty(name="Active Pose")  # type: ignore
+
+    target_mesh: bpy.props.PointerProperty(
+        name="Target Mesh",
+        type=bpy.types.Object,
+    )  # type: ignore
+
+    radius: bpy.props.FloatProperty(
+        name="Radius",
+        description="Width of the pose kernels (0 uses the mean distance between neighbouring poses)",
+        default=0.0,
+        min=0.0,
+    )  # type: ignore
+
+    smoothing: bpy.props.FloatProperty(
+        name="Smoothing",
+        description="Trade an exact fit at the sample poses for smoother blending between them",
+        default=0.0,
+        min=0.0,
+        soft_max=1.0,
+    )  # type: ignore
+
+    enabled: bpy.props.BoolProperty(
+        name="Enabled",
+        description="Drive the shape keys; disable to set their values by hand before capturing a pose",
+        default=True,
+        update=_set_enabled,
+    )  # type: ignore
+
+
+def _read(collection):
+    values = np.empty(len(collection), dtype=np.float64)
+    collection.foreach_get("value", values)
+    return values
+
+
+def _write(collection, values):
+    collection.clear()
+    for _ in range(len(values)):
+        collection.add()
+    collection.foreach_set("value", np.asarray(values, dtype=np.float64))
+
+
+def network_arrays(network):
+    """(features (P, B, 4), values (P, K)) of the network's sample poses"""
+    bones = len(network.bones)
+    keys = len(network.shape_keys)
+    features = np.array([_read(p.features) for p in network.poses]).reshape(-1, bones, 4)
+    values = np.array([_read(p.values) for p in network.poses]).reshape(-1, keys)
+    return features, values
+
+
+def _kernel_path(network, p):
+    return f'["{bpy.utils.escape_identifier(f"rbf:{network.name}:{p}")}"]'
+
+
+def network_drivers(network):
+    """Driver F-curves the network has emitted on its mesh's Key"""
+    mesh = network.target_mesh
+    shape_keys = mesh.data.shape_keys if mesh and mesh.type == 'MESH' else None
+    if not shape_keys or not shape_keys.animation_data:
+        return []
+    prefix = f'["{bpy.utils.escape_identifier(f"rbf:{network.name}:")}'
+    key_paths = {f'key_blocks["{bpy.utils.escape_identifier(k.name)}"].value' for k in network.shape_keys}
+    return [fc for fc in shape_keys.animation_data.drivers
+            if fc.data_path.startswith(prefix) or fc.data_path in key_paths]
+
+
+def _bone_variables(network, armature):
+    """(name, type, id, bone, transform_type, data_path) of the quaternion channels of every network bone"""
+    return [(f"b{i}{c}", 'TRANSFORMS', armature, bone.name, f"ROT_{c.upper()}", "")
+            for i, bone in enumerate(network.bones) for c in QUAT_COMPONENTS]
+
+
+def _kernel_variables(network, shape_keys, count):
+    """Variable specs reading the network's first count kernels"""
+    return [(f"k{p}", 'SINGLE_PROP', shape_keys, "", "", _kernel_path(network, p)) for p in range(count)]
+
+
+def _variables_match(driver, specs):
+    if len(driver.variables) != len(specs):
+        return False
+    for var, (name, kind, id_data, bone, transform_type, data_path) in zip(driver.variables, specs):
+        target = var.targets[0]
+        if var.name != name or var.type != kind or target.id != id_data:
+            return False
+        if kind == 'TRANSFORMS':
+            if (target.bone_target != bone or target.transform_type != transform_type
+                    or target.rotation_mode != 'QUATERNION' or target.transform_space != 'LOCAL_SPACE'):
+                return False
+        elif target.data_path != data_path:
+            return False
+    return True
+
+
+def _ensure_driver(id_data, data_path, specs):
+    """Scripted driver on data_path whose variables are exactly specs, reusing an existing one that has them.
+
+    Returns (fcurve, created).
+    """
+    anim = id_data.animation_data
+    fcurve = anim.drivers.find(data_path) if anim else None
+    if fcurve and fcurve.driver.type == 'SCRIPTED' and _variables_match(fcurve.driver, specs):
+        return fcurve, False
+    if fcurve:
+        anim.drivers.remove(fcurve)
+    fcurve = id_data.driver_add(data_path)
+    driver = fcurve.driver
+    driver.type = 'SCRIPTED'
+    for name, kind, target_id, bone, transform_type, target_path in specs:
+        var = driver.variables.new()
+        var.name = name
+        var.type = kind
+        target = var.targets[0]
+        if kind == 'TRANSFORMS':
+            target.id = target_id
+            target.bone_target = bone
+            target.transform_type = transform_type
+            target.rotation_mode = 'QUATERNION'
+            target.transform_space = 'LOCAL_SPACE'
+        else:
+            target.id_type = 'KEY'
+            target.id = target_id
+            target.data_path = target_path
+    return fcurve, True
+
+
+def emit(network, armature, weights, bias, sigma):
+    """Write the network's kernel and shape key drivers.
+
+    Drivers that already have the right variables are kept and only get new
+    expressions, so re-solving after moving a pose costs a string write per driver.
+    Returns the number of drivers (re)built from scratch.
+    """
+    shape_keys = network.target_mesh.data.shape_keys
+    features, _ = network_arrays(network)
+    inv_sigma2 = 1.0 / (sigma * sigma)
+    rebuilt = 0
+
+    # Kernels left over from removed poses
+    prefix = f"rbf:{network.name}:"
+    for prop in [k for k in shape_keys.keys() if k.startswith(prefix)]:
+        index = prop[len(prefix):]
+        if not index.isdigit() or int(index) >= len(features):
+            shape_keys.driver_remove(f'["{bpy.utils.escape_identifier(prop)}"]')
+            del shape_keys[prop]
+
+    bone_specs = _bone_variables(network, armature)
+    for p, center in enumerate(features):
+        shape_keys[f"{prefix}{p}"] = 0.0
+        fcurve, created = _ensure_driver(shape_keys, _kernel_path(network, p), bone_specs)
+        rebuilt += created
+        fcurve.driver.expression = kernel_expression(center, inv_sigma2)
+        fcurve.mute = not network.enabled
+
+    kernel_specs = _kernel_variables(network, shape_keys, len(features))
+    for k, key in enumerate(network.shape_keys):
+        key_block = shape_keys.key_blocks.get(key.name)
+        if not key_block:
+            continue
+        fcurve, created = _ensure_driver(shape_keys, key_block.path_from_id("value"), kernel_specs)
+        rebuilt += created
+        fcurve.driver.expression = sum_expression(weights[:, k], bias[k])
+        fcurve.mute = not network.enabled
+    return rebuilt
+
+
+def _active_network(context):
+    obj = context.active_object
+    if not obj or obj.type != 'ARMATURE' or not len(obj.johnnygizmo_rbf_networks):
+        return None
+    index = min(obj.johnnygizmo_rbf_active, len(obj.johnnygizmo_rbf_networks) - 1)
+    return obj.johnnygizmo_rbf_networks[index]
+
+
+def capture(network, armature):
+    """(features (B, 4), values (K,)) of the current pose"""
+    quats = []
+    for bone in network.bones:
+        pose_bone = armature.pose.bones.get(bone.name)
+        quat = pose_bone.matrix_basis.to_quaternion().normalized() if pose_bone else None
+        quats.append(tuple(quat) if quat else (1.0, 0.0, 0.0, 0.0))
+    quats = np.array(quats, dtype=np.float64)
+    # Same rotation either way; w >= 0 just keeps the stored poses readable
+    quats[quats[:, 0] < 0.0] *= -1.0
+    key_blocks = network.target_mesh.data.shape_keys.key_blocks
+    values = np.array([key_blocks[k.name].value if k.name in key_blocks else 0.0 for k in network.shape_keys])
+    return quats, values
+
+
+@instrumentation.instrumented
+class POSE_OT_rbf_network_add(bpy.types.Operator):
+    """Create a pose-space corrective network driven by the selected bones"""
+    bl_idname = "pose.johnnygizmo_rbf_network_add"
+    bl_label = "Add Corrective Network"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    name: bpy.props.StringProperty(
+        name="Name",
+        default="Corrective",
+    )  # type: ignore
+
+    key_filter: bpy.props.StringProperty(
+        name="Shape Keys",
+        description="Drive the shape keys of the target mesh whose name contains this text (case-insensitive)",
+        default="",
+    )  # type: ignore
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'POSE' and bool(context.selected_pose_bones)
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        armature = context.active_object
+        mesh = context.scene.shapekey_widget_settings.target_mesh
+        if not mesh or mesh.type != 'MESH' or not mesh.data.shape_keys:
+            self.report({'ERROR'}, "Choose a target mesh with shape keys in the ShapeKey Widget panel")
+            return {'CANCELLED'}
+        needle = self.key_filter.lower()
+        keys = [kb.name for kb in mesh.data.shape_keys.key_blocks[1:] if needle in kb.name.lower()]
+        if not keys:
+            self.report({'ERROR'}, "No shape keys match the filter")
+            return {'CANCELLED'}
+
+        networks = armature.johnnygizmo_rbf_networks
+        network = networks.add()
+        # Network names end up in property names on the Key, so keep them unique
+        name = self.name or "Corrective"
+        existing = {n.name for n in networks}
+        network.name = name if name not in existing else next(
+            f"{name}.{i:03d}" for i in range(1, len(networks) + 1) if f"{name}.{i:03d}" not in existing)
+        network.target_mesh = mesh
+        for pose_bone in context.selected_pose_bones:
+            network.bones.add().name = pose_bone.name
+        for key in keys:
+            network.shape_keys.add().name = key
+
+        # Rest pose with every corrective off
+        rest = network.poses.add()
+        rest.name = "Rest"
+        _write(rest.features, np.tile((1.0, 0.0, 0.0, 0.0), len(network.bones)))
+        _write(rest.values, np.zeros(len(keys)))
+        armature.johnnygizmo_rbf_active = len(networks) - 1
+
+        self.report({'INFO'}, f"Network '{network.name}': {len(network.bones)} bones -> {len(keys)} shape keys")
+        return {'FINISHED'}
+
+
+class POSE_OT_rbf_network_remove(bpy.types.Operator):
+    """Remove the active corrective network and its drivers"""
+    bl_idname = "pose.johnnygizmo_rbf_network_remove"
+    bl_label = "Remove Corrective Network"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return _active_network(context) is not None
+
+    def execute(self, context):
+        armature = context.active_object
+        network = _active_network(context)
+        mesh = network.target_mesh
+        if mesh and mesh.data.shape_keys:
+            shape_keys = mesh.data.shape_keys
+            for fcurve in network_drivers(network):
+                shape_keys.animation_data.drivers.remove(fcurve)
+            prefix = f"rbf:{network.name}:"
+            for prop in [k for k in shape_keys.keys() if k.startswith(prefix)]:
+                del shape_keys[prop]
+        armature.johnnygizmo_rbf_networks.remove(min(armature.johnnygizmo_rbf_active, len(armature.johnnygizmo_rbf_networks) - 1))
+        armature.johnnygizmo_rbf_active = max(armature.johnnygizmo_rbf_active - 1, 0)
+        return {'FINISHED'}
+
+
+class POSE_OT_rbf_pose_add(bpy.types.Operator):
+    """Store the current bone pose and shape key values as a sample pose of the active network"""
+    bl_idname = "pose.johnnygizmo_rbf_pose_add"
+    bl_label = "Capture Pose"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'POSE' and _active_network(context) is not None
+
+    def execute(self, context):
+        network = _active_network(context)
+        quats, values = capture(network, context.active_object)
+        pose = network.poses.add()
+        pose.name = f"Pose {len(network.poses) - 1}"
+        _write(pose.features, quats.ravel())
+        _write(pose.values, values)
+        network.active_pose = len(network.poses) - 1
+        if network.enabled:
+            self.report({'WARNING'}, "Network is enabled, so the captured shape key values are its own output")
+        return {'FINISHED'}
+
+
+class POSE_OT_rbf_pose_update(bpy.types.Operator):
+    """Replace the active sample pose with the current bone pose and shape key values"""
+    bl_idname = "pose.johnnygizmo_rbf_pose_update"
+    bl_label = "Update Pose"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        network = _active_network(context)
+        return context.mode == 'POSE' and network is not None and len(network.poses) > 0
+
+    def execute(self, context):
+        network = _active_network(context)
+        quats, values = capture(network, context.active_object)
+        pose = network.poses[network.active_pose]
+        _write(pose.features, quats.ravel())
+        _write(pose.values, values)
+        return {'FINISHED'}
+
+
+class POSE_OT_rbf_pose_remove(bpy.types.Operator):
+    """Remove the active sample pose"""
+    bl_idname = "pose.johnnygizmo_rbf_pose_remove"
+    bl_label = "Remove Pose"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        network = _active_network(context)
+        return network is not None and len(network.poses) > 0
+
+    def execute(self, context):
+        network = _active_network(context)
+        network.poses.remove(network.active_pose)
+        network.active_pose = max(min(network.active_pose, len(network.poses) - 1), 0)
+        return {'FINISHED'}
+
+
+class POSE_OT_rbf_pose_recall(bpy.types.Operator):
+    """Put the network bones (and, while the network is disabled, the shape keys) into the active sample pose"""
+    bl_idname = "pose.johnnygizmo_rbf_pose_recall"
+    bl_label = "Go to Pose"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        network = _active_network(context)
+        return context.mode == 'POSE' and network is not None and len(network.poses) > 0
+
+    def execute(self, context):
+        armature = context.active_object
+        network = _active_network(context)
+        pose = network.poses[network.active_pose]
+        quats = _read(pose.features).reshape(-1, 4)
+        for bone, quat in zip(network.bones, quats):
+            pose_bone = armature.pose.bones.get(bone.name)
+            if pose_bone:
+                loc, _, scale = pose_bone.matrix_basis.decompose()
+                pose_bone.matrix_basis = Matrix.LocRotScale(loc, Quaternion(quat), scale)
+        if not network.enabled:
+            key_blocks = network.target_mesh.data.shape_keys.key_blocks
+            for key, value in zip(network.shape_keys, _read(pose.values)):
+                if key.name in key_blocks:
+                    key_blocks[key.name].value = value
+        return {'FINISHED'}
+
+
+@instrumentation.instrumented
+class POSE_OT_rbf_solve(bpy.types.Operator):
+    """Solve the active network's weights and write its drivers"""
+    bl_idname = "pose.johnnygizmo_rbf_solve"
+    bl_label = "Solve Network"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        network = _active_network(context)
+        return network is not None and len(network.poses) > 0
+
+    def execute(self, context):
+        network = _active_network(context)
+        mesh = network.target_mesh
+        if not mesh or mesh.type != 'MESH' or not mesh.data.shape_keys:
+            self.report({'ERROR'}, "The network's target mesh has no shape keys")
+            return {'CANCELLED'}
+
+        features, values = network_arrays(network)
+        start = time.perf_counter()
+        with instrumentation.span("rbf.solve"):
+            weights, bias, sigma = solve(features, values, network.radius, network.smoothing)
+        solve_ms = (time.perf_counter() - start) * 1000.0
+        with instrumentation.span("rbf.emit"):
+            rebuilt = emit(network, context.active_object, weights, bias, sigma)
+
+        self.report(
+            {'INFO'},
+            f"Solved {len(features)} poses x {values.shape[1]} shape keys in {solve_ms:.2f} ms "
+            f"(radius {sigma:.3f}); {rebuilt} drivers rebuilt",
+        )
+        return {'FINISHED'}
+
+
+class POSE_PT_johnnygizmo_rbf(bpy.types.Panel):
+    bl_label = "Pose Correctives"
+    bl_idname = "POSE_PT_johnnygizmo_rbf"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'Rigging'
+    bl_options = {'DEFAULT_CLOSED'}
+    bl_order = 2
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj and obj.type == 'ARMATURE' and context.mode == 'POSE'
+
+    def draw(self, context):
+        layout = self.layout
+        armature = context.active_object
+
+        row = layout.row()
+        row.template_list("UI_UL_list", "rbf_networks", armature, "johnnygizmo_rbf_networks",
+                          armature, "johnnygizmo_rbf_active", rows=2)
+        col = row.column(align=True)
+        col.operator(POSE_OT_rbf_network_add.bl_idname, icon='ADD', text="")
+        col.operator(POSE_OT_rbf_network_remove.bl_idname, icon='REMOVE', text="")
+
+        network = _active_network(context)
+        if not network:
+            return
+        layout.label(text=f"{len(network.bones)} bones -> {len(network.shape_keys)} shape keys on "
+                          f"{network.target_mesh.name if network.target_mesh else '(missing mesh)'}")
+        layout.prop(network, "enabled")
+
+        row = layout.row()
+        row.template_list("UI_UL_list", "rbf_poses", network, "poses", network, "active_pose", rows=4)
+        col = row.column(align=True)
+        col.operator(POSE_OT_rbf_pose_add.bl_idname, icon='ADD', text="")
+        col.operator(POSE_OT_rbf_pose_remove.bl_idname, icon='REMOVE', text="")
+        col.separator()
+        col.operator(POSE_OT_rbf_pose_update.bl_idname, icon='FILE_REFRESH', text="")
+        col.operator(POSE_OT_rbf_pose_recall.bl_idname, icon='ARMATURE_DATA', text="")
+
+        col = layout.column(align=True)
+        col.prop(network, "radius")
+        col.prop(network, "smoothing")
+        layout.operator(POSE_OT_rbf_solve.bl_idname, icon='DRIVER')
+
+
+classes = (
+    RBF_PG_value,
+    RBF_PG_pose,
+    RBF_PG_network,
+    POSE_OT_rbf_network_add,
+    POSE_OT_rbf_network_remove,
+    POSE_OT_rbf_pose_add,
+    POSE_OT_rbf_pose_update,
+    POSE_OT_rbf_pose_remove,
+    POSE_OT_rbf_pose_recall,
+    POSE_OT_rbf_solve,
+    POSE_PT_johnnygizmo_rbf,
+)
+
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Object.johnnygizmo_rbf_networks = bpy.props.CollectionProperty(type=RBF_PG_network)
+    bpy.types.Object.johnnygizmo_rbf_active = bpy.props.IntProperty(name="Active Corrective Network")
+
+
+def unregister():
+    del bpy.types.Object.johnnygizmo_rbf_active
+    del bpy.types.Object.johnnygizmo_rbf_networks
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,371 @@
+import re
+import bpy # type: ignore
+import numpy as np
+from . import instrumentation
+from . import bulk_rename
+from .bone_doctor import clean_symmetry_name
+
+# The {Type}_{Name}{NN}.{Side} scheme written by Bone Chain Rename, used to
+# split every name into fields that templates can recombine
+NAME_SCHEME = re.compile(r'^(?:(?P<type>DEF|CTRL|MCH|ORG)_)?(?P<name>.*?)(?P<nn>\d*)(?:[._](?P<side>L|R|Top|Bot|Fr|Bk))?$')
+
+
+def name_fields(name):
+    """Template fields of a bone name"""
+    parts = NAME_SCHEME.match(name).groupdict(default="")
+    parts["full"] = name
+    parts["type_prefix"] = f"{parts['type']}_" if parts["type"] else ""
+    parts["side_suffix"] = f".{parts['side']}" if parts["side"] else ""
+    return parts
+
+
+def compile_rules(rules):
+    """Compile the enabled rules once into (kind, pattern, replacement) tuples.
+
+    Raises ValueError naming the first rule with an invalid pattern or
+    regex replacement template.
+    """
+    compiled = []
+    for i, rule in enumerate(rules):
+        if not rule.enabled:
+            continue
+        if rule.kind == 'REGEX' and not rule.pattern:
+            raise ValueError(f"Rule {i + 1}: a regex rule needs a pattern")
+        try:
+            pattern = re.compile(rule.pattern, 0 if rule.match_case else re.IGNORECASE)
+        except re.error as err:
+            raise ValueError(f"Rule {i + 1}: {err}") from None
+        if rule.kind == 'REGEX':
+            # sub() parses the template before searching, so bad group
+            # references fail here even though nothing matches
+            try:
+                pattern.sub(rule.replacement, "")
+            except (re.error, IndexError) as err:
+                raise ValueError(f"Rule {i + 1}: {err}") from None
+        compiled.append((rule.kind, pattern, rule.replacement))
+    return compiled
+
+
+def evaluate(compiled, names, mask):
+    """New names for the bones in names where mask is set, applying every rule in order.
+
+    Each rule is one pass over the name array. Template rules see the fields of
+    name_fields(), the named groups of their pattern and {index}, the 1-based
+    position among the names the rule matched.
+    """
+    result = list(names)
+    rows = np.flatnonzero(mask)
+    for kind, pattern, replacement in compiled:
+        if kind == 'REGEX':
+            for row in rows:
+                result[row] = pattern.sub(replacement, result[row])
+        elif kind == 'SYMMETRY':
+            for row in rows:
+                if pattern.search(result[row]):
+                    result[row] = clean_symmetry_name(result[row])
+        else:
+            index = 0
+            for row in rows:
+                match = pattern.search(result[row])
+                if not match:
+                    continue
+                index += 1
+                fields = name_fields(result[row])
+                fields.update(match.groupdict(default=""))
+                fields["index"] = index
+                result[row] = replacement.format_map(fields)
+    return result
+
+
+class RENAME_PG_rule(bpy.types.PropertyGroup):
+    enabled: bpy.props.BoolProperty(
+        name="Enabled",
+        default=True,
+    )  # type: ignore
+
+    kind: bpy.props.EnumProperty(
+        name="Kind",
+        items=[
+            ('REGEX', "Regex", "Replace every match of the pattern (\\1 inserts a group)"),
+            ('TEMPLATE', "Template", "Rebuild matching names from a template such as {type_prefix}{name}{nn}{side_suffix}"),
+            ('SYMMETRY', "Symmetry", "Write side suffixes of matching names as .L, .R, .Top, .Bot, .Fr, .Bk"),
+        ],
+        default='REGEX',
+    )  # type: ignore
+
+    pattern: bpy.props.StringProperty(
+        name="Pattern",
+        description="Regular expression the bone name must contain (empty matches every name)",
+        default="",
+    )  # type: ignore
+
+    replacement: bpy.props.StringProperty(
+        name="Replacement",
+        description=(
+            "Regex: replacement text. Template: new name with {type} {name} {nn} {side} {type_prefix} "
+            "{side_suffix} {full} {index} and the pattern's named groups"
+        ),
+        default="",
+    )  # type: ignore
+
+    match_case: bpy.props.BoolProperty(
+        name="Match Case",
+        default=True,
+    )  # type: ignore
+
+
+class RENAME_PG_preview_item(bpy.types.PropertyGroup):
+    # name holds the current bone name, so the list's name filter works on it
+    new_name: bpy.props.StringProperty(name="New Name")  # type: ignore
+    problem: bpy.props.StringProperty(name="Problem")  # type: ignore
+
+
+class RENAME_PG_settings(bpy.types.PropertyGroup):
+    rules: bpy.props.CollectionProperty(type=RENAME_PG_rule)  # type: ignore
+    active_rule: bpy.props.IntProperty(name="Active Rule")  # type: ignore
+    preview: bpy.props.CollectionProperty(type=RENAME_PG_preview_item)  # type: ignore
+    active_preview: bpy.props.IntProperty(name="Active Preview Row")  # type: ignore
+    preview_armature: bpy.props.StringProperty(name="Previewed Armature")  # type: ignore
+
+    only_selected: bpy.props.BoolProperty(
+        name="Only Selected",
+        description="Only rename selected bones",
+        default=False,
+    )  # type: ignore
+
+    fix_actions: bpy.props.BoolProperty(
+        name="Update Unassigned Actions",
+        description="Also rename the bone channels of actions that are not assigned to anything",
+        default=True,
+    )  # type: ignore
+
+
+def _armature_names(arm_obj, only_selected):
+    arm = arm_obj.data
+    bones = arm.edit_bones if arm.is_editmode else arm.bones
+    names = [b.name for b in bones]
+    if only_selected:
+        mask = np.empty(len(bones), dtype=bool)
+        bones.foreach_get("select", mask)
+    else:
+        mask = np.ones(len(bones), dtype=bool)
+    return names, mask
+
+
+def compute_renames(settings, arm_obj):
+    """(mapping, skipped) for the rules applied to arm_obj; raises ValueError for bad rules"""
+    with instrumentation.span("rename_rules.evaluate"):
+        names, mask = _armature_names(arm_obj, settings.only_selected)
+        compiled = compile_rules(settings.rules)
+        try:
+            new_names = evaluate(compiled, names, mask)
+        except (re.error, KeyError, IndexError, ValueError, AttributeError, TypeError) as err:
+            raise ValueError(f"Template error: {err}") from None
+        mapping = {old: new for old, new in zip(names, new_names) if old != new}
+        _, skipped = bulk_rename.plan(names, mapping)
+    return mapping, skipped
+
+
+class RENAME_UL_rules(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.prop(item, "enabled", text="")
+        row.prop(item, "kind", text="")
+        row.prop(item, "pattern", text="", icon='VIEWZOOM')
+        if item.kind != 'SYMMETRY':
+            row.prop(item, "replacement", text="")
+        row.prop(item, "match_case", text="", icon='SYNTAX_OFF')
+
+
+class RENAME_UL_preview(bpy.types.UIList):
+    # Only visible rows are drawn, so thousands of entries scroll smoothly
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row()
+        row.alert = bool(item.problem)
+        row.label(text=item.name, icon='ERROR' if item.problem else 'BONE_DATA')
+        row.label(text=item.problem or item.new_name, icon='FORWARD')
+
+
+class ARMATURE_OT_rename_rule_add(bpy.types.Operator):
+    bl_idname = "armature.johnnygizmo_rename_rule_add"
+    bl_label = "Add Rename Rule"
+    bl_options = {'INTERNAL', 'UNDO'}
+
+    def execute(self, context):
+        settings = context.scene.johnnygizmo_rename_rules
+        settings.rules.add()
+        settings.active_rule = len(settings.rules) - 1
+        return {'FINISHED'}
+
+
+class ARMATURE_OT_rename_rule_remove(bpy.types.Operator):
+    bl_idname = "armature.johnnygizmo_rename_rule_remove"
+    bl_label = "Remove Rename Rule"
+    bl_options = {'INTERNAL', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.scene.johnnygizmo_rename_rules.rules) > 0
+
+    def execute(self, context):
+        settings = context.scene.johnnygizmo_rename_rules
+        settings.rules.remove(settings.active_rule)
+        settings.active_rule = min(settings.active_rule, len(settings.rules) - 1)
+        return {'FINISHED'}
+
+
+class ARMATURE_OT_rename_rule_move(bpy.types.Operator):
+    bl_idname = "armature.johnnygizmo_rename_rule_move"
+    bl_label = "Move Rename Rule"
+    bl_options = {'INTERNAL', 'UNDO'}
+
+    direction: bpy.props.EnumProperty(
+        items=[('UP', "Up", ""), ('DOWN', "Down", "")],
+    )  # type: ignore
+
+    def execute(self, context):
+        settings = context.scene.johnnygizmo_rename_rules
+        target = settings.active_rule + (-1 if self.direction == 'UP' else 1)
+        if 0 <= target < len(settings.rules):
+            settings.rules.move(settings.active_rule, target)
+            settings.active_rule = target
+        return {'FINISHED'}
+
+
+@instrumentation.instrumented
+class ARMATURE_OT_rename_rules_preview(bpy.types.Operator):
+    bl_idname = "armature.johnnygizmo_rename_rules_preview"
+    bl_label = "Preview Renames"
+    bl_description = "List the names the rules would change, and any renames that would be skipped"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj and obj.type == 'ARMATURE'
+
+    def execute(self, context):
+        settings = context.scene.johnnygizmo_rename_rules
+        arm_obj = context.active_object
+        try:
+            mapping, skipped = compute_renames(settings, arm_obj)
+        except ValueError as err:
+            self.report({'ERROR'}, str(err))
+            return {'CANCELLED'}
+
+        preview = settings.preview
+        preview.clear()
+        for old, new in mapping.items():
+            item = preview.add()
+            item.name = old
+            item.new_name = new
+            item.problem = skipped.get(old, "")
+        settings.active_preview = 0
+        settings.preview_armature = arm_obj.name
+
+        self.report({'INFO'}, f"{len(mapping) - len(skipped)} bones to rename, {len(skipped)} skipped")
+        return {'FINISHED'}
+
+
+@instrumentation.instrumented
+class ARMATURE_OT_rename_rules_apply(bpy.types.Operator):
+    bl_idname = "armature.johnnygizmo_rename_rules_apply"
+    bl_label = "Apply Renames"
+    bl_description = "Rename the bones of the active armature with the rules, as one transaction"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj and obj.type == 'ARMATURE'
+
+    def execute(self, context):
+        settings = context.scene.johnnygizmo_rename_rules
+        arm_obj = context.active_object
+        # Evaluated again: bones may have changed since the preview
+        try:
+            mapping, _ = compute_renames(settings, arm_obj)
+        except ValueError as err:
+            self.report({'ERROR'}, str(err))
+            return {'CANCELLED'}
+
+        renamed, skipped, fixed = bulk_rename.rename_bones(arm_obj, mapping, settings.fix_actions)
+        settings.preview.clear()
+        settings.preview_armature = ""
+
+        message = f"Renamed {len(renamed)} bones"
+        if fixed:
+            message += f", updated {fixed} channels in unassigned actions"
+        if skipped:
+            message += f"; {len(skipped)} skipped"
+            self.report({'WARNING'}, message)
+        else:
+            self.report({'INFO'}, message)
+        return {'FINISHED'}
+
+
+class VIEW3D_PT_johnnygizmo_rename_rules(bpy.types.Panel):
+    bl_label = "Rename Rules"
+    bl_idname = "VIEW3D_PT_johnnygizmo_rename_rules"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'Rigging'
+    bl_options = {'DEFAULT_CLOSED'}
+    bl_order = 1
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj and obj.type == 'ARMATURE'
+
+    def draw(self, context):
+        layout = self.layout
+        settings = context.scene.johnnygizmo_rename_rules
+
+        row = layout.row()
+        row.template_list("RENAME_UL_rules", "", settings, "rules", settings, "active_rule", rows=3)
+        col = row.column(align=True)
+        col.operator(ARMATURE_OT_rename_rule_add.bl_idname, icon='ADD', text="")
+        col.operator(ARMATURE_OT_rename_rule_remove.bl_idname, icon='REMOVE', text="")
+        col.separator()
+        col.operator(ARMATURE_OT_rename_rule_move.bl_idname, icon='TRIA_UP', text="").direction = 'UP'
+        col.operator(ARMATURE_OT_rename_rule_move.bl_idname, icon='TRIA_DOWN', text="").direction = 'DOWN'
+
+        row = layout.row()
+        row.prop(settings, "only_selected")
+        row.prop(settings, "fix_actions", text="Unassigned Actions")
+
+        row = layout.row(align=True)
+        row.operator(ARMATURE_OT_rename_rules_preview.bl_idname, icon='HIDE_OFF')
+        row.operator(ARMATURE_OT_rename_rules_apply.bl_idname, icon='CHECKMARK')
+
+        if settings.preview_armature == context.active_object.name and len(settings.preview):
+            layout.label(text=f"{len(settings.preview)} changes")
+            layout.template_list("RENAME_UL_preview", "", settings, "preview", settings, "active_preview", rows=8)
+
+
+classes = (
+    RENAME_PG_rule,
+    RENAME_PG_preview_item,
+    RENAME_PG_settings,
+    RENAME_UL_rules,
+    RENAME_UL_preview,
+    ARMATURE_OT_rename_rule_add,
+    ARMATURE_OT_rename_rule_remove,
+    ARMATURE_OT_rename_rule_move,
+    ARMATURE_OT_rename_rules_preview,
+    ARMATURE_OT_rename_rules_apply,
+    VIEW3D_PT_johnnygizmo_rename_rules,
+)
+
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Scene.johnnygizmo_rename_rules = bpy.props.PointerProperty(type=RENAME_PG_settings)
+
+
+def unregister():
+    del bpy.types.Scene.johnnygizmo_rename_rules
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
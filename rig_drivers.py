@@ -0,0 +1,55 @@
+import bpy # type: ignore
+
+# Drivers of a rig: the armature object and data, plus every object it
+# deforms or parents, their data and their shape keys. Shared by the driver
+# benchmark and the driver audit.
+
+SIMPLE = 'SIMPLE_EXPRESSION'
+PYTHON = 'PYTHON_EXPRESSION'
+NON_SCRIPTED = 'NON_SCRIPTED'
+
+
+def rig_datablocks(arm_obj):
+    """The armature and the datablocks it drives, each once, in a stable order"""
+    found = [arm_obj, arm_obj.data]
+    for obj in bpy.data.objects:
+        if obj == arm_obj:
+            continue
+        deformed = obj.parent == arm_obj or any(
+            mod.type == 'ARMATURE' and mod.object == arm_obj for mod in obj.modifiers)
+        if not deformed:
+            continue
+        found.append(obj)
+        if obj.data is not None:
+            found.append(obj.data)
+            shape_keys = getattr(obj.data, "shape_keys", None)
+            if shape_keys is not None:
+                found.append(shape_keys)
+    seen = set()
+    unique = []
+    for id_data in found:
+        if id_data.as_pointer() not in seen:
+            seen.add(id_data.as_pointer())
+            unique.append(id_data)
+    return unique
+
+
+def rig_drivers(arm_obj):
+    """[(owner, fcurve)] for every driver F-curve of the rig"""
+    drivers = []
+    for id_data in rig_datablocks(arm_obj):
+        anim = getattr(id_data, "animation_data", None)
+        if anim:
+            drivers.extend((id_data, fcurve) for fcurve in anim.drivers)
+    return drivers
+
+
+def classify(driver):
+    """SIMPLE for expressions Blender evaluates without Python, PYTHON for the rest, NON_SCRIPTED otherwise"""
+    if driver.type != 'SCRIPTED':
+        return NON_SCRIPTED
+    return SIMPLE if driver.is_simple_expression else PYTHON
+
+
+def driver_label(owner, fcurve):
+    return f"{owner.name}: {fcurve.data_path}[{fcurve.array_index}]"
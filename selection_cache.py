@@ -0,0 +1,102 @@
+import bpy # type: ignore
+from bpy.app.handlers import persistent # type: ignore
+import numpy as np
+
+# Cheap selection queries for poll() and draw() callbacks, which run on every
+# redraw. Results are cached per datablock and dropped whenever the depsgraph
+# reports an update for that datablock (selection changes tag an update).
+
+_versions = {}
+_cache = {}
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    for update in depsgraph.updates:
+        key = update.id.original.as_pointer()
+        _versions[key] = _versions.get(key, 0) + 1
+
+
+@persistent
+def _on_load(*args):
+    _versions.clear()
+    _cache.clear()
+
+
+def data_version(id_data):
+    """Update counter of a datablock, bumped on every depsgraph update of it"""
+    return _versions.get(id_data.as_pointer(), 0)
+
+
+def _cached(kind, id_data, extra, compute):
+    key = (kind, id_data.as_pointer())
+    version = data_version(id_data)
+    hit = _cache.get(key)
+    if hit is not None and hit[0] == version and hit[1] == extra:
+        return hit[2]
+    value = compute()
+    _cache[key] = (version, extra, value)
+    return value
+
+
+def _selected_count(collection):
+    flags = np.empty(len(collection), dtype=bool)
+    collection.foreach_get("select", flags)
+    return int(np.count_nonzero(flags))
+
+
+def has_selected_faces(mesh):
+    """True if any face of mesh is selected"""
+    if mesh.is_editmode:
+        # Maintained by the edit-mesh, so this is constant time
+        return mesh.total_face_sel > 0
+    return _cached("faces", mesh, len(mesh.polygons), lambda: _selected_count(mesh.polygons) > 0)
+
+
+def has_selected_edit_bones(armature):
+    """True if any edit bone of armature (in Edit Mode) is selected"""
+    active = armature.edit_bones.active
+    if active is not None and active.select:
+        return True
+    extra = (len(armature.edit_bones), active.name if active else "")
+    return _cached("edit_bones", armature, extra, lambda: _selected_count(armature.edit_bones) > 0)
+
+
+def _visible_selected_count(armature):
+    bones = armature.bones
+    selected = np.empty(len(bones), dtype=bool)
+    bones.foreach_get("select", selected)
+    hidden = np.empty(len(bones), dtype=bool)
+    bones.foreach_get("hide", hidden)
+    selected &= ~hidden
+    if not selected.any():
+        return 0
+    # Bones in no collection always show; the others need a visible collection
+    assigned = set()
+    shown = set()
+    for collection in armature.collections_all:
+        names = {bone.name for bone in collection.bones}
+        assigned |= names
+        if collection.is_visible_effectively:
+            shown |= names
+    return sum(1 for i in np.flatnonzero(selected)
+               if bones[i].name in shown or bones[i].name not in assigned)
+
+
+def selected_bone_count(armature):
+    """Number of selected, visible bones of armature outside Edit Mode, as in context.selected_pose_bones"""
+    active = armature.bones.active
+    visibility = tuple(c.is_visible_effectively for c in armature.collections_all)
+    extra = (len(armature.bones), active.name if active else "", visibility)
+    return _cached("bones", armature, extra, lambda: _visible_selected_count(armature))
+
+
+def register():
+    bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    bpy.app.handlers.load_post.append(_on_load)
+
+
+def unregister():
+    bpy.app.handlers.load_post.remove(_on_load)
+    bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    _on_load()
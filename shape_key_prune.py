@@ -0,0 +1,193 @@
+import bpy # type: ignore
+from bpy.props import EnumProperty, FloatProperty # type: ignore
+import numpy as np
+from . import instrumentation
+
+# Finds shape keys of the widget target mesh that barely move anything.
+# Every key block is read with one foreach_get into a (keys, verts, 3)
+# array, so the statistics of a 100 key, 50k vertex head are a handful of
+# array passes rather than millions of per-vertex reads.
+
+
+def read_key_coords(key_blocks):
+    """Coordinates of every key block as a (keys, verts, 3) float32 array"""
+    count = len(key_blocks[0].data)
+    coords = np.empty((len(key_blocks), count * 3), dtype=np.float32)
+    for i, key_block in enumerate(key_blocks):
+        key_block.data.foreach_get("co", coords[i])
+    return coords.reshape(len(key_blocks), count, 3)
+
+
+def key_stats(coords, relative, tolerance):
+    """Displacement statistics of every key against its relative key.
+
+    relative holds the row of each key's relative key. Returns the deltas
+    and per-key max displacement, RMS displacement and sparsity (the share
+    of vertices moving no more than tolerance).
+    """
+    deltas = coords - coords[relative]
+    distance = np.sqrt(np.einsum('kvi,kvi->kv', deltas, deltas))
+    max_disp = distance.max(axis=1)
+    rms = np.sqrt(np.mean(distance * distance, axis=1))
+    sparsity = np.mean(distance <= tolerance, axis=1)
+    return deltas, max_disp, rms, sparsity
+
+
+def duplicate_groups(deltas, rows, tolerance):
+    """Groups of rows whose deltas match within tolerance.
+
+    Deltas are snapped to a tolerance grid and bucketed by their bytes;
+    members of a bucket are then compared exactly, so grid rounding can
+    only miss a match, never invent one.
+    """
+    buckets = {}
+    for row in rows:
+        key = np.round(deltas[row] / tolerance).astype(np.int32).tobytes()
+        buckets.setdefault(key, []).append(row)
+    groups = []
+    for members in buckets.values():
+        while len(members) > 1:
+            first = members[0]
+            same = [row for row in members[1:] if np.abs(deltas[row] - deltas[first]).max() <= tolerance]
+            if same:
+                groups.append([first] + same)
+            members = [row for row in members[1:] if row not in same]
+    return groups
+
+
+def remove_key_drivers(shape_keys, names):
+    """Remove the drivers of the named key blocks"""
+    anim = shape_keys.animation_data
+    if not anim:
+        return
+    paths = {f'key_blocks["{bpy.utils.escape_identifier(name)}"]' for name in names}
+    for fcurve in [fc for fc in anim.drivers if fc.data_path.rsplit(".", 1)[0] in paths]:
+        anim.drivers.remove(fcurve)
+
+
+@instrumentation.instrumented
+class SHAPEKEY_OT_prune_shape_keys(bpy.types.Operator):
+    """Find shape keys of the target mesh with negligible or duplicate deltas, and optionally remove the negligible ones"""
+    bl_idname = "shapekey.prune_shape_keys"
+    bl_label = "Prune Shape Keys"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    action: EnumProperty(
+        name="Action",
+        items=[
+            ('REPORT', "Report", "Only write the analysis to a text block"),
+            ('REMOVE', "Remove", "Remove the keys below the threshold and their drivers"),
+        ],
+        default='REPORT',
+    ) # type: ignore
+
+    metric: EnumProperty(
+        name="Metric",
+        items=[
+            ('MAX', "Max Displacement", "Prune keys whose largest vertex offset is below the threshold"),
+            ('RMS', "RMS Displacement", "Prune keys whose root mean square vertex offset is below the threshold"),
+        ],
+        default='MAX',
+    ) # type: ignore
+
+    threshold: FloatProperty(
+        name="Threshold",
+        description="Keys moving less than this are negligible",
+        default=0.0001,
+        min=0.0,
+        precision=5,
+        subtype='DISTANCE',
+    ) # type: ignore
+
+    tolerance: FloatProperty(
+        name="Tolerance",
+        description="Vertex offsets below this count as unmoved, and deltas this close count as identical",
+        default=0.00001,
+        min=1e-7,
+        precision=6,
+        subtype='DISTANCE',
+    ) # type: ignore
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        settings = context.scene.shapekey_widget_settings
+        target_obj = settings.target_mesh
+        if not target_obj or target_obj.type != 'MESH' or not target_obj.data.shape_keys:
+            self.report({'ERROR'}, "Target mesh has no shape keys")
+            return {'CANCELLED'}
+        if not target_obj.data.vertices:
+            self.report({'ERROR'}, "Target mesh has no vertices")
+            return {'CANCELLED'}
+        if target_obj.mode == 'EDIT':
+            self.report({'ERROR'}, "Target mesh is in Edit Mode")
+            return {'CANCELLED'}
+
+        shape_keys = target_obj.data.shape_keys
+        key_blocks = shape_keys.key_blocks
+        names = [kb.name for kb in key_blocks]
+        index = {name: i for i, name in enumerate(names)}
+        reference = shape_keys.reference_key.name
+        relative = np.array([index.get(kb.relative_key.name, 0) for kb in key_blocks], dtype=np.int64)
+
+        coords = read_key_coords(key_blocks)
+        deltas, max_disp, rms, sparsity = key_stats(coords, relative, self.tolerance)
+        instrumentation.count("vertices_read", coords.shape[0] * coords.shape[1])
+
+        metric = max_disp if self.metric == 'MAX' else rms
+        rows = [i for i, name in enumerate(names) if name != reference]
+        negligible = [i for i in rows if metric[i] < self.threshold]
+        # Keys other keys are relative to stay, or those keys would change shape
+        pruned = set(negligible)
+        anchors = {int(r) for i, r in enumerate(relative) if i not in pruned and names[i] != reference}
+        kept_anchors = [i for i in negligible if i in anchors]
+        negligible = [i for i in negligible if i not in anchors]
+        moving = [i for i in rows if max_disp[i] > self.tolerance]
+        duplicates = duplicate_groups(deltas, moving, self.tolerance)
+
+        report_lines = [f"=== SHAPE KEY REPORT: {target_obj.name} ===",
+                        f"{len(rows)} keys, {coords.shape[1]} vertices", ""]
+        report_lines.append(f"{'Key':<40} {'Max':>10} {'RMS':>10} {'Sparsity':>9}")
+        for i in sorted(rows, key=lambda i: metric[i]):
+            report_lines.append(f"{names[i]:<40} {max_disp[i]:>10.6f} {rms[i]:>10.6f} {sparsity[i]:>9.1%}")
+        report_lines.append("")
+        if negligible:
+            report_lines.append(f"- KEYS BELOW THRESHOLD ({self.threshold:g}):")
+            report_lines.extend(f"   - {names[i]}" for i in negligible)
+            report_lines.append("")
+        if kept_anchors:
+            report_lines.append("- KEYS BELOW THRESHOLD KEPT AS RELATIVE KEYS OF OTHER KEYS:")
+            report_lines.extend(f"   - {names[i]}" for i in kept_anchors)
+            report_lines.append("")
+        if duplicates:
+            report_lines.append("- KEYS WITH IDENTICAL DELTAS:")
+            report_lines.extend(f"   - {', '.join(names[i] for i in group)}" for group in duplicates)
+            report_lines.append("")
+
+        removed = 0
+        if self.action == 'REMOVE' and negligible:
+            doomed = [names[i] for i in negligible]
+            remove_key_drivers(shape_keys, doomed)
+            for name in doomed:
+                target_obj.shape_key_remove(key_blocks[name])
+            removed = len(doomed)
+            report_lines.append(f"Removed {removed} keys.")
+
+        report_name = f"{target_obj.name}_Shape_Key_Report"
+        text_block = bpy.data.texts.get(report_name) or bpy.data.texts.new(report_name)
+        text_block.clear()
+        text_block.write("\n".join(report_lines))
+
+        verb = "removed" if removed else "below threshold"
+        self.report({'INFO'}, f"{len(negligible)} keys {verb}, {len(duplicates)} duplicate groups; "
+                              f"report saved to text block: {report_name}")
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(SHAPEKEY_OT_prune_shape_keys)
+
+
+def unregister():
+    bpy.utils.unregister_class(SHAPEKEY_OT_prune_shape_keys)
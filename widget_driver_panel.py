@@ -1,4 +1,6 @@
 import bpy # type: ignore
+from . import selection_cache
+from . import instrumentation
 
 
 class SHAPEKEY_MT_bone_collections(bpy.types.Menu):
@@ -31,6 +33,7 @@ class SHAPEKEY_MT_bone_groups(bpy.types.Menu):
                 op.collection_name = group.name
 
 
+@instrumentation.instrumented
 class SHAPEKEY_OT_set_bone_collection(bpy.types.Operator):
     """Set the bone collection name"""
     bl_idname = "shapekey.set_bone_collection"
@@ -58,28 +61,9 @@ class SHAPEKEY_PT_widget_panel(bpy.types.Panel):
             return False
         if context.mode != 'POSE':
             return False
-        if not context.selected_pose_bones or len(context.selected_pose_bones) != 1:
-            return False
         return True
     
     def draw(self, context):
-
-        if not context.active_object or context.active_object.type != 'ARMATURE':
-            
-            layout = self.layout
-            layout.label(text="Select an mesh and an armature in pose mode", icon='ERROR')
-            return
-        if context.mode != 'POSE':
-            layout = self.layout
-            layout.label(text="Select an mesh and an armature ", icon='ERROR')
-            return
-        if not context.selected_pose_bones or len(context.selected_pose_bones) != 1:
-            layout = self.layout
-            layout.label(text="Select an mesh and an armature", icon='ERROR')
-            return
-
-
-        
         layout = self.layout
         settings = context.scene.shapekey_widget_settings
         
@@ -90,13 +74,13 @@ class SHAPEKEY_PT_widget_panel(bpy.types.Panel):
         layout.separator()
         layout.label(text="Target:")
         layout.prop(settings, "target_mesh", icon='MESH_DATA')
-        layout.prop(settings, "shape_key")
-        
+        target_obj = settings.target_mesh 
+        if target_obj and target_obj.type == 'MESH' and target_obj.data.shape_keys:
+            layout.template_list("SHAPEKEY_UL_widget_keys", "", target_obj.data.shape_keys, "key_blocks",
+                                 settings, "shape_key_index", rows=5)
         
         # Display the current mix max of the selected shape key
-        target_obj = settings.target_mesh 
-                
-        if target_obj and target_obj.type == 'MESH' and settings.shape_key in target_obj.data.shape_keys.key_blocks:                              
+        if target_obj and target_obj.type == 'MESH' and target_obj.data.shape_keys and settings.shape_key in target_obj.data.shape_keys.key_blocks:
             
             shape_key_block = target_obj.data.shape_keys.key_blocks[settings.shape_key]                                  
             layout.label(text=f"Key Range: {shape_key_block.slider_min:.3f} to {shape_key_block.slider_max:.3f}")
@@ -143,7 +127,16 @@ class SHAPEKEY_PT_widget_panel(bpy.types.Panel):
             layout.prop(settings, "bone_collection_name")
         
         layout.separator()
-        layout.operator("shapekey.create_widget_driver", text="Create Widget Driver", icon='DRIVER')
+        row = layout.row()
+        # One selected bone becomes the control of the chosen shape key
+        row.enabled = selection_cache.selected_bone_count(context.active_object.data) == 1
+        row.operator("shapekey.create_widget_driver", text="Create Widget Driver", icon='DRIVER')
+        layout.operator("shapekey.create_widget_board", text="Create Face Board", icon='MESH_GRID')
+
+        layout.separator()
+        layout.prop(settings, "share_channels")
+        layout.operator("shapekey.share_widget_channels", text="Share Existing Channels", icon='LINKED')
+        layout.operator("shapekey.prune_shape_keys", text="Prune Shape Keys", icon='BRUSH_DATA')
 
 
 def register():